@@ -0,0 +1,160 @@
+"""Vectorized summaries and reductions of table columns for the dashboard.
+
+Everything here is a pure function of NumPy arrays, so results can be
+cached by the caller under the data version they were computed from.
+Array results stay NumPy arrays; app.py turns them into JSON lists or
+binary columns (see columnar.py) per request.
+"""
+import math
+
+import numpy as np
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def histogram(x, bins=30, edges=None, value_range=None):
+    """Counts over ``bins`` equal-width bins (or explicit ``edges``)."""
+    counts, edges = np.histogram(x, bins=bins if edges is None else edges,
+                                 range=None if edges is not None else value_range)
+    return {"edges": edges, "counts": counts}
+
+
+def silverman_bandwidth(x):
+    n = len(x)
+    if n < 2:
+        return 1.0
+    std = float(np.std(x, ddof=1))
+    q75, q25 = np.percentile(x, [75, 25])
+    spread = min(std, (q75 - q25) / 1.34) or std
+    return 0.9 * spread * n ** -0.2 if spread > 0 else 1e-3
+
+
+def kde(x, grid_points=200, bandwidth=None, grid_range=None):
+    """Gaussian KDE evaluated on ``grid_points`` evenly spaced points.
+
+    The samples are linearly binned onto the grid and convolved with a
+    sampled Gaussian kernel, so the cost is O(n + grid_points * kernel)
+    rather than O(n * grid_points). The default bandwidth is Silverman's
+    rule and the default grid spans the data padded by three bandwidths.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    h = float(bandwidth) if bandwidth else silverman_bandwidth(x)
+
+    if grid_range is None:
+        lo, hi = float(x.min()) - 3 * h, float(x.max()) + 3 * h
+    else:
+        lo, hi = grid_range
+    grid = np.linspace(lo, hi, grid_points)
+    dx = grid[1] - grid[0]
+
+    # Linear binning: each sample splits its weight between its two
+    # neighbouring grid points
+    pos = (x[(x >= lo) & (x <= hi)] - lo) / dx
+    left = np.minimum(np.floor(pos).astype(np.int64), grid_points - 2)
+    w = pos - left
+    weights = (np.bincount(left, 1 - w, grid_points) +
+               np.bincount(left + 1, w, grid_points))
+
+    half = min(grid_points - 1, int(math.ceil(4 * h / dx)))
+    offsets = np.arange(-half, half + 1) * dx
+    kernel = np.exp(-0.5 * (offsets / h) ** 2) / (math.sqrt(2 * math.pi) * h * len(x))
+    density = np.convolve(weights, kernel)[half:half + grid_points]
+
+    return {"x": grid, "density": density, "bandwidth": h}
+
+
+def quantiles(x, qs=DEFAULT_QUANTILES):
+    values = np.quantile(x, qs)
+    return {str(q): float(v) for q, v in zip(qs, values)}
+
+
+def summary(x):
+    if not len(x):
+        return {"count": 0}
+    return {
+        "count": int(len(x)),
+        "min": float(x.min()),
+        "max": float(x.max()),
+        "mean": float(x.mean()),
+        "std": float(x.std()),
+    }
+
+
+def _mix(ids):
+    # splitmix64 finalizer: a fixed pseudo-random key per id, so samples are
+    # identical in every worker and planets stay in the sample as the
+    # table grows
+    z = np.asarray(ids, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over="ignore"):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _smallest(keys, n):
+    if len(keys) <= n:
+        return np.arange(len(keys))
+    return np.argpartition(keys, n - 1)[:n]
+
+
+def sample_indices(ids, n, strata_values=None, strata=10):
+    """Deterministic sample of at most ``n`` row indices, in row order.
+
+    With ``strata_values`` the range of those values is cut into ``strata``
+    equal-width bands sharing ``n`` evenly, so sparse bands (the high-score
+    tail) are not drowned out by dense ones.
+    """
+    keys = _mix(ids)
+    if strata_values is None:
+        return np.sort(_smallest(keys, n))
+
+    v = np.asarray(strata_values, dtype=np.float64)
+    band = np.minimum(
+        ((v - v.min()) / ((v.max() - v.min()) or 1.0) * strata).astype(np.int64),
+        strata - 1
+    )
+    # Smallest bands first, so the quota they cannot fill passes on to the
+    # bands that follow. Quotas round up, so with n < strata the sparsest
+    # bands get the rows, and never more than what is left.
+    labels, sizes = np.unique(band, return_counts=True)
+    picked, left = [np.empty(0, dtype=np.int64)], n
+    for k, b in enumerate(labels[np.argsort(sizes, kind="stable")]):
+        if left <= 0:
+            break
+        members = np.flatnonzero(band == b)
+        take = _smallest(keys[members], -(-left // (len(labels) - k)))
+        picked.append(members[take])
+        left -= len(take)
+    return np.sort(np.concatenate(picked))
+
+
+def grid_aggregate(x, y, values, gridsize=50, x_range=None, y_range=None):
+    """Counts and mean of ``values`` per cell of a gridsize x gridsize grid.
+
+    Only non-empty cells are returned, as parallel lists of cell indices.
+    Rows with a missing coordinate are left out.
+    """
+    finite = np.isfinite(x) & np.isfinite(y) & np.isfinite(values)
+    x, y, values = x[finite], y[finite], values[finite]
+
+    x_edges = np.histogram_bin_edges(x, gridsize, x_range)
+    y_edges = np.histogram_bin_edges(y, gridsize, y_range)
+
+    inside = ((x >= x_edges[0]) & (x <= x_edges[-1]) &
+              (y >= y_edges[0]) & (y <= y_edges[-1]))
+    i = np.clip(np.searchsorted(x_edges, x[inside], side="right") - 1, 0, gridsize - 1)
+    j = np.clip(np.searchsorted(y_edges, y[inside], side="right") - 1, 0, gridsize - 1)
+    cell = i * gridsize + j
+
+    counts = np.bincount(cell, minlength=gridsize * gridsize)
+    sums = np.bincount(cell, values[inside], minlength=gridsize * gridsize)
+    nonzero = np.flatnonzero(counts)
+
+    return {
+        "x_edges": x_edges,
+        "y_edges": y_edges,
+        "i": nonzero // gridsize,
+        "j": nonzero % gridsize,
+        "count": counts[nonzero],
+        "mean_score": sums[nonzero] / counts[nonzero],
+    }
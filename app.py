@@ -1,31 +1,266 @@
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Flask, g, request, jsonify, render_template, send_file
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from flask_cors import CORS
 import numpy as np
-import joblib
+import functools
 import os
+import pickle
+import threading
+import time
+from datetime import datetime, timezone
 from io import BytesIO
-import pandas as pd
 
+import aggregates
+import columnar
+from batching import MicroBatcher
+from compression import ResponseCompressor, etag_variants
+from jobs import COMPLETED, JobNotFound, JobQueue, JobRunner
+from leaderboard import Leaderboard, VersionChanged
+from lru_cache import LRUCache
+from migrations import DB_PATH, apply_pragmas, migrate_path
+from parallel_scoring import ParallelScorer
+from prediction_cache import PredictionCache
+from reports import ExportCache, write_pdf, write_xlsx
+from result_store import ResultStore, UploadNotFound
+from shared_model import load_shared, mapping_memory, process_memory, shared_address
+from snapshot import TableSnapshot
+from upload_scoring import MissingColumns, score_upload
 
 
-# App setup
-CSV_TOP10_CACHE = []
 
+# App setup
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["X-Upload-Id", "Location"])
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///exoplanets.db"
+# One database file for the app and every script (see migrations.py)
+app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{DB_PATH}"
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Connection pool per gunicorn worker; WAL lets pooled readers run
+# alongside a writer
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+    "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 3600)),
+    "connect_args": {"timeout": 30, "check_same_thread": False},
+}
+
 db = SQLAlchemy(app)
 
-model = joblib.load("model.pkl")
-scaler = joblib.load("scaler.pkl")
-FEATURES = joblib.load("features.pkl")  
+# StandardScaler folded into the split thresholds: takes raw FEATURES values
+# (rebuild with `python tree_engine.py fuse` after retraining)
+MODEL_PATH = "model_fused.npz"
+
+# Startup mode. With LAZY_STARTUP=1 importing this module neither loads the
+# model nor touches a database: the model loads on the first prediction,
+# migrations run before the first request (or ahead of time with
+# `flask --app app init-db`), the leaderboard and snapshot fill on their
+# first read, and the upload store and job queue create their tables on
+# first use. LAZY_STARTUP=0 does all of that at import instead.
+# pandas and reportlab are only imported by the routes that use them.
+app.config["LAZY_STARTUP"] = os.environ.get("LAZY_STARTUP", "1") == "1"
+
+# Arrays live in a read-only shared mapping (see shared_model.py); under
+# gunicorn.conf.py the master loads it once and every worker inherits it
+model = None
+
+# A plain pickled list of names; no joblib needed to read it
+with open("features.pkl", "rb") as f:
+    FEATURES = pickle.load(f)
+
+app.config["PREDICT_BATCH_MAX_ROWS"] = int(os.environ.get("PREDICT_BATCH_MAX_ROWS", 100000))
+
+# CSV uploads are parsed and scored this many rows at a time
+app.config["UPLOAD_CHUNK_ROWS"] = int(os.environ.get("UPLOAD_CHUNK_ROWS", 50000))
+app.config["UPLOAD_MAX_K"] = int(os.environ.get("UPLOAD_MAX_K", 10000))
+
+# Scored uploads, shared by all workers and keyed by upload ID
+app.config["UPLOAD_STORE_PATH"] = os.environ.get(
+    "UPLOAD_STORE_PATH", os.path.join(BASE_DIR, "instance", "upload_results.db")
+)
+app.config["UPLOAD_STORE_TTL"] = float(os.environ.get("UPLOAD_STORE_TTL", 3600))
+app.config["UPLOAD_STORE_MAX_UPLOADS"] = int(os.environ.get("UPLOAD_STORE_MAX_UPLOADS", 50))
+app.config["UPLOAD_STORE_MAX_ROWS"] = int(os.environ.get("UPLOAD_STORE_MAX_ROWS", 5_000_000))
+
+upload_store = ResultStore(
+    app.config["UPLOAD_STORE_PATH"],
+    ttl=app.config["UPLOAD_STORE_TTL"],
+    max_uploads=app.config["UPLOAD_STORE_MAX_UPLOADS"],
+    max_rows=app.config["UPLOAD_STORE_MAX_ROWS"],
+)
+
+# Background scoring jobs (POST /jobs). JOB_WORKERS threads per web
+# process claim queued jobs; set it to 0 and run `python jobs.py worker`
+# to keep scoring out of the web workers entirely.
+app.config["JOB_WORKERS"] = int(os.environ.get("JOB_WORKERS", 1))
+app.config["JOB_MAX_CONCURRENT"] = int(os.environ.get("JOB_MAX_CONCURRENT", 2))
+app.config["JOB_SPOOL_DIR"] = os.environ.get(
+    "JOB_SPOOL_DIR", os.path.join(BASE_DIR, "instance", "job_uploads")
+)
+app.config["JOB_STALE_AFTER"] = float(os.environ.get("JOB_STALE_AFTER", 60))
+
+job_queue = JobQueue(
+    app.config["UPLOAD_STORE_PATH"],
+    app.config["JOB_SPOOL_DIR"],
+    max_concurrent=app.config["JOB_MAX_CONCURRENT"],
+    stale_after=app.config["JOB_STALE_AFTER"],
+    ttl=app.config["UPLOAD_STORE_TTL"],
+)
+
+# Bulk scoring (uploads, jobs, /predict_batch) on a process pool of this
+# many workers per web process; 1 scores in-process
+app.config["SCORING_WORKERS"] = int(os.environ.get("SCORING_WORKERS", 1))
+app.config["SCORING_SHARD_ROWS"] = int(os.environ.get("SCORING_SHARD_ROWS", 25000))
+
+# Micro-batching of concurrent single-row predictions
+app.config["INFERENCE_BATCHING"] = os.environ.get("INFERENCE_BATCHING", "1") == "1"
+app.config["INFERENCE_MAX_BATCH_SIZE"] = int(os.environ.get("INFERENCE_MAX_BATCH_SIZE", 64))
+app.config["INFERENCE_MAX_WAIT_US"] = int(os.environ.get("INFERENCE_MAX_WAIT_US", 1000))
+
+
+# Prediction cache (0 size disables; sig digits 0 = exact keys)
+app.config["PREDICTION_CACHE_SIZE"] = int(os.environ.get("PREDICTION_CACHE_SIZE", 50000))
+app.config["PREDICTION_CACHE_TTL"] = float(os.environ.get("PREDICTION_CACHE_TTL", 3600))
+app.config["PREDICTION_CACHE_SIG_DIGITS"] = int(os.environ.get("PREDICTION_CACHE_SIG_DIGITS", 0))
+
+# How often (seconds) to stat the model artifact for changes
+app.config["MODEL_CHECK_INTERVAL"] = float(os.environ.get("MODEL_CHECK_INTERVAL", 2))
+
+prediction_cache = PredictionCache(
+    maxsize=app.config["PREDICTION_CACHE_SIZE"],
+    ttl=app.config["PREDICTION_CACHE_TTL"],
+    sig_digits=app.config["PREDICTION_CACHE_SIG_DIGITS"],
+)
+
+
+def _artifact_stamp(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+_model_stamp = _artifact_stamp(MODEL_PATH)
+_model_checked = time.monotonic()
+_model_lock = threading.Lock()
+
+
+def refresh_model():
+    # Reload the model when its artifact changes on disk, and drop every
+    # cached score computed by the old one
+    global model, _model_stamp, _model_checked
+
+    now = time.monotonic()
+    if now - _model_checked < app.config["MODEL_CHECK_INTERVAL"]:
+        return
+
+    with _model_lock:
+        if now - _model_checked < app.config["MODEL_CHECK_INTERVAL"]:
+            return
+        _model_checked = now
+
+        try:
+            stamp = _artifact_stamp(MODEL_PATH)
+        except OSError:
+            return
+        if stamp == _model_stamp:
+            return
+
+        model = load_shared(MODEL_PATH)
+        _model_stamp = stamp
+        prediction_cache.invalidate()
+
+
+def get_model():
+    # The tree ensemble, loaded by whichever request needs it first
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                model = load_shared(MODEL_PATH)
+    return model
+
+
+def predict_raw(X):
+    # Raw model output for an (n, len(FEATURES)) matrix of unscaled values
+    return get_model().predict(X)
+
+
+bulk_scorer = None
+if app.config["SCORING_WORKERS"] > 1:
+    bulk_scorer = ParallelScorer(
+        MODEL_PATH,
+        workers=app.config["SCORING_WORKERS"],
+        shard_rows=app.config["SCORING_SHARD_ROWS"],
+    )
+
+
+def predict_bulk(X):
+    # predict_raw for large batches, sharded across cores when configured
+    # (the pool reloads the artifact itself when it changes)
+    if bulk_scorer is None:
+        refresh_model()
+        return predict_raw(X)
+    return bulk_scorer.predict(X)
+
+
+job_runner = JobRunner(
+    job_queue, upload_store, predict_bulk,
+    workers=app.config["JOB_WORKERS"],
+    features=FEATURES,
+    chunk_rows=app.config["UPLOAD_CHUNK_ROWS"],
+)
+
+
+batcher = MicroBatcher(
+    predict_raw,
+    max_batch_size=app.config["INFERENCE_MAX_BATCH_SIZE"],
+    max_wait_us=app.config["INFERENCE_MAX_WAIT_US"],
+)
+
+
+def _score_one(X):
+    if app.config["INFERENCE_BATCHING"]:
+        return batcher.submit(X[0])
+    return float(predict_raw(X)[0])
+
+
+def predict_one(X):
+    # Returns (X, score). With a quantizing cache X is replaced by the
+    # rounded key, so callers apply the Earth-like rule to the same values
+    # that were scored and hits match misses exactly.
+    refresh_model()
+
+    if not prediction_cache.enabled:
+        return X, _score_one(X)
+
+    key = prediction_cache.key(X[0])
+    X = np.array([key], dtype=np.float64)    # None (missing) back to NaN
+    return X, prediction_cache.get_or_compute(key, lambda: _score_one(X))
+
+
+# Earth-like override: inclusive (low, high) bounds per feature
+EARTH_LIKE_BOUNDS = {
+    "pl_rade": (0.8, 1.3),
+    "pl_bmasse": (0.5, 2.0),
+    "pl_eqt": (250, 320),
+    "pl_orbper": (300, 430),
+    "st_teff": (5000, 6200),
+    "st_rad": (0.8, 1.3),
+}
+EARTH_LIKE_FLOOR = 0.85
+
+_EARTH_LO = np.array([EARTH_LIKE_BOUNDS[f][0] for f in FEATURES], dtype=float)
+_EARTH_HI = np.array([EARTH_LIKE_BOUNDS[f][1] for f in FEATURES], dtype=float)
+
+
+def earth_like_mask(X):
+    # X is an (n, len(FEATURES)) array of raw (unscaled) feature values
+    X = np.asarray(X, dtype=float)
+    return np.all((X >= _EARTH_LO) & (X <= _EARTH_HI), axis=1)
 
 
 # Database model
@@ -47,17 +282,249 @@ class Exoplanet(db.Model):
 
 
 
-with app.app_context():
-    db.create_all()
+# Response compression, negotiated from Accept-Encoding (gzip always;
+# br and zstd when brotli / zstandard are installed)
+app.config["COMPRESSION"] = os.environ.get("COMPRESSION", "1") == "1"
+app.config["COMPRESSION_MIN_SIZE"] = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+app.config["COMPRESSION_GZIP_LEVEL"] = int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6))
+app.config["COMPRESSION_BR_LEVEL"] = int(os.environ.get("COMPRESSION_BR_LEVEL", 4))
+app.config["COMPRESSION_ZSTD_LEVEL"] = int(os.environ.get("COMPRESSION_ZSTD_LEVEL", 3))
+app.config["COMPRESSION_CACHE_SIZE"] = int(os.environ.get("COMPRESSION_CACHE_SIZE", 64))
 
+compressor = ResponseCompressor(
+    levels={
+        "gzip": app.config["COMPRESSION_GZIP_LEVEL"],
+        "br": app.config["COMPRESSION_BR_LEVEL"],
+        "zstd": app.config["COMPRESSION_ZSTD_LEVEL"],
+    },
+    min_size=app.config["COMPRESSION_MIN_SIZE"],
+    cache_size=app.config["COMPRESSION_CACHE_SIZE"],
+)
 
 
+@app.after_request
+def compress_response(response):
+    if app.config["COMPRESSION"]:
+        return compressor.process(request, response)
+    return response
+
+
+# Create DB / apply migrations (once per process, before its first
+# request; scripts using the models directly call init_db() themselves)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def init_db():
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            migrate_path(DB_PATH)
+            _schema_ready = True
+
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Create the database and apply pending migrations."""
+    init_db()
+    print(f"✅ {DB_PATH} is up to date")
+
+
+@app.before_request
+def ensure_schema():
+    init_db()
 
-# Create DB
 
 with app.app_context():
-    os.makedirs(os.path.join(BASE_DIR, "instance"), exist_ok=True)
-    db.create_all()
+    event.listen(db.engine, "connect", lambda conn, _: apply_pragmas(conn))
+    _engine = db.engine
+
+# Connections pooled before a fork belong to the parent process
+os.register_at_fork(after_in_child=lambda: _engine.dispose(close=False))
+
+
+# Leaderboard behind /rank and the DB exports, kept in step with every
+# score change (by any process) through the exoplanet_changes log
+app.config["LEADERBOARD_SYNC_INTERVAL"] = float(os.environ.get("LEADERBOARD_SYNC_INTERVAL", 1))
+app.config["LEADERBOARD_MAX_K"] = int(os.environ.get("LEADERBOARD_MAX_K", 1000))
+
+leaderboard = Leaderboard(
+    DB_PATH, sync_interval=app.config["LEADERBOARD_SYNC_INTERVAL"]
+)
+
+
+# Columnar copy of the table behind the analytics reads (aggregates,
+# /correlations, exports), refreshed from the same change log
+app.config["SNAPSHOT_SYNC_INTERVAL"] = float(os.environ.get("SNAPSHOT_SYNC_INTERVAL", 1))
+
+table_snapshot = TableSnapshot(
+    DB_PATH, sync_interval=app.config["SNAPSHOT_SYNC_INTERVAL"]
+)
+
+
+def warm_up():
+    # Everything LAZY_STARTUP defers to first use
+    init_db()
+    upload_store.create_schema()
+    job_queue.create_schema()
+    get_model()
+    leaderboard.sync(force=True)
+    table_snapshot.sync(force=True)
+
+
+if not app.config["LAZY_STARTUP"]:
+    warm_up()
+
+
+# Dashboard aggregates, cached per (data version, parameters): a score
+# change anywhere bumps the version, so stale entries are never served.
+# Keys come from client parameters and entries can hold table-sized
+# arrays, so the cache is bounded in bytes as well as entries, and the
+# parameters that size a result are capped (400 beyond the cap)
+app.config["QUERY_CACHE_SIZE"] = int(os.environ.get("QUERY_CACHE_SIZE", 256))
+app.config["QUERY_CACHE_TTL"] = float(os.environ.get("QUERY_CACHE_TTL", 3600))
+app.config["QUERY_CACHE_MAX_BYTES"] = int(os.environ.get("QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+app.config["DISTRIBUTION_MAX_BINS"] = int(os.environ.get("DISTRIBUTION_MAX_BINS", 1000))
+app.config["DISTRIBUTION_MAX_GRID"] = int(os.environ.get("DISTRIBUTION_MAX_GRID", 1024))
+app.config["DISTRIBUTION_MAX_QUANTILES"] = int(os.environ.get("DISTRIBUTION_MAX_QUANTILES", 101))
+app.config["CORRELATIONS_MAX_N"] = int(os.environ.get("CORRELATIONS_MAX_N", 20000))
+app.config["CORRELATIONS_MAX_GRIDSIZE"] = int(os.environ.get("CORRELATIONS_MAX_GRIDSIZE", 200))
+
+query_cache = LRUCache(
+    maxsize=app.config["QUERY_CACHE_SIZE"],
+    ttl=app.config["QUERY_CACHE_TTL"],
+    max_bytes=app.config["QUERY_CACHE_MAX_BYTES"],
+)
+
+
+def score_array(table):
+    # Every non-null habitability_score of a snapshot, as float64
+    return query_cache.get_or_compute(
+        ("scores", table.version),
+        lambda: table.score[table.scored].astype(np.float64)
+    )
+
+
+def wants_columns():
+    # ?format=columns, or an Accept header preferring the columnar type
+    if request.args.get("format"):
+        return request.args["format"] == "columns"
+    return request.accept_mimetypes.best_match(
+        ["application/json", columnar.MIMETYPE]
+    ) == columnar.MIMETYPE
+
+
+def respond(data):
+    # NumPy arrays in ``data`` go out as JSON lists or as raw binary
+    # columns, whichever the client asked for
+    if wants_columns():
+        response = app.response_class(columnar.encode(data), mimetype=columnar.MIMETYPE)
+    else:
+        response = jsonify(columnar.to_builtin(data))
+    response.vary.add("Accept")
+    return response
+
+
+def pinned_table():
+    # The snapshot, with the leaderboard synced to the same data version so
+    # views reading either one render what the ETag names
+    table = table_snapshot.current()
+    leaderboard.sync()
+    for _ in range(3):
+        if (leaderboard.version, leaderboard.database) == (table.version, table.database):
+            break
+        leaderboard.sync(force=True)
+        table = table_snapshot.current(force=True)
+    return table
+
+
+def current_table():
+    # The snapshot versioned() built this response's ETag from, else the latest
+    table = g.get("table")
+    return table if table is not None else table_snapshot.current()
+
+
+def board_version():
+    # Version leaderboard reads must be at (None outside versioned views)
+    table = g.get("table")
+    return None if table is None else table.version
+
+
+def versioned(data=True):
+    # ETag and Last-Modified from the model artifact's stamp and, with
+    # data=True, the data version (the exoplanet_changes sequence, bumped
+    # by every write to a planet). Both are the same in every worker, so a
+    # conditional request gets its 304 here, before the view runs.
+    #
+    # The view renders from the same pinned snapshot (current_table()), and
+    # its leaderboard reads raise VersionChanged if the board moved on
+    # meanwhile; the response is then rebuilt at the new version. If writes
+    # keep landing mid-render it goes out uncached, without validators.
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            for _ in range(3):
+                try:
+                    return _versioned_response(view, data, args, kwargs)
+                except VersionChanged:
+                    continue
+
+            g.table = None
+            response = app.make_response(view(*args, **kwargs))
+            response.cache_control.no_store = True
+            return response
+        return wrapper
+    return decorate
+
+
+def _versioned_response(view, data, args, kwargs):
+    refresh_model()
+    mtime_ns, size = _model_stamp
+    etag = f"m{mtime_ns:x}.{size:x}"
+    modified = mtime_ns / 1e9
+    if data:
+        g.table = table = pinned_table()
+        etag = f"d{table.version}.{(table.database or '')[:8]}-{etag}"
+        modified = max(modified, table.modified or os.path.getmtime(DB_PATH))
+    etag += "-columns" if wants_columns() else "-json"
+    last_modified = datetime.fromtimestamp(int(modified), timezone.utc)
+
+    # The client may hold a compressed variant (see compression.py)
+    matched = None
+    if request.if_none_match:
+        matched = next((tag for tag in etag_variants(etag)
+                        if request.if_none_match.contains(tag)), None)
+    elif (request.if_modified_since is not None and
+          last_modified <= request.if_modified_since):
+        matched = etag
+
+    if matched:
+        response = app.response_class(status=304)
+    else:
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code != 200:
+            return response
+
+    response.set_etag(matched or etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    response.vary.add("Accept")
+    return response
+
+
+def _float_list(value):
+    return tuple(float(v) for v in value.split(",") if v.strip())
+
+
+def top_planets(k=10):
+    # Rows (dicts, see snapshot.Columns.rows) of the current top k, best first
+    if board_version() is None:
+        leaderboard.sync()
+    ids = [pid for _, pid, _, _ in leaderboard.top(k, version=board_version())]
+    return current_table().rows(ids)
 
 
 # Health check
@@ -98,6 +565,15 @@ def add_exoplanet():
     if Exoplanet.query.filter_by(name=data["name"]).first():
         return jsonify({"message": "Planet already exists"}), 409
 
+    try:
+        X = np.array([[float(data[f]) for f in FEATURES]])
+    except (TypeError, ValueError):
+        return jsonify({"error": "Feature values must be numeric"}), 400
+
+    # Scored like rescore.py scores the table, so the planet is ranked
+    # straight away
+    refresh_model()
+
     planet = Exoplanet(
         name=data["name"],
         pl_rade=data["pl_rade"],
@@ -105,11 +581,14 @@ def add_exoplanet():
         pl_eqt=data["pl_eqt"],
         pl_orbper=data["pl_orbper"],
         st_teff=data["st_teff"],
-        st_rad=data["st_rad"]
+        st_rad=data["st_rad"],
+        habitability_score=float(predict_raw(X)[0])
     )
 
     db.session.add(planet)
     db.session.commit()
+    leaderboard.sync(force=True)
+    table_snapshot.sync(force=True)
 
     return jsonify({"message": "Planet added successfully"})
 
@@ -127,28 +606,10 @@ def predict():
         return jsonify({"error": f"Missing feature {e}"}), 400
 
     
-    X_scaled = scaler.transform(X)
-    prob = float(model.predict(X_scaled)[0])
-
-
-    pl_rade = data["pl_rade"]
-    pl_bmasse = data["pl_bmasse"]
-    pl_eqt = data["pl_eqt"]
-    pl_orbper = data["pl_orbper"]
-    st_teff = data["st_teff"]
-    st_rad = data["st_rad"]
-
-    is_earth_like = (
-        0.8 <= pl_rade <= 1.3 and
-        0.5 <= pl_bmasse <= 2.0 and
-        250 <= pl_eqt <= 320 and
-        300 <= pl_orbper <= 430 and
-        5000 <= st_teff <= 6200 and
-        0.8 <= st_rad <= 1.3
-    )
+    X, prob = predict_one(X)
 
-    if is_earth_like:
-        prob = max(prob, 0.85)
+    if earth_like_mask(X)[0]:
+        prob = max(prob, EARTH_LIKE_FLOOR)
 
     habitability = int(prob >= 0.5)
 
@@ -157,26 +618,224 @@ def predict():
         "habitability_probability": round(prob, 4),
     })
 
+
+# Batch Prediction
+#
+# Accepts either a list of feature records:
+#   {"records": [{"pl_rade": 1.0, ...}, ...]}   (or a bare JSON list)
+# or the compact columnar form:
+#   {"columns": {"pl_rade": [...], "pl_bmasse": [...], ...}}
+#
+# All valid rows are scored with a single model call. Rows with a
+# missing or non-numeric feature are reported individually instead of
+# failing the whole batch.
+
+# JSON numbers and null; bools and strings are rejected in columnar batches
+_COLUMN_VALUE_TYPES = {int, float, type(None)}
+
+
+def _column_to_float(values):
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=float)
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def _records_to_matrix(records):
+    X = np.full((len(records), len(FEATURES)), np.nan)
+    errors = {}
+
+    for i, rec in enumerate(records):
+        if not isinstance(rec, dict):
+            errors[i] = "Record must be an object"
+            continue
+        missing = [f for f in FEATURES if f not in rec]
+        if missing:
+            errors[i] = f"Missing feature: {missing[0]}"
+            continue
+        # float(True) is 1.0; booleans are no more a number here than in
+        # the columnar form
+        if any(isinstance(rec[f], bool) for f in FEATURES):
+            errors[i] = "Non-numeric feature value"
+            continue
+        try:
+            X[i] = [float(rec[f]) for f in FEATURES]
+        except (TypeError, ValueError):
+            errors[i] = "Non-numeric feature value"
+
+    return X, errors
+
+
+def score_batch(X):
+    # Returns (probabilities, valid_mask) for an (n, len(FEATURES)) matrix.
+    # Rows containing NaN/inf are left unscored (probability NaN).
+    valid = np.all(np.isfinite(X), axis=1)
+    prob = np.full(len(X), np.nan)
+
+    if valid.any():
+        Xv = X[valid]
+        scores = predict_bulk(Xv).astype(float)
+        scores = np.where(earth_like_mask(Xv),
+                          np.maximum(scores, EARTH_LIKE_FLOOR), scores)
+        prob[valid] = scores
+
+    return prob, valid
+
+
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch():
+    data = request.get_json(silent=True)
+
+    if isinstance(data, dict) and "columns" in data:
+        columns = data["columns"]
+        if not isinstance(columns, dict):
+            return jsonify({"error": "'columns' must be an object"}), 400
+
+        missing = [f for f in FEATURES if f not in columns]
+        if missing:
+            return jsonify({
+                "error": "Missing required columns",
+                "missing_columns": missing
+            }), 400
+
+        for f in FEATURES:
+            if not isinstance(columns[f], list) or not all(
+                    type(v) in _COLUMN_VALUE_TYPES for v in columns[f]):
+                return jsonify({
+                    "error": f"Column '{f}' must be a list of numbers (null for missing)",
+                    "field": f
+                }), 400
+
+        lengths = {len(columns[f]) for f in FEATURES}
+        if len(lengths) != 1:
+            return jsonify({"error": "All feature columns must have the same length"}), 400
+
+        X = np.column_stack([_column_to_float(columns[f]) for f in FEATURES])
+        errors = {}
+        columnar = True
+    else:
+        records = data.get("records") if isinstance(data, dict) else data
+        if not isinstance(records, list):
+            return jsonify({
+                "error": "Expected a list of records or a 'columns' object",
+                "required_features": FEATURES
+            }), 400
+
+        X, errors = _records_to_matrix(records)
+        columnar = False
+
+    if len(X) > app.config["PREDICT_BATCH_MAX_ROWS"]:
+        return jsonify({
+            "error": f"Batch too large (max {app.config['PREDICT_BATCH_MAX_ROWS']} rows)"
+        }), 413
+
+    prob, valid = score_batch(X)
+
+    for i in np.flatnonzero(~valid):
+        errors.setdefault(int(i), "Missing or non-numeric feature value")
+
+    habitability = (prob >= 0.5).astype(int)
+    prob_rounded = np.round(prob, 4)
+
+    if columnar:
+        return jsonify({
+            "habitability": [int(h) if v else None for h, v in zip(habitability, valid)],
+            "habitability_probability": [float(p) if v else None for p, v in zip(prob_rounded, valid)],
+            "errors": {str(i): msg for i, msg in sorted(errors.items())},
+            "scored": int(valid.sum()),
+            "failed": len(errors)
+        })
+
+    results = []
+    for i in range(len(X)):
+        if i in errors:
+            results.append({"index": i, "error": errors[i]})
+        else:
+            results.append({
+                "index": i,
+                "habitability": int(habitability[i]),
+                "habitability_probability": float(prob_rounded[i])
+            })
+
+    return jsonify({
+        "results": results,
+        "scored": int(valid.sum()),
+        "failed": len(errors)
+    })
+
 # Rank Top 10 Habitable Planets
 
 @app.route("/rank", methods=["GET"])
+@versioned()
 def rank():
-    planets = (
-        Exoplanet.query
-        .filter(Exoplanet.habitability_score.isnot(None))
-        .order_by(Exoplanet.rank.asc())
-        .limit(10)
-        .all()
-    )
-
-    return jsonify([
+    try:
+        k = int(request.args.get("k", 10))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "k and offset must be integers"}), 400
+    if offset < 0 or not 1 <= k <= app.config["LEADERBOARD_MAX_K"]:
+        return jsonify({"error": f"k must be between 1 and {app.config['LEADERBOARD_MAX_K']}"}), 400
+
+    entries = leaderboard.top(k, offset, version=board_version())
+
+    if wants_columns():
+        # One array per field instead of one object per planet
+        return respond({
+            "rank": np.array([r for r, _, _, _ in entries], dtype=np.int32),
+            "planet_name": [name for _, _, name, _ in entries],
+            "habitability_score": np.array([s for _, _, _, s in entries]),
+        })
+
+    return respond([
         {
-            "rank": p.rank,
-            "planet_name": p.name,
-            "habitability_score": round(p.habitability_score, 10)
+            "rank": r,
+            "planet_name": name,
+            "habitability_score": round(score, 10)
         }
-        for p in planets
+        for r, _, name, score in entries
     ])
+
+
+@app.route("/rank/<path:planet_name>", methods=["GET"])
+@versioned()
+def planet_rank(planet_name):
+    entry = leaderboard.rank_of(planet_name, version=board_version())
+    if entry is None:
+        return jsonify({"error": "Planet not found or not scored yet"}), 404
+
+    entry.pop("id")
+    return jsonify(entry)
+
+
+@app.route("/leaderboard_stats", methods=["GET"])
+def leaderboard_stats():
+    return jsonify(leaderboard.stats())
+
+
+@app.route("/snapshot_stats", methods=["GET"])
+def snapshot_stats():
+    return jsonify(table_snapshot.stats())
+
+
+@app.route("/memory_stats", methods=["GET"])
+def memory_stats():
+    # This worker's own (USS) and proportional (PSS) memory, and how much
+    # of the model mapping is still shared with the other workers
+    report = {"pid": os.getpid(), "process": process_memory(), "model": None}
+    if model is not None:
+        report["model"] = {
+            "bytes": model._shared_bytes,
+            "mapping": mapping_memory(shared_address(model)),
+        }
+    return jsonify(report)
+
+
 @app.route("/secure_predict", methods=["POST"])
 def secure_predict():
 
@@ -202,204 +861,458 @@ def secure_predict():
         }), 400
 
 
-    X_scaled = scaler.transform(X)
-    score = float(model.predict(X_scaled)[0])
+    X, score = predict_one(X)
 
     return jsonify({
         "status": "success",
         "secure": True,
         "habitability_score": round(score, 6)
     })
+@app.route("/batching_stats", methods=["GET"])
+def batching_stats():
+    stats = batcher.stats()
+    stats["enabled"] = app.config["INFERENCE_BATCHING"]
+    return jsonify(stats)
+
+
+@app.route("/compression_stats", methods=["GET"])
+def compression_stats():
+    stats = compressor.stats()
+    stats["enabled"] = app.config["COMPRESSION"]
+    return jsonify(stats)
+
+
+@app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    stats = prediction_cache.stats()
+    stats["query_cache"] = query_cache.stats()
+    return jsonify(stats)
+
+
 @app.route("/feature_importance", methods=["GET"])
+@versioned(data=False)
 def feature_importance():
-    importance = model.feature_importances_.tolist()
-
-    return jsonify({
+    return respond({
         "features": FEATURES,
-        "importance": importance
+        "importance": np.asarray(get_model().feature_importances_)
     })
+# Histogram (bins=N or edges=a,b,c; optional range=lo,hi), quantiles
+# (quantiles=0.1,0.5,...) and, with kde=1, a Gaussian KDE on grid=N points
+# (optional bandwidth=h). raw=1 returns the full list of scores instead
+# (not cached: it is the snapshot's own column).
 @app.route("/score_distribution", methods=["GET"])
+@versioned()
 def score_distribution():
-    scores = db.session.query(Exoplanet.habitability_score)\
-        .filter(Exoplanet.habitability_score.isnot(None)).all()
+    table = current_table()
+
+    if request.args.get("raw") == "1":
+        # Scores are float32 model outputs, so float32 columns are exact
+        return respond(table.score[table.scored])
+
+    try:
+        bins = int(request.args.get("bins", 30))
+        edges = _float_list(request.args.get("edges", "")) or None
+        value_range = _float_list(request.args.get("range", "")) or None
+        qs = (_float_list(request.args.get("quantiles", "")) or
+              aggregates.DEFAULT_QUANTILES)
+        with_kde = request.args.get("kde") == "1"
+        grid = int(request.args.get("grid", 200))
+        bandwidth = float(request.args.get("bandwidth", 0)) or None
+    except ValueError:
+        return jsonify({"error": "Invalid numeric parameter"}), 400
+
+    if edges is not None and (len(edges) < 2 or any(b <= a for a, b in zip(edges, edges[1:]))):
+        return jsonify({"error": "edges must be at least two increasing values"}), 400
+    if value_range is not None and (len(value_range) != 2 or value_range[1] <= value_range[0]):
+        return jsonify({"error": "range must be lo,hi with lo < hi"}), 400
+    max_bins, max_grid = app.config["DISTRIBUTION_MAX_BINS"], app.config["DISTRIBUTION_MAX_GRID"]
+    if not 1 <= bins <= max_bins or (edges is not None and len(edges) > max_bins + 1):
+        return jsonify({"error": f"At most {max_bins} bins"}), 400
+    if not 2 <= grid <= max_grid:
+        return jsonify({"error": f"grid must be between 2 and {max_grid}"}), 400
+    if len(qs) > app.config["DISTRIBUTION_MAX_QUANTILES"]:
+        return jsonify({"error": f"At most {app.config['DISTRIBUTION_MAX_QUANTILES']} quantiles"}), 400
+    if any(not 0 <= q <= 1 for q in qs):
+        return jsonify({"error": "quantiles must be between 0 and 1"}), 400
+
+    def compute():
+        scores = score_array(table)
+        result = aggregates.summary(scores)
+        if len(scores):
+            result["histogram"] = aggregates.histogram(scores, bins, edges, value_range)
+            result["quantiles"] = aggregates.quantiles(scores, qs)
+            if with_kde:
+                result["kde"] = aggregates.kde(scores, grid, bandwidth)
+        return result
+
+    key = ("score_distribution", table.version, bins, edges, value_range, qs,
+           with_kde, grid, bandwidth)
+    return respond(query_cache.get_or_compute(key, compute))
+# Columns /correlations can project ("score" is habitability_score)
+CORRELATION_COLUMNS = {f: f for f in FEATURES}
+CORRELATION_COLUMNS["score"] = "habitability_score"
+
+
+def column_arrays(table, columns):
+    # id plus the requested columns of every scored planet in a snapshot
+    def load():
+        arrays = {
+            c: table.column(CORRELATION_COLUMNS[c])[table.scored].astype(np.float64)
+            for c in columns
+        }
+        arrays["id"] = table.ids[table.scored]
+        return arrays
+
+    return query_cache.get_or_compute(("columns", table.version, columns), load)
 
-    scores = [s[0] for s in scores]
 
-    return jsonify(scores)
+# mode=full (every point), mode=sample (n points; strategy=random, or
+# stratified by score) or mode=grid (gridsize x gridsize cells of x, y with
+# count and mean score). columns=a,b,c picks the projected columns for
+# full/sample; grid uses x= and y=. mode=full is not cached as a result:
+# it is a projection of the cached column arrays.
 @app.route("/correlations", methods=["GET"])
+@versioned()
 def correlations():
-    rows = Exoplanet.query.filter(
-        Exoplanet.habitability_score.isnot(None)
-    ).all()
+    mode = request.args.get("mode", "full")
+    if mode not in ("full", "sample", "grid"):
+        return jsonify({"error": "mode must be full, sample or grid"}), 400
+
+    x, y = request.args.get("x", "st_teff"), request.args.get("y", "score")
+    if mode == "grid":
+        columns = (x, y)
+    else:
+        columns = tuple(dict.fromkeys(
+            c.strip() for c in request.args.get("columns", "st_teff,pl_eqt,score").split(",")
+            if c.strip()
+        ))
+    unknown = [c for c in columns if c not in CORRELATION_COLUMNS]
+    if unknown or not columns:
+        return jsonify({
+            "error": f"Unknown columns: {', '.join(unknown)}" if unknown else "No columns requested",
+            "available_columns": list(CORRELATION_COLUMNS)
+        }), 400
 
-    return jsonify({
-        "st_teff": [r.st_teff for r in rows],
-        "pl_eqt": [r.pl_eqt for r in rows],
-        "score": [r.habitability_score for r in rows]
+    try:
+        n = int(request.args.get("n", 2000))
+        gridsize = int(request.args.get("gridsize", 50))
+    except ValueError:
+        return jsonify({"error": "n and gridsize must be integers"}), 400
+    strategy = request.args.get("strategy", "random")
+    if strategy not in ("random", "stratified"):
+        return jsonify({"error": "strategy must be random or stratified"}), 400
+    max_n, max_gridsize = app.config["CORRELATIONS_MAX_N"], app.config["CORRELATIONS_MAX_GRIDSIZE"]
+    if not 1 <= n <= max_n or not 1 <= gridsize <= max_gridsize:
+        return jsonify({"error": f"n must be 1..{max_n} and gridsize 1..{max_gridsize}"}), 400
+
+    table = current_table()
+
+    def compute():
+        # score is always fetched: grid cells average it, strata split on it
+        arrays = column_arrays(table, tuple(dict.fromkeys(columns + ("score",))))
+        result = {"mode": mode, "count": len(arrays["id"])}
+
+        if mode == "grid":
+            result.update(x=x, y=y, gridsize=gridsize)
+            result.update(aggregates.grid_aggregate(arrays[x], arrays[y], arrays["score"], gridsize))
+            return result
+
+        idx = slice(None)
+        if mode == "sample":
+            strata = arrays["score"] if strategy == "stratified" else None
+            idx = aggregates.sample_indices(arrays["id"], n, strata)
+            result["strategy"] = strategy
+        for c in columns:
+            result[c] = arrays[c][idx]
+            if c == "score":
+                # float32 model outputs: exact, and half the bytes as columns
+                result[c] = result[c].astype(np.float32)
+        result["returned"] = len(result[columns[0]])
+        return result
+
+    if mode == "full":
+        return respond(compute())
+    key = ("correlations", table.version, mode, columns, n, strategy, gridsize)
+    return respond(query_cache.get_or_compute(key, compute))
+# Pearson correlation of the features and the score over scored planets,
+# with pairwise deletion of missing values (as DataFrame.corr() does). The
+# snapshot keeps the running sums current as planets change, so this is
+# O(1) in the table size. null marks pairs with no defined correlation.
+@app.route("/correlation_matrix", methods=["GET"])
+@versioned()
+def correlation_matrix():
+    table = current_table()
+    acc = table.correlations
+    corr = acc.correlation()
+
+    return respond({
+        "columns": acc.columns,
+        "matrix": [[None if v != v else v for v in row] for row in corr.tolist()],
+        "count": int(acc.n[-1, -1]),
+        "pair_counts": acc.n.astype(np.int64).tolist(),
+        "version": table.version,
     })
+
+
 @app.route("/export_top10", methods=["GET"])
 def export_top10():
     import pandas as pd
 
-    planets = Exoplanet.query.order_by(
-        Exoplanet.habitability_score.desc()
-    ).limit(10).all()
+    planets = top_planets(10)
 
     df = pd.DataFrame([{
-        "Planet": p.name,
-        "Score": p.habitability_score,
-        "Radius": p.pl_rade,
-        "Mass": p.pl_bmasse
+        "Planet": p["name"],
+        "Score": p["habitability_score"],
+        "Radius": p["pl_rade"],
+        "Mass": p["pl_bmasse"]
     } for p in planets])
 
     path = "exoplanets_clean_fill.csv"
     df.to_csv(path, index=False)
 
     return jsonify({"file": path})
-from flask import render_template
+
 
 @app.route("/dashboard")
 def dashboard():
     return render_template("dashboard.html")
-import pandas as pd
-from flask import send_file
-from io import BytesIO
 
-@app.route("/export/excel")
-def export_excel():
 
-    planets = (
-        Exoplanet.query
-        .filter(Exoplanet.habitability_score.isnot(None))
-        .order_by(Exoplanet.habitability_score.desc())
-        .limit(10)
-        .all()
+# Top-planet reports, built once per (database, data version, format, k) into
+# EXPORT_CACHE_DIR and streamed from there (see reports.py); a
+# max files of 0 builds every request into a temporary file instead
+app.config["EXPORT_MAX_K"] = int(os.environ.get("EXPORT_MAX_K", 10000))
+app.config["EXPORT_CACHE_DIR"] = os.environ.get(
+    "EXPORT_CACHE_DIR", os.path.join(BASE_DIR, "instance", "export_cache")
+)
+app.config["EXPORT_CACHE_MAX_FILES"] = int(os.environ.get("EXPORT_CACHE_MAX_FILES", 32))
+
+export_cache = ExportCache(
+    app.config["EXPORT_CACHE_DIR"], max_files=app.config["EXPORT_CACHE_MAX_FILES"]
+)
+
+
+def iter_top_planets(k, chunk_rows=1000):
+    # top_planets(k) a chunk of rows at a time, all from one snapshot
+    if board_version() is None:
+        leaderboard.sync()
+    ids = [pid for _, pid, _, _ in leaderboard.top(k, version=board_version())]
+    table = current_table()
+    for start in range(0, len(ids), chunk_rows):
+        yield from table.rows(ids[start:start + chunk_rows])
+
+
+def export_report(fmt, write, mimetype, download_name):
+    k = request.args.get("k", 10, type=int)
+    if not 1 <= k <= app.config["EXPORT_MAX_K"]:
+        return jsonify({"error": f"k must be between 1 and {app.config['EXPORT_MAX_K']}"}), 400
+
+    # The snapshot versioned() pinned for the ETag, so the body matches it
+    table = current_table()
+    report = export_cache.get_or_build(
+        table.database, table.version, fmt, k,
+        lambda out: write(iter_top_planets(k), out)
     )
-
-    data = [{
-        "Rank": i + 1,
-        "Planet Name": p.name,
-        "Planet Radius": p.pl_rade,
-        "Planet Mass": p.pl_bmasse,
-        "Equilibrium Temp": p.pl_eqt,
-        "Orbital Period": p.pl_orbper,
-        "Star Temp": p.st_teff,
-        "Star Radius": p.st_rad,
-        "Habitability Score": round(p.habitability_score, 4)
-    } for i, p in enumerate(planets)]
-
-    df = pd.DataFrame(data)
-
-    output = BytesIO()
-    df.to_excel(output, index=False, sheet_name="Top Habitable Planets")
-    output.seek(0)
-
+    # ETag and Last-Modified come from versioned()
     return send_file(
-        output,
-        download_name="top_habitable_exoplanets.xlsx",
-        as_attachment=True
+        report,
+        mimetype=mimetype,
+        download_name=download_name,
+        as_attachment=True,
+        conditional=False,
+        etag=False
     )
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 
-@app.route("/export/pdf")
-def export_pdf():
 
-    planets = (
-        Exoplanet.query
-        .filter(Exoplanet.habitability_score.isnot(None))
-        .order_by(Exoplanet.habitability_score.desc())
-        .limit(10)
-        .all()
+@app.route("/export/excel")
+@versioned()
+def export_excel():
+    return export_report(
+        "xlsx", write_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "top_habitable_exoplanets.xlsx"
     )
 
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-
-    width, height = A4
-    y = height - 40
-
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, y, "Top 10 Habitable Exoplanets Report")
-    y -= 30
 
-    c.setFont("Helvetica", 10)
+@app.route("/export/pdf")
+@versioned()
+def export_pdf():
+    k = request.args.get("k", 10, type=int)
+    return export_report(
+        "pdf", lambda planets, out: write_pdf(planets, out, k),
+        "application/pdf",
+        "top_habitable_exoplanets.pdf"
+    )
 
-    for i, p in enumerate(planets, start=1):
-        text = (
-            f"{i}. {p.name} | "
-            f"Score: {round(p.habitability_score,4)} | "
-            f"Radius: {p.pl_rade} | "
-            f"Mass: {p.pl_bmasse}"
-        )
-        c.drawString(50, y, text)
-        y -= 18
 
-        if y < 60:
-            c.showPage()
-            y = height - 40
-            c.setFont("Helvetica", 10)
+@app.route("/export_stats", methods=["GET"])
+def export_stats():
+    return jsonify(export_cache.stats())
 
-    c.save()
-    buffer.seek(0)
 
-    return send_file(
-        buffer,
-        download_name="top_habitable_exoplanets.pdf",
-        as_attachment=True
-    )
 @app.route("/upload_csv_rank", methods=["POST"])
 def upload_csv_rank():
     import pandas as pd
 
-    global CSV_TOP10_CACHE
-
     if "file" not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
 
     file = request.files["file"]
-    df = pd.read_csv(file)
 
-    # Validate required features
-    missing = [f for f in FEATURES if f not in df.columns]
-    if missing:
+    try:
+        k = int(request.values.get("k", 10))
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    if not 1 <= k <= app.config["UPLOAD_MAX_K"]:
+        return jsonify({"error": f"k must be between 1 and {app.config['UPLOAD_MAX_K']}"}), 400
+
+    # Stream: parse, score and keep the top k chunk by chunk, persisting
+    # every scored row so exports can be served by any worker
+    upload_id = upload_store.create(k)
+    scored = False
+    try:
+        top = score_upload(
+            file.stream, FEATURES, predict_bulk,
+            k=k, chunk_rows=app.config["UPLOAD_CHUNK_ROWS"],
+            on_chunk=lambda chunk, scores: upload_store.append(upload_id, chunk, scores)
+        )
+        scored = True
+    except MissingColumns as e:
         return jsonify({
             "error": "Missing required columns",
-            "missing_columns": missing
+            "missing_columns": e.missing
         }), 400
-
-    # Predict
-    X = df[FEATURES]
-    X_scaled = scaler.transform(X)
-    df["habitability_score"] = model.predict(X_scaled)
-
-    
-    df_top10 = (
-        df.sort_values("habitability_score", ascending=False)
-          .head(10)
-          .reset_index(drop=True)
-    )
-
-
-    CSV_TOP10_CACHE = [{
-        "rank": i + 1,   
+    except pd.errors.EmptyDataError:
+        return jsonify({"error": "Uploaded CSV is empty"}), 400
+    except (ValueError, pd.errors.ParserError) as e:
+        # Malformed CSV, or a feature cell that isn't a number
+        return jsonify({"error": f"Could not read the uploaded CSV: {e}"}), 400
+    finally:
+        # No partial upload is left behind, whatever went wrong
+        if not scored:
+            upload_store.discard(upload_id)
+
+    upload_store.finish(upload_id)
+
+    df_top10 = top.result()
+
+    results = [{
+        "rank": i + 1,
         "planet_name": row.get("pl_name", f"Planet {i+1}"),
         "habitability_score": round(row["habitability_score"], 4),
         "pl_rade": row["pl_rade"],
         "pl_bmasse": row["pl_bmasse"]
     } for i, row in df_top10.iterrows()]
 
-    return jsonify(CSV_TOP10_CACHE)
+    response = jsonify(results)
+    response.headers["X-Upload-Id"] = upload_id
+    return response
+
+
+def _upload_records(rows):
+    return [{
+        "rank": r["rank"],
+        "planet_name": r["planet_name"] or f"Planet {r['rank']}",
+        "habitability_score": round(r["habitability_score"], 4),
+        "pl_rade": r["pl_rade"],
+        "pl_bmasse": r["pl_bmasse"]
+    } for r in rows]
+
+
+def _csv_ranking():
+    """(records, None) for the upload named by ?upload_id=, else (None, 400 response).
+
+    Only the client holding an upload's ID can export it."""
+    upload_id = request.args.get("upload_id")
+    if not upload_id:
+        return None, (jsonify({"error": "upload_id is required"}), 400)
+    try:
+        return _upload_records(upload_store.top(upload_id)), None
+    except UploadNotFound:
+        return None, (jsonify({"error": "Upload not found or expired"}), 400)
+
+
+@app.route("/upload_results/<upload_id>")
+def upload_results(upload_id):
+    try:
+        k = int(request.args.get("k", 0)) or None
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "k and offset must be integers"}), 400
+    if offset < 0 or (k is not None and not 1 <= k <= app.config["UPLOAD_MAX_K"]):
+        return jsonify({"error": f"k must be between 1 and {app.config['UPLOAD_MAX_K']}"}), 400
+
+    try:
+        meta = upload_store.meta(upload_id)
+        rows = upload_store.top(upload_id, k=k, offset=offset)
+    except UploadNotFound:
+        return jsonify({"error": "Upload not found or expired"}), 404
+
+    meta["results"] = _upload_records(rows)
+    return jsonify(meta)
+
+# -------------------------------------------------
+# Background scoring jobs
+# -------------------------------------------------
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    if "file" not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    try:
+        k = int(request.values.get("k", 10))
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    if not 1 <= k <= app.config["UPLOAD_MAX_K"]:
+        return jsonify({"error": f"k must be between 1 and {app.config['UPLOAD_MAX_K']}"}), 400
+
+    job_id = job_queue.submit(request.files["file"], k)
+    job_runner.ensure_started()
+
+    response = jsonify(job_queue.get(job_id))
+    response.status_code = 202
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return response
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job_runner.ensure_started()
+    try:
+        return jsonify(job_queue.get(job_id))
+    except JobNotFound:
+        return jsonify({"error": "Job not found"}), 404
+
+
+@app.route("/jobs/<job_id>/results")
+def job_results(job_id):
+    try:
+        job = job_queue.get(job_id)
+    except JobNotFound:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] != COMPLETED:
+        return jsonify({"error": f"Job is {job['status']}", "status": job["status"]}), 409
+
+    return upload_results(job_id)
+
+
+@app.route("/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    try:
+        job_queue.cancel(job_id)
+        return jsonify(job_queue.get(job_id))
+    except JobNotFound:
+        return jsonify({"error": "Job not found"}), 404
 
 @app.route("/export/csv_excel")
 def export_csv_excel():
-    from io import BytesIO
     import pandas as pd
 
-    if not CSV_TOP10_CACHE:
-        return jsonify({"error": "No CSV ranking available"}), 400
+    ranking, error = _csv_ranking()
+    if error:
+        return error
 
-    df = pd.DataFrame(CSV_TOP10_CACHE)
+    df = pd.DataFrame(ranking)
 
     output = BytesIO()
     df.to_excel(output, index=False)
@@ -412,30 +1325,15 @@ def export_csv_excel():
     )
 @app.route("/export/csv_pdf")
 def export_csv_pdf():
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas
-    from io import BytesIO
-
-    if not CSV_TOP10_CACHE:
-        return jsonify({"error": "No CSV ranking available"}), 400
+    ranking, error = _csv_ranking()
+    if error:
+        return error
 
+    # Same layout (and page breaks) as /export/pdf
+    planets = ({"name": p["planet_name"], **p} for p in ranking)
     buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    y = 800
-
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(50, y, "Top 10 Habitable Exoplanets (CSV Upload)")
-    y -= 30
-
-    c.setFont("Helvetica", 10)
-    for p in CSV_TOP10_CACHE:
-        c.drawString(
-            50, y,
-            f"{p['rank']}. {p['planet_name']} | Score: {p['habitability_score']}"
-        )
-        y -= 18
-
-    c.save()
+    write_pdf(planets, buffer, len(ranking),
+              title=f"Top {len(ranking)} Habitable Exoplanets (CSV Upload)")
     buffer.seek(0)
 
     return send_file(
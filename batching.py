@@ -0,0 +1,154 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Collects concurrent single-row scoring calls into one batched call.
+
+    Callers block in ``submit`` while a background thread gathers up to
+    ``max_batch_size`` rows, waiting at most ``max_wait_us`` microseconds
+    after the first row arrives, and scores them with one ``score_fn`` call.
+    If no other caller is in flight the batch is dispatched immediately, so
+    a lone request never pays the wait window.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_us=1000):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_us = max(0, int(max_wait_us))
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+        self._pid = None
+        self._inflight = 0
+
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.requests = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.batch_size_hist = {}
+        self.wait_us_total = 0.0
+        self.wait_us_max = 0.0
+
+    def _ensure_worker(self):
+        # Started lazily, and again after fork, so a preloading master
+        # process never hands a dead thread to its workers.
+        pid = os.getpid()
+        if self._worker is not None and self._pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._pid == pid and self._worker.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._inflight = 0
+            self._pid = pid
+            self._worker = threading.Thread(
+                target=self._run, name="micro-batcher", daemon=True
+            )
+            self._worker.start()
+
+    def submit(self, row):
+        """Score one feature row and return its float score."""
+        self._ensure_worker()
+
+        item = {
+            "row": np.asarray(row, dtype=float).ravel(),
+            "enqueued": time.perf_counter(),
+            "done": threading.Event(),
+            "result": None,
+            "error": None,
+        }
+
+        with self._lock:
+            self._inflight += 1
+        try:
+            self._queue.put(item)
+            item["done"].wait()
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+        if item["error"] is not None:
+            raise item["error"]
+        return item["result"]
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first["enqueued"] + self.max_wait_us / 1e6
+
+        while len(batch) < self.max_batch_size:
+            with self._lock:
+                others_waiting = self._inflight > len(batch)
+            if not others_waiting:
+                break
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            try:
+                X = np.vstack([item["row"] for item in batch])
+                scores = np.asarray(self.score_fn(X), dtype=float).ravel()
+                for item, score in zip(batch, scores):
+                    item["result"] = float(score)
+            except Exception as e:
+                for item in batch:
+                    item["error"] = e
+
+            self._record(batch, started)
+
+            for item in batch:
+                item["done"].set()
+
+    def _record(self, batch, started):
+        size = len(batch)
+        bucket = 1 << (size - 1).bit_length()
+        waits = [(started - item["enqueued"]) * 1e6 for item in batch]
+
+        with self._lock:
+            self.requests += size
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, size)
+            self.batch_size_hist[bucket] = self.batch_size_hist.get(bucket, 0) + 1
+            self.wait_us_total += sum(waits)
+            self.wait_us_max = max(self.wait_us_max, max(waits))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_us": self.max_wait_us,
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": round(self.requests / self.batches, 3) if self.batches else 0.0,
+                "max_batch_seen": self.max_batch_seen,
+                # keyed by the power-of-two upper bound of the batch size
+                "batch_size_histogram": {
+                    str(k): v for k, v in sorted(self.batch_size_hist.items())
+                },
+                "queue_wait_us_mean": round(self.wait_us_total / self.requests, 1) if self.requests else 0.0,
+                "queue_wait_us_max": round(self.wait_us_max, 1),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._reset_counters()
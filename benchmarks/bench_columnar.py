@@ -0,0 +1,81 @@
+"""Encode time and size of the dashboard payloads: JSON vs columnar.py.
+
+Payloads are built from the exoplanet table the way app.py builds them
+(raw scores, full /correlations columns, a histogram + KDE, a 1,000-row
+/rank page), then encoded both ways. "json" is what jsonify does with
+them: arrays to lists, then json.dumps.
+
+    python -m benchmarks.bench_columnar [repeats]
+"""
+import json
+import sys
+import time
+
+import numpy as np
+
+import aggregates
+import columnar
+from migrations import DB_PATH, connect
+
+
+def load_payloads():
+    conn = connect(DB_PATH)
+    rows = np.array(conn.execute(
+        "SELECT habitability_score, st_teff, pl_eqt FROM exoplanet "
+        "WHERE habitability_score IS NOT NULL ORDER BY habitability_score DESC"
+    ).fetchall(), dtype=np.float64)
+    names = [r[0] for r in conn.execute(
+        "SELECT name FROM exoplanet WHERE habitability_score IS NOT NULL "
+        "ORDER BY habitability_score DESC LIMIT 1000"
+    )]
+    conn.close()
+
+    scores = rows[:, 0]
+    distribution = aggregates.summary(scores)
+    distribution["histogram"] = aggregates.histogram(scores, 30)
+    distribution["quantiles"] = aggregates.quantiles(scores)
+    distribution["kde"] = aggregates.kde(scores, 200)
+
+    return {
+        "/score_distribution?raw=1": scores.astype(np.float32),
+        "/correlations (full)": {
+            "mode": "full", "count": len(rows),
+            "st_teff": rows[:, 1], "pl_eqt": rows[:, 2],
+            "score": scores.astype(np.float32), "returned": len(rows),
+        },
+        "/score_distribution?kde=1": distribution,
+        "/rank?k=1000 (columns)": {
+            "rank": np.arange(1, len(names) + 1, dtype=np.int32),
+            "planet_name": names,
+            "habitability_score": scores[:len(names)],
+        },
+    }
+
+
+def best_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return 1000 * min(times)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    print(f"{'payload':<30} {'json KB':>9} {'cols KB':>9} {'ratio':>6} "
+          f"{'json ms':>9} {'cols ms':>9} {'speedup':>8}")
+    for label, data in load_payloads().items():
+        as_json = lambda: json.dumps(columnar.to_builtin(data), separators=(",", ":"))
+        as_columns = lambda: columnar.encode(data)
+
+        json_size, col_size = len(as_json().encode()), len(as_columns())
+        json_ms, col_ms = best_ms(as_json, repeats), best_ms(as_columns, repeats)
+        print(f"{label:<30} {json_size / 1024:>9.1f} {col_size / 1024:>9.1f} "
+              f"{json_size / col_size:>5.1f}x {json_ms:>9.3f} {col_ms:>9.3f} "
+              f"{json_ms / col_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
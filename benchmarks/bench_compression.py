@@ -0,0 +1,54 @@
+"""CPU cost vs bytes saved for each response coding and level.
+
+Uses the same payloads as bench_columnar (built from the exoplanet table),
+in both JSON and columnar form, and reports per coding/level the
+compressed size, compression time and the total time to deliver the body
+over a few link speeds (compression + transfer; decompression in the
+browser is much cheaper and ignored). br and zstd rows appear only when
+brotli / zstandard are installed.
+
+    python -m benchmarks.bench_compression [repeats]
+"""
+import json
+import sys
+
+import columnar
+from benchmarks.bench_columnar import best_ms, load_payloads
+from compression import available_codings
+
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 11], "zstd": [1, 3, 19]}
+LINKS = {"1 Mbit/s": 1e6, "10 Mbit/s": 10e6, "100 Mbit/s": 100e6}
+
+
+def bodies():
+    for label, data in load_payloads().items():
+        yield f"{label} json", json.dumps(columnar.to_builtin(data), separators=(",", ":")).encode()
+        yield f"{label} columns", columnar.encode(data)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    for label, body in bodies():
+        print(f"\n{label}: {len(body) / 1024:.1f} KB")
+        print(f"  {'coding':<9} {'KB':>8} {'ratio':>6} {'cpu ms':>8}" +
+              "".join(f" {link:>11}" for link in LINKS))
+
+        rows = [("identity", len(body), 0.0)]
+        for coding, levels in LEVELS.items():
+            for level in levels:
+                compressor = available_codings({coding: level}).get(coding)
+                if compressor is None:
+                    continue
+                size = len(compressor.compress(body))
+                rows.append((f"{coding}-{level}", size,
+                             best_ms(lambda: compressor.compress(body), repeats)))
+
+        for name, size, cpu_ms in rows:
+            totals = [cpu_ms + 1000 * size * 8 / bps for bps in LINKS.values()]
+            print(f"  {name:<9} {size / 1024:>8.1f} {len(body) / size:>5.1f}x {cpu_ms:>8.2f}" +
+                  "".join(f" {t:>8.0f} ms" for t in totals))
+
+
+if __name__ == "__main__":
+    main()
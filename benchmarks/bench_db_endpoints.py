@@ -0,0 +1,162 @@
+"""Query timings for the read endpoints before and after migrations.py.
+
+"before" is a copy of the database as the app used to open it: rollback
+journal, default pragmas, no indexes beyond the primary key and the name
+constraint. "after" is the same copy migrated, opened with ``PRAGMAS``.
+
+Each read endpoint's query is timed alone, then again while a writer
+thread rewrites scores in 5,000-row transactions (like rescore.py), which
+is where the rollback journal makes readers queue behind the writer.
+
+    python -m benchmarks.bench_db_endpoints [seconds_under_load]
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from migrations import DB_PATH, connect, migrate_path
+
+QUERIES = {
+    "/rank (legacy ORDER BY rank)":
+        "SELECT name, habitability_score, rank FROM exoplanet "
+        "WHERE habitability_score IS NOT NULL ORDER BY rank LIMIT 10",
+    "/export/* top 10 (legacy)":
+        "SELECT * FROM exoplanet WHERE habitability_score IS NOT NULL "
+        "ORDER BY habitability_score DESC LIMIT 10",
+    "/export/* top 10 by id":
+        "SELECT * FROM exoplanet WHERE id IN (1, 2, 3, 4, 5, 6, 7, 8, 9, 10)",
+    "/rank/<name>":
+        "SELECT id, habitability_score FROM exoplanet WHERE name = 'Planet_20000'",
+    "/score_distribution":
+        "SELECT habitability_score FROM exoplanet WHERE habitability_score IS NOT NULL",
+    "/correlations (projected)":
+        "SELECT st_teff, pl_eqt, habitability_score FROM exoplanet "
+        "WHERE habitability_score IS NOT NULL",
+    "/correlations (full rows)":
+        "SELECT * FROM exoplanet WHERE habitability_score IS NOT NULL",
+    "leaderboard rebuild":
+        "SELECT id, name, habitability_score FROM exoplanet "
+        "WHERE habitability_score IS NOT NULL ORDER BY habitability_score DESC, id",
+}
+
+
+def make_before(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger') "
+        "AND sql IS NOT NULL"
+    ).fetchall():
+        kind = "TRIGGER" if name.startswith("exoplanet_changes") else "INDEX"
+        conn.execute(f"DROP {kind} {name}")
+    conn.execute("DROP TABLE IF EXISTS exoplanet_changes")
+    conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+    conn.execute("PRAGMA user_version=0")
+    conn.commit()
+    conn.close()
+
+
+def median_ms(conn, sql, runs):
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        conn.execute(sql).fetchall()
+        times.append(time.perf_counter() - t)
+    return 1000 * float(np.median(times))
+
+
+def writer(open_conn, stop, stats):
+    conn = open_conn()
+    ids = [r[0] for r in conn.execute("SELECT id FROM exoplanet")]
+    i = 0
+    while not stop.is_set():
+        batch = ids[i:i + 5000] or ids[:5000]
+        i = (i + 5000) % len(ids)
+        t = time.perf_counter()
+        with conn:
+            conn.executemany(
+                "UPDATE exoplanet SET habitability_score = habitability_score WHERE id = ?",
+                [(pid,) for pid in batch]
+            )
+            conn.execute("UPDATE exoplanet SET rank = rank WHERE id = ?", (batch[0],))
+        stats.append(time.perf_counter() - t)
+    conn.close()
+
+
+def reader(open_conn, sql, stop, latencies, errors):
+    conn = open_conn()
+    while not stop.is_set():
+        t = time.perf_counter()
+        try:
+            conn.execute(sql).fetchall()
+        except sqlite3.OperationalError:
+            errors.append(1)
+        latencies.append(time.perf_counter() - t)
+    conn.close()
+
+
+def under_load(open_conn, sql, seconds):
+    stop = threading.Event()
+    latencies, errors, writes = [], [], []
+    threads = [threading.Thread(target=writer, args=(open_conn, stop, writes))]
+    threads += [
+        threading.Thread(target=reader, args=(open_conn, sql, stop, latencies, errors))
+        for _ in range(2)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    lat = np.array(latencies) * 1000
+    return len(lat), float(np.percentile(lat, 50)), float(np.percentile(lat, 99)), len(errors), len(writes)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before, after = os.path.join(tmp, "before.db"), os.path.join(tmp, "after.db")
+        shutil.copy(DB_PATH, before)
+        make_before(before)
+        shutil.copy(before, after)
+        migrate_path(after)
+
+        configs = [
+            ("before", lambda: sqlite3.connect(before, timeout=5, check_same_thread=False)),
+            ("after", lambda: connect(after, check_same_thread=False)),
+        ]
+
+        rows = sqlite3.connect(before).execute("SELECT COUNT(*) FROM exoplanet").fetchone()[0]
+        print(f"Exoplanet table: {rows:,} rows\n")
+        print(f"{'query (median ms, idle)':<32} {'before':>9} {'after':>9}")
+        for label, sql in QUERIES.items():
+            timings = []
+            for _, open_conn in configs:
+                conn = open_conn()
+                runs = 5 if "rebuild" in label or "full" in label else 50
+                median_ms(conn, sql, 2)
+                timings.append(median_ms(conn, sql, runs))
+                conn.close()
+            print(f"{label:<32} {timings[0]:>9.3f} {timings[1]:>9.3f}")
+
+        print(f"\nUnder a concurrent writer ({seconds:.0f}s each, 2 reader threads):")
+        print(f"{'query':<32} {'config':<7} {'reads':>7} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'locked':>7} {'write txns':>10}")
+        for label in ["/export/* top 10 (legacy)", "/score_distribution", "/rank/<name>"]:
+            for name, open_conn in configs:
+                n, p50, p99, errors, writes = under_load(open_conn, QUERIES[label], seconds)
+                print(f"{label:<32} {name:<7} {n:>7} {p50:>8.2f} {p99:>8.2f} "
+                      f"{errors:>7} {writes:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Top-planet report builds: DataFrame + BytesIO vs reports.py, and the cache.
+
+For k planets, times building the xlsx the way /export/excel used to
+(a pandas DataFrame written to a BytesIO) against reports.write_xlsx
+(openpyxl write-only, row by row, to a file), with the peak Python heap
+of each, and times reports.write_pdf. Then, through the app with a fresh
+cache directory: a cold /export/excel, a cached one, and ``clients``
+concurrent cold requests for one report, which should cost one build.
+
+    python -m benchmarks.bench_exports [repeats] [clients]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from io import BytesIO
+
+os.environ.setdefault("EXPORT_CACHE_DIR", tempfile.mkdtemp(prefix="export-bench-"))
+os.environ.setdefault("COMPRESSION", "0")
+
+from app import app, export_cache, iter_top_planets
+from benchmarks.bench_columnar import best_ms
+from reports import EXCEL_COLUMNS, SHEET_NAME, write_pdf, write_xlsx
+
+SIZES = [10, 1000, 10000]
+
+
+def dataframe_xlsx(k):
+    import pandas as pd
+
+    data = [{"Rank": i, **{h: p[key] for h, key in EXCEL_COLUMNS}}
+            for i, p in enumerate(iter_top_planets(k), start=1)]
+    for row in data:
+        row["Habitability Score"] = round(row["Habitability Score"], 4)
+    output = BytesIO()
+    pd.DataFrame(data).to_excel(output, index=False, sheet_name=SHEET_NAME)
+    return output
+
+
+def streamed_xlsx(k):
+    with tempfile.TemporaryFile() as out:
+        write_xlsx(iter_top_planets(k), out)
+
+
+def streamed_pdf(k):
+    with tempfile.TemporaryFile() as out:
+        write_pdf(iter_top_planets(k), out, k)
+
+
+def peak_kb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    client = app.test_client()
+    client.get("/rank?k=1")
+
+    print(f"{'k':>6} {'DataFrame xlsx':>15} {'streamed xlsx':>14} {'streamed pdf':>13} "
+          f"{'DataFrame peak':>15} {'streamed peak':>14}")
+    for k in SIZES:
+        print(f"{k:>6} "
+              f"{best_ms(lambda: dataframe_xlsx(k), repeats):>12.1f} ms "
+              f"{best_ms(lambda: streamed_xlsx(k), repeats):>11.1f} ms "
+              f"{best_ms(lambda: streamed_pdf(k), repeats):>10.1f} ms "
+              f"{peak_kb(lambda: dataframe_xlsx(k)):>12.0f} KB "
+              f"{peak_kb(lambda: streamed_xlsx(k)):>11.0f} KB")
+
+    k = SIZES[-1]
+    url = f"/export/excel?k={k}"
+    start = time.perf_counter()
+    client.get(url)
+    cold = 1000 * (time.perf_counter() - start)
+    cached = best_ms(lambda: client.get(url), repeats)
+    print(f"\n{url}: cold {cold:.1f} ms, cached {cached:.2f} ms")
+
+    url = f"/export/pdf?k={k}"
+    before = export_cache.stats()["builds"]
+    threads = [threading.Thread(target=lambda: app.test_client().get(url)) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = 1000 * (time.perf_counter() - start)
+    builds = export_cache.stats()["builds"] - before
+    print(f"{clients} concurrent {url}: {elapsed:.1f} ms, {builds} build(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Scaling of ParallelScorer over 1/2/4/8 worker processes.
+
+Scores a synthetic table derived from exoplanets_clean_full.csv (rows
+resampled with up to ±5% multiplicative jitter, 10M rows by default) and
+checks every run against single-process scores. Pool start-up, including
+each worker's one-time model load, is timed separately from scoring.
+
+    python -m benchmarks.bench_parallel_scoring [rows] [shard_rows]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from parallel_scoring import ParallelScorer, default_workers
+from tree_engine import load_model
+
+FEATURES = ["pl_rade", "pl_bmasse", "pl_eqt", "pl_orbper", "st_teff", "st_rad"]
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def make_table(rows, seed=0):
+    base = pd.read_csv("exoplanets_clean_full.csv")[FEATURES].dropna().to_numpy(np.float64)
+    rng = np.random.default_rng(seed)
+    X = np.empty((rows, len(FEATURES)), dtype=np.float64)
+    for start in range(0, rows, 1_000_000):
+        stop = min(start + 1_000_000, rows)
+        X[start:stop] = base[rng.integers(0, len(base), stop - start)]
+        X[start:stop] *= rng.uniform(0.95, 1.05, (stop - start, len(FEATURES)))
+    return X
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    shard_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 250_000
+
+    X = make_table(rows)
+    print(f"Table: {rows:,} rows x {len(FEATURES)} features "
+          f"({X.nbytes / 1e6:.0f} MB), shard {shard_rows:,} rows, "
+          f"{default_workers()} core(s) available")
+
+    t = time.perf_counter()
+    reference = load_model("model_fused.npz").predict(X)
+    baseline = time.perf_counter() - t
+    print(f"plain model.predict: {baseline:.2f}s ({rows / baseline:,.0f} rows/sec)\n")
+
+    print(f"{'workers':>7} {'startup s':>10} {'score s':>8} {'rows/sec':>12} "
+          f"{'speedup':>8} {'max |diff|':>11}")
+    for workers in WORKER_COUNTS:
+        with ParallelScorer("model_fused.npz", workers=workers, shard_rows=shard_rows) as scorer:
+            t = time.perf_counter()
+            scorer.predict(X[:shard_rows * workers + 1])   # start the pool, load models
+            startup = time.perf_counter() - t
+
+            t = time.perf_counter()
+            scores = scorer.predict(X)
+            seconds = time.perf_counter() - t
+
+        diff = float(np.abs(scores - reference).max())
+        print(f"{workers:>7} {startup:>10.2f} {seconds:>8.2f} {rows / seconds:>12,.0f} "
+              f"{baseline / seconds:>7.2f}x {diff:>11.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Analytics reads from ORM objects vs the columnar snapshot (snapshot.py).
+
+For the data each analytics endpoint needs, times three ways of getting
+it: hydrating ``Exoplanet`` ORM objects (how the endpoints started out),
+a projected SQL query, and indexing the in-memory snapshot. Then times
+the endpoints themselves with the query cache off, and reports the
+snapshot's memory next to the Python heap held by a full ORM load.
+
+    python -m benchmarks.bench_snapshot [repeats]
+"""
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault("QUERY_CACHE_SIZE", "0")
+os.environ.setdefault("COMPRESSION", "0")
+
+import numpy as np
+from sqlalchemy import text
+
+from app import Exoplanet, app, db, init_db, leaderboard, table_snapshot
+from benchmarks.bench_columnar import best_ms
+
+
+def orm_scores():
+    return np.array([p.habitability_score for p in
+                     Exoplanet.query.filter(Exoplanet.habitability_score.isnot(None))])
+
+
+def orm_columns():
+    planets = Exoplanet.query.filter(Exoplanet.habitability_score.isnot(None)).all()
+    return {c: np.array([getattr(p, c) for p in planets], dtype=np.float64)
+            for c in ("st_teff", "pl_eqt", "habitability_score")}
+
+
+def orm_top10():
+    return (Exoplanet.query.filter(Exoplanet.habitability_score.isnot(None))
+            .order_by(Exoplanet.habitability_score.desc()).limit(10).all())
+
+
+def sql_scores():
+    rows = db.session.execute(text(
+        "SELECT habitability_score FROM exoplanet WHERE habitability_score IS NOT NULL"))
+    return np.fromiter((r[0] for r in rows), dtype=np.float64)
+
+
+def sql_columns():
+    rows = db.session.execute(text(
+        "SELECT st_teff, pl_eqt, habitability_score FROM exoplanet "
+        "WHERE habitability_score IS NOT NULL")).fetchall()
+    return np.array(rows, dtype=np.float64)
+
+
+def sql_top10():
+    return db.session.execute(text(
+        "SELECT * FROM exoplanet WHERE habitability_score IS NOT NULL "
+        "ORDER BY habitability_score DESC LIMIT 10")).fetchall()
+
+
+def snapshot_scores():
+    table = table_snapshot.current()
+    return table.score[table.scored].astype(np.float64)
+
+
+def snapshot_columns():
+    table = table_snapshot.current()
+    return {c: table.column(c)[table.scored] for c in ("st_teff", "pl_eqt", "habitability_score")}
+
+
+def snapshot_top10():
+    # As top_planets() does it: ids from the leaderboard, rows from the snapshot
+    ids = [pid for _, pid, _, _ in leaderboard.top(10)]
+    return table_snapshot.current().rows(ids)
+
+
+READS = {
+    "scores (/score_distribution)": (orm_scores, sql_scores, snapshot_scores),
+    "3 columns (/correlations)": (orm_columns, sql_columns, snapshot_columns),
+    "top 10 rows (/export/*)": (orm_top10, sql_top10, snapshot_top10),
+}
+
+ENDPOINTS = [
+    "/score_distribution?bins=30&kde=1",
+    "/score_distribution?raw=1",
+    "/correlations",
+    "/correlations?mode=sample&n=3000&strategy=stratified",
+    "/correlations?mode=grid",
+    "/export/excel",
+]
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    init_db()
+
+    with app.app_context():
+        print(f"{'read (best ms)':<32} {'ORM':>9} {'SQL':>9} {'snapshot':>9}")
+        for label, fns in READS.items():
+            times = [best_ms(fn, repeats) for fn in fns]
+            print(f"{label:<32} " + " ".join(f"{t:>9.3f}" for t in times))
+
+        tracemalloc.start()
+        planets = Exoplanet.query.all()
+        orm_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        db.session.expunge_all()
+        del planets
+
+    client = app.test_client()
+    print(f"\n{'endpoint (query cache off)':<52} {'best ms':>9}")
+    for url in ENDPOINTS:
+        print(f"{url:<52} {best_ms(lambda: client.get(url), repeats):>9.3f}")
+
+    memory = table_snapshot.memory()
+    print(f"\nSnapshot memory ({len(table_snapshot.current()):,} rows):")
+    for column, size in memory.items():
+        print(f"  {column:<20} {size / 1024:>9.1f} KB")
+    print(f"  {'ORM objects':<20} {orm_bytes / 1024:>9.1f} KB  (Python heap for Exoplanet.query.all())")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Cold start of app.py: import time and time to first response.
+
+Every measurement runs in a fresh interpreter, as a new gunicorn worker
+would. For LAZY_STARTUP=1 (the default) and LAZY_STARTUP=0 it reports the
+median over ``runs`` processes of:
+
+* import: ``import app``;
+* first /rank and first /predict: from before the import to the end of
+  that request through the test client (the first request pays whatever
+  the import deferred: migrations check, leaderboard, snapshot, model).
+
+Then a ``python -X importtime`` breakdown of what ``import app`` still
+imports, by cumulative time of its direct imports.
+
+    python -m benchmarks.bench_startup [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+path = %r
+if path == "/predict":
+    response = client.post(path, json={"pl_rade": 1.0, "pl_bmasse": 1.0, "pl_eqt": 288,
+                                       "pl_orbper": 365, "st_teff": 5778, "st_rad": 1.0})
+else:
+    response = client.get(path)
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "first": done - start}))
+"""
+
+PATHS = ["/rank?k=10", "/predict"]
+
+
+def probe(path, lazy):
+    env = dict(os.environ, LAZY_STARTUP="1" if lazy else "0")
+    out = subprocess.run([sys.executable, "-c", PROBE % path], cwd=BASE_DIR, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_breakdown(top=12):
+    # Direct imports of app, by cumulative microseconds
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                         cwd=BASE_DIR, check=True, capture_output=True, text=True).stderr
+    total, modules = 0, []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0 and name.strip() == "app":
+            total = int(cumulative)
+        elif depth == 1:
+            modules.append((int(cumulative), name.strip()))
+    modules.sort(reverse=True)
+    return total, modules[:top]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'median ms over %d runs' % runs:<26} {'import':>9} "
+          + " ".join(f"{'first ' + p.split('?')[0]:>15}" for p in PATHS))
+    for lazy in (True, False):
+        imports, firsts = [], []
+        for path in PATHS:
+            results = [probe(path, lazy) for _ in range(runs)]
+            imports += [r["import"] for r in results]
+            firsts.append(statistics.median(r["first"] for r in results))
+        label = f"LAZY_STARTUP={int(lazy)}"
+        print(f"{label:<26} {1000 * statistics.median(imports):>9.1f} "
+              + " ".join(f"{1000 * t:>15.1f}" for t in firsts))
+
+    total, modules = import_breakdown()
+    print(f"\n-X importtime, import app: {total / 1000:.1f} ms cumulative")
+    for cumulative, name in modules:
+        print(f"  {name:<32} {cumulative / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
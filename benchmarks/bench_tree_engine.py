@@ -0,0 +1,84 @@
+"""Tree engine vs xgboost: latency at batch sizes 1, 100 and 100k, plus import cost.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tree_engine
+"""
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+warnings.filterwarnings("ignore")
+
+BATCH_SIZES = [1, 100, 100_000]
+
+# Peak RSS is read from VmHWM: ru_maxrss survives exec and would report
+# the parent's peak instead of the probe's own.
+IMPORT_PROBE = """
+import time
+t = time.perf_counter()
+{stmt}
+dt = time.perf_counter() - t
+hwm = [l for l in open("/proc/self/status") if l.startswith("VmHWM")][0]
+print(dt, hwm.split()[1])
+"""
+
+
+def timeit(fn, min_time=0.5):
+    fn()
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs
+
+
+def import_cost(stmt):
+    out = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_PROBE.format(stmt=stmt)],
+        stderr=subprocess.DEVNULL, text=True
+    )
+    seconds, rss_kb = out.split()
+    return float(seconds), int(rss_kb) / 1024
+
+
+def main():
+    import joblib
+    from tree_engine import load_model
+
+    scaler = joblib.load("scaler.pkl")
+    features = joblib.load("features.pkl")
+    xgb_model = joblib.load("model.pkl")
+    engine = load_model("model.json")
+
+    df = pd.read_csv("exoplanets_clean_full.csv").dropna()
+    base = scaler.transform(df[features])
+    rng = np.random.default_rng(0)
+
+    print(f"{'batch':>8} {'xgboost ms':>12} {'engine ms':>12} {'speedup':>8}")
+    for n in BATCH_SIZES:
+        X = base[rng.integers(0, len(base), n)]
+        t_xgb = timeit(lambda: xgb_model.predict(X))
+        t_eng = timeit(lambda: engine.predict(X))
+        print(f"{n:>8} {t_xgb * 1e3:>12.3f} {t_eng * 1e3:>12.3f} {t_xgb / t_eng:>7.1f}x")
+
+    print()
+    print(f"{'load':<40} {'seconds':>8} {'max RSS MB':>11}")
+    for label, stmt in [
+        ("import xgboost + unpickle model.pkl",
+         "import joblib; joblib.load('model.pkl')"),
+        ("import tree_engine + compile model.json",
+         "import tree_engine; tree_engine.load_model('model.json')"),
+    ]:
+        seconds, rss = import_cost(stmt)
+        print(f"{label:<40} {seconds:>8.3f} {rss:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Peak memory and time of /upload_csv_rank scoring: whole-file vs streaming top-k.
+
+Builds a synthetic upload by resampling exoplanets_clean_full.csv (plus a
+pl_name column), then scores it in fresh subprocesses so each gets its own
+peak RSS (VmHWM):
+
+    python -m benchmarks.bench_upload_topk [rows]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+LEGACY = """
+import pandas as pd
+from tree_engine import load_model
+model = load_model("model_fused.npz")
+FEATURES = ["pl_rade", "pl_bmasse", "pl_eqt", "pl_orbper", "st_teff", "st_rad"]
+df = pd.read_csv({path!r})
+df["habitability_score"] = model.predict(df[FEATURES].to_numpy(dtype=float))
+top = df.sort_values("habitability_score", ascending=False).head({k}).reset_index(drop=True)
+"""
+
+STREAMING = """
+from tree_engine import load_model
+from upload_scoring import score_upload
+model = load_model("model_fused.npz")
+FEATURES = ["pl_rade", "pl_bmasse", "pl_eqt", "pl_orbper", "st_teff", "st_rad"]
+with open({path!r}, "rb") as f:
+    top = score_upload(f, FEATURES, model.predict, k={k}).result()
+"""
+
+PROBE = """
+import time
+t = time.perf_counter()
+{body}
+dt = time.perf_counter() - t
+hwm = [l for l in open("/proc/self/status") if l.startswith("VmHWM")][0]
+print(dt, hwm.split()[1], top["habitability_score"].iloc[0])
+"""
+
+
+def make_upload(path, rows):
+    base = pd.read_csv("exoplanets_clean_full.csv")
+    rng = np.random.default_rng(0)
+    written = 0
+    with open(path, "w") as f:
+        while written < rows:
+            n = min(500_000, rows - written)
+            chunk = base.iloc[rng.integers(0, len(base), n)].copy()
+            chunk.insert(0, "pl_name", [f"Synthetic {i}" for i in range(written, written + n)])
+            chunk.to_csv(f, index=False, header=written == 0)
+            written += n
+
+
+def run(template, path, k):
+    code = PROBE.format(body=template.format(path=path, k=k))
+    out = subprocess.check_output([sys.executable, "-c", code], text=True)
+    seconds, hwm_kb, best = out.split()
+    return float(seconds), int(hwm_kb) / 1024, float(best)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    k = 10
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "upload.csv")
+        make_upload(path, rows)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"Upload: {rows:,} rows, {size_mb:.0f} MB, k={k}")
+        print(f"{'mode':<22} {'seconds':>8} {'peak RSS MB':>12} {'best score':>11}")
+        for label, template in [("whole file + sort", LEGACY), ("streaming top-k", STREAMING)]:
+            seconds, peak, best = run(template, path, k)
+            print(f"{label:<22} {seconds:>8.2f} {peak:>12.1f} {best:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
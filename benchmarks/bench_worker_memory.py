@@ -0,0 +1,98 @@
+"""Per-worker memory under gunicorn, with and without the preloaded model.
+
+Starts `gunicorn app:app` (so gunicorn.conf.py applies) with ``workers``
+workers, once with GUNICORN_PRELOAD=1 and once with 0, sends each a few
+/predict and /rank requests, then reads /proc/<pid>/smaps_rollup of the
+master and every worker. USS is what a worker holds alone; PSS adds its
+share of the pages it shares, so the PSS total is what the box pays.
+
+    python -m benchmarks.bench_worker_memory [workers]
+
+Needs Linux and gunicorn.
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from shared_model import process_memory
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PLANET = {"pl_rade": 1.0, "pl_bmasse": 1.0, "pl_eqt": 288, "pl_orbper": 365,
+          "st_teff": 5778, "st_rad": 1.0}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_up(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"gunicorn did not come up at {url}")
+
+
+def measure(workers, preload):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, GUNICORN_PRELOAD="1" if preload else "0",
+               WEB_CONCURRENCY=str(workers), JOB_WORKERS="0")
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-b", f"127.0.0.1:{port}", "app:app"],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_up(f"{base}/rank?k=1")
+        # Enough requests that every worker has scored and read the board
+        body = json.dumps(PLANET).encode()
+        for _ in range(workers * 8):
+            urllib.request.urlopen(urllib.request.Request(
+                f"{base}/predict", data=body, headers={"Content-Type": "application/json"}
+            )).read()
+            urllib.request.urlopen(f"{base}/rank?k=10").read()
+
+        master_mem = process_memory(master.pid)
+        worker_mem = [process_memory(pid) for pid in children(master.pid)]
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+    return master_mem, worker_mem
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    mb = 1 / (1024 * 1024)
+
+    print(f"{workers} workers (MB)        {'worker USS':>11} {'worker PSS':>11} "
+          f"{'worker RSS':>11} {'total PSS':>10}")
+    for preload in (False, True):
+        master_mem, worker_mem = measure(workers, preload)
+        n = len(worker_mem)
+        total = master_mem["pss"] + sum(m["pss"] for m in worker_mem)
+        label = f"GUNICORN_PRELOAD={int(preload)}"
+        print(f"{label:<24} "
+              f"{sum(m['uss'] for m in worker_mem) / n * mb:>11.1f} "
+              f"{sum(m['pss'] for m in worker_mem) / n * mb:>11.1f} "
+              f"{sum(m['rss'] for m in worker_mem) / n * mb:>11.1f} "
+              f"{total * mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Binary columnar encoding for the dashboard's data endpoints.
+
+Clients that send ``Accept: application/vnd.exoplanet.columns`` (or pass
+``?format=columns``) get this instead of JSON. Every NumPy array in the
+response becomes a raw little-endian buffer copied straight from the
+array's memory. Everything else (names, counts, parameters) stays in a
+small JSON header, where each array is replaced by ``{"$column": i}``.
+
+Layout, with every section starting on an 8-byte boundary so a browser can
+view each buffer as a Float64Array/Float32Array/Int32Array in place:
+
+    b"EXCOLS01"                       magic and format version
+    uint32 LE                         header length in bytes
+    4 bytes padding
+    header                            UTF-8 JSON, space-padded to 8 bytes
+    buffer 0, buffer 1, ...           each zero-padded to 8 bytes
+
+The header is ``{"columns": [{"dtype", "length", "offset"}, ...], "data": ...}``
+with offsets counted from the start of the body. See decodeColumns() in
+templates/dashboard.html for a decoder.
+"""
+import json
+import struct
+
+import numpy as np
+
+MIMETYPE = "application/vnd.exoplanet.columns"
+MAGIC = b"EXCOLS01"
+
+# dtype.str -> the name a client maps to a typed array
+DTYPES = {"<f8": "float64", "<f4": "float32", "<i4": "int32", "|u1": "uint8"}
+
+
+def _column(array):
+    array = np.asarray(array)
+    if array.dtype.kind == "b":
+        array = array.astype(np.uint8)
+    elif array.dtype.kind in "iu" and array.dtype.str not in DTYPES:
+        # JavaScript has no 64-bit integer arrays that plot; counts, ranks
+        # and ids all fit in int32, anything bigger goes as float64
+        fits = not len(array) or (array.min() >= -2**31 and array.max() < 2**31)
+        array = array.astype(np.int32 if fits else np.float64)
+    elif array.dtype.str not in DTYPES:
+        array = array.astype(np.float64)
+    return np.ascontiguousarray(array.astype(array.dtype.newbyteorder("<"), copy=False))
+
+
+def _pad(n):
+    return -n % 8
+
+
+def encode(data):
+    """``data`` (dicts, lists and NumPy arrays) as columnar bytes."""
+    buffers = []
+
+    def extract(value):
+        if isinstance(value, np.ndarray):
+            buffers.append(_column(value))
+            return {"$column": len(buffers) - 1}
+        if isinstance(value, dict):
+            return {k: extract(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [extract(v) for v in value]
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    data = extract(data)
+
+    columns, offset = [], 0
+    for buf in buffers:
+        columns.append({"dtype": DTYPES[buf.dtype.str], "length": len(buf), "offset": offset})
+        offset += buf.nbytes + _pad(buf.nbytes)
+
+    header = json.dumps({"columns": columns, "data": data}, separators=(",", ":")).encode()
+    header += b" " * _pad(len(header))
+
+    parts = [MAGIC, struct.pack("<I4x", len(header)), header]
+    for buf in buffers:
+        parts.append(buf.tobytes())
+        parts.append(b"\0" * _pad(buf.nbytes))
+    return b"".join(parts)
+
+
+def decode(payload):
+    """Inverse of encode(), with arrays as read-only NumPy views of ``payload``."""
+    if payload[:8] != MAGIC:
+        raise ValueError("Not a columnar payload")
+    (length,) = struct.unpack_from("<I", payload, 8)
+    header = json.loads(payload[16:16 + length])
+    body = 16 + length
+
+    arrays = [
+        np.frombuffer(payload, dtype=np.dtype(c["dtype"]).newbyteorder("<"),
+                      count=c["length"], offset=body + c["offset"])
+        for c in header["columns"]
+    ]
+
+    def restore(value):
+        if isinstance(value, dict):
+            if set(value) == {"$column"}:
+                return arrays[value["$column"]]
+            return {k: restore(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [restore(v) for v in value]
+        return value
+
+    return restore(header["data"])
+
+
+def to_builtin(data):
+    """``data`` with arrays converted to lists, for jsonify."""
+    if isinstance(data, np.ndarray):
+        return data.tolist()
+    if isinstance(data, dict):
+        return {k: to_builtin(v) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [to_builtin(v) for v in data]
+    if isinstance(data, np.generic):
+        return data.item()
+    return data
@@ -0,0 +1,194 @@
+"""Negotiated response compression (gzip, and brotli / zstd when installed).
+
+``ResponseCompressor.process`` runs after every request. It picks the
+client's best ``Accept-Encoding`` among the available codings (zstd, then
+br, then gzip on equal quality) and compresses JSON, CSV, text and
+columnar bodies:
+
+* bodies under ``min_size`` bytes go out as they are, since the headers
+  and framing would eat the saving;
+* generator responses are compressed chunk by chunk as they stream;
+* a body with a strong ETag is compressed once per (URL, ETag, coding)
+  and the result kept in a small LRU, so dashboard refreshes of unchanged
+  data cost a lookup. The compressed variant gets its own ETag (the
+  coding appended), as HTTP requires.
+
+XLSX and PDF exports are already deflate-compressed inside, so they are
+left alone.
+"""
+import zlib
+
+from lru_cache import LRUCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE = {
+    "application/json",
+    "application/vnd.exoplanet.columns",
+    "text/csv",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "application/javascript",
+}
+
+
+class _Gzip:
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        c = self.stream()
+        return c.compress(data) + c.flush()
+
+    def stream(self):
+        # wbits 16+: gzip header and trailer rather than a raw zlib stream
+        return zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+class _Brotli:
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self):
+        return _BrotliStream(self.level)
+
+
+class _BrotliStream:
+    # brotli.Compressor with the zlib compressobj method names
+    def __init__(self, level):
+        self._c = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._c.process(data)
+
+    def flush(self):
+        return self._c.finish()
+
+
+class _Zstd:
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self):
+        return zstandard.ZstdCompressor(level=self.level).compressobj()
+
+
+def available_codings(levels):
+    """Coding name -> compressor, in server preference order."""
+    codings = {}
+    if zstandard is not None:
+        codings["zstd"] = _Zstd(levels.get("zstd", 3))
+    if brotli is not None:
+        codings["br"] = _Brotli(levels.get("br", 4))
+    codings["gzip"] = _Gzip(levels.get("gzip", 6))
+    return codings
+
+
+def etag_variants(etag):
+    """``etag`` and the ETags of its compressed variants."""
+    return [etag] + [f"{etag}-{coding}" for coding in ("zstd", "br", "gzip")]
+
+
+class ResponseCompressor:
+    def __init__(self, levels=None, min_size=1024, cache_size=64, cache_ttl=3600):
+        self.codings = available_codings(levels or {})
+        self.min_size = int(min_size)
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+
+        self.compressed = 0
+        self.streamed = 0
+        self.skipped_small = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self, accept_encodings):
+        best, best_q = None, 0
+        for coding in self.codings:
+            q = accept_encodings[coding]
+            if q > best_q:
+                best, best_q = coding, q
+        return best
+
+    def process(self, request, response):
+        if response.status_code == 304:
+            response.vary.add("Accept-Encoding")
+            return response
+        if (response.status_code != 200 or "Content-Encoding" in response.headers or
+                response.mimetype not in COMPRESSIBLE):
+            return response
+        response.vary.add("Accept-Encoding")
+
+        coding = self.negotiate(request.accept_encodings)
+        if coding is None:
+            return response
+        compressor = self.codings[coding]
+
+        if response.is_streamed and response.content_length is None:
+            response.response = self._stream(response.response, compressor)
+            response.headers.pop("Content-Length", None)
+            self.streamed += 1
+        else:
+            response.direct_passthrough = False
+            body = response.get_data()
+            if len(body) < self.min_size:
+                self.skipped_small += 1
+                return response
+
+            etag, weak = response.get_etag()
+            if etag and not weak:
+                key = (request.full_path, etag, coding, compressor.level)
+                data = self.cache.get_or_compute(key, lambda: compressor.compress(body))
+            else:
+                data = compressor.compress(body)
+
+            response.set_data(data)
+            self.compressed += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(data)
+
+        response.headers["Content-Encoding"] = coding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{coding}", weak)
+        return response
+
+    def _stream(self, chunks, compressor):
+        c = compressor.stream()
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                out = c.compress(chunk)
+                if out:
+                    yield out
+            yield c.flush()
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    def stats(self):
+        return {
+            "codings": list(self.codings),
+            "compressed": self.compressed,
+            "streamed": self.streamed,
+            "skipped_small": self.skipped_small,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "cache": self.cache.stats(),
+        }
@@ -0,0 +1,30 @@
+"""gunicorn settings, read automatically by `gunicorn app:app` (procfile.txt).
+
+The master imports the app, applies migrations and loads the model once,
+then forks the workers, which share the model's pages instead of each
+loading a copy (see shared_model.py). Workers still reload the model
+themselves when the artifact changes on disk; that copy is their own.
+
+GUNICORN_PRELOAD=0 goes back to every worker importing and loading
+everything itself. WEB_CONCURRENCY sets the worker count, as usual.
+"""
+import gc
+import os
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from app import get_model, init_db
+
+    init_db()
+    get_model()
+
+
+def pre_fork(server, worker):
+    # Move everything the master holds out of the collector's reach, so
+    # collections in the workers don't write to (and copy) inherited pages
+    if preload_app:
+        gc.freeze()
@@ -0,0 +1,281 @@
+"""Bulk catalog loader for the Exoplanet table.
+
+Reads the CSV in bounded chunks, drops rows with missing features and
+duplicate names with vectorized pandas operations, and writes each chunk
+with a single ``executemany`` of ``INSERT ... ON CONFLICT(name)``, one
+transaction per chunk. Existing planets are updated only when a feature
+value actually changed (or left alone with ``--on-conflict skip``).
+
+    python ingest.py [exoplanets_clean_full.csv] [--chunk-size 50000]
+
+It can also stream the raw NASA archive export straight out of the bundled
+zip without extracting it, applying the same cleaning that produced
+exoplanets_clean_full.csv (per-feature median imputation) chunk by chunk:
+
+    python ingest.py --zip [exoplanet-and-host-star-properties-dataset.zip]
+    python ingest.py --zip --cache catalog.npz     # columnar cache, no DB
+"""
+import argparse
+import os
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from migrations import DB_PATH, connect, migrate_path
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+CSV_PATH = os.path.join(BASE_DIR, "exoplanets_clean_full.csv")
+ZIP_PATH = os.path.join(BASE_DIR, "exoplanet-and-host-star-properties-dataset.zip")
+
+FEATURES = [
+    "pl_rade",
+    "pl_bmasse",
+    "pl_eqt",
+    "pl_orbper",
+    "st_teff",
+    "st_rad"
+]
+
+_COLUMNS = ", ".join(["name"] + FEATURES)
+_PARAMS = ", ".join("?" * (len(FEATURES) + 1))
+
+UPSERT_SQL = {
+    "skip": f"""
+        INSERT INTO exoplanet ({_COLUMNS}) VALUES ({_PARAMS})
+        ON CONFLICT(name) DO NOTHING
+    """,
+    "update": f"""
+        INSERT INTO exoplanet ({_COLUMNS}) VALUES ({_PARAMS})
+        ON CONFLICT(name) DO UPDATE SET
+            {", ".join(f"{f} = excluded.{f}" for f in FEATURES)}
+        WHERE {" OR ".join(f"{f} IS NOT excluded.{f}" for f in FEATURES)}
+    """,
+}
+
+
+def iter_csv_chunks(path=CSV_PATH, chunk_size=50000):
+    """Yield raw DataFrame chunks holding the FEATURES (and pl_name if present)."""
+    wanted = set(FEATURES) | {"pl_name"}
+    reader = pd.read_csv(
+        path,
+        chunksize=chunk_size,
+        usecols=lambda c: c in wanted,
+        dtype={f: "float64" for f in FEATURES},
+    )
+    yield from reader
+
+
+def zip_csv_members(zip_path=ZIP_PATH):
+    with zipfile.ZipFile(zip_path) as zf:
+        return [
+            info.filename for info in zf.infolist()
+            if info.filename.lower().endswith(".csv") and not info.is_dir()
+        ]
+
+
+def iter_zip_chunks(zip_path=ZIP_PATH, members=None, chunk_size=50000):
+    """Stream member CSVs of a zip archive as projected DataFrame chunks.
+
+    Members are decompressed on the fly; nothing is written to disk. Only
+    the FEATURES, ``pl_name`` and ``default_flag`` columns are parsed. Row
+    numbers continue across members so generated names stay unique.
+    """
+    wanted = set(FEATURES) | {"pl_name", "default_flag"}
+    offset = 0
+
+    with zipfile.ZipFile(zip_path) as zf:
+        for member in members or zip_csv_members(zip_path):
+            with zf.open(member) as fh:
+                reader = pd.read_csv(
+                    fh,
+                    chunksize=chunk_size,
+                    usecols=lambda c: c in wanted,
+                    dtype={f: "float64" for f in FEATURES},
+                )
+                last = -1
+                for chunk in reader:
+                    last = chunk.index[-1]
+                    chunk.index = chunk.index + offset
+                    yield chunk
+                offset += last + 1
+
+
+def column_medians(chunks):
+    """First streaming pass: per-feature medians over all non-null values.
+
+    Only the projected feature columns are retained (as float64), never the
+    full archive rows.
+    """
+    parts = {f: [] for f in FEATURES}
+    for chunk in chunks:
+        for f in FEATURES:
+            col = chunk[f].to_numpy(dtype=np.float64)
+            parts[f].append(col[~np.isnan(col)])
+
+    medians = {}
+    for f in FEATURES:
+        values = np.concatenate(parts[f]) if parts[f] else np.empty(0)
+        medians[f] = float(np.median(values)) if len(values) else np.nan
+    return medians
+
+
+def impute_chunks(chunks, medians):
+    for chunk in chunks:
+        yield chunk.fillna(medians)
+
+
+def default_rows_only(chunks):
+    # The archive lists several parameter sets per planet; default_flag == 1
+    # marks the one the archive recommends, giving one row per pl_name.
+    for chunk in chunks:
+        yield chunk[chunk["default_flag"] == 1]
+
+
+def clean_chunk(chunk, names="auto"):
+    """Name rows, drop incomplete ones and de-duplicate names (keep last).
+
+    ``names="row"`` (and files without a ``pl_name`` column) gives
+    ``Planet_<row number>`` names, matching what temp.py has always
+    generated. Returns (clean, dropped for missing values, dropped as
+    duplicates).
+    """
+    if names != "row" and "pl_name" in chunk.columns:
+        names = chunk["pl_name"].astype("string").str.strip()
+    else:
+        names = "Planet_" + (chunk.index + 1).astype(str)
+
+    df = chunk[FEATURES].copy()
+    df.insert(0, "name", names)
+
+    complete = df.notna().all(axis=1)
+    missing = int((~complete).sum())
+    df = df[complete]
+
+    dup = df["name"].duplicated(keep="last")
+    df = df[~dup]
+
+    return df, missing, int(dup.sum())
+
+
+def load_chunks(conn, chunks, on_conflict="update", names="auto"):
+    sql = UPSERT_SQL[on_conflict]
+    stats = {"read": 0, "written": 0, "missing": 0, "duplicates": 0}
+    started = time.perf_counter()
+
+    for chunk in chunks:
+        df, missing, dups = clean_chunk(chunk, names)
+
+        # rowcount sums sqlite3_changes() per row, which leaves out the
+        # exoplanet_changes rows the triggers add (total_changes doesn't)
+        with conn:
+            cursor = conn.executemany(sql, df.itertuples(index=False, name=None))
+
+        stats["read"] += len(chunk)
+        stats["written"] += max(cursor.rowcount, 0)
+        stats["missing"] += missing
+        stats["duplicates"] += dups
+
+        elapsed = time.perf_counter() - started
+        print(f"  … {stats['read']:>9,} rows read, "
+              f"{stats['read'] / elapsed:,.0f} rows/sec")
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def write_columnar_cache(path, chunks, names="auto"):
+    """Write cleaned chunks to an uncompressed .npz of per-column arrays."""
+    stats = {"read": 0, "written": 0, "missing": 0, "duplicates": 0}
+    started = time.perf_counter()
+    columns = {c: [] for c in ["name"] + FEATURES}
+
+    for chunk in chunks:
+        df, missing, dups = clean_chunk(chunk, names)
+        columns["name"].append(df["name"].to_numpy(dtype=str))
+        for f in FEATURES:
+            columns[f].append(df[f].to_numpy(dtype=np.float64))
+
+        stats["read"] += len(chunk)
+        stats["written"] += len(df)
+        stats["missing"] += missing
+        stats["duplicates"] += dups
+
+    # A later chunk may repeat a name; keep its last occurrence
+    arrays = {c: np.concatenate(v) if v else np.empty(0) for c, v in columns.items()}
+    _, last = np.unique(arrays["name"][::-1], return_index=True)
+    keep = np.sort(len(arrays["name"]) - 1 - last)
+    stats["duplicates"] += stats["written"] - len(keep)
+    stats["written"] = len(keep)
+
+    with open(path, "wb") as f:
+        np.savez(f, **{c: a[keep] for c, a in arrays.items()})
+
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def print_report(stats):
+    rate = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+    print("✅ CSV LOADING COMPLETED")
+    print(f"Rows read          : {stats['read']}")
+    print(f"Inserted / updated : {stats['written']}")
+    print(f"Unchanged          : {stats['read'] - stats['missing'] - stats['duplicates'] - stats['written']}")
+    print(f"Skipped (missing)  : {stats['missing']}")
+    print(f"Skipped (dup name) : {stats['duplicates']}")
+    print(f"Elapsed            : {stats['seconds']:.2f}s ({rate:,.0f} rows/sec)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load the exoplanet catalog")
+    parser.add_argument("csv", nargs="?", default=CSV_PATH)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--on-conflict", choices=sorted(UPSERT_SQL), default="update",
+                        help="what to do with planets that already exist")
+    parser.add_argument("--zip", nargs="?", const=ZIP_PATH, metavar="ARCHIVE",
+                        help="stream the raw archive export from a zip instead of a CSV")
+    parser.add_argument("--member", action="append",
+                        help="CSV member(s) of the zip to read (default: all)")
+    parser.add_argument("--impute", choices=["median", "drop"], default="median",
+                        help="zip only: fill missing features with medians, or drop the row")
+    parser.add_argument("--names", choices=["row", "pl_name"], default="row",
+                        help="zip only: Planet_<row> names, or archive names "
+                             "(default parameter set per planet)")
+    parser.add_argument("--cache", metavar="NPZ",
+                        help="write a columnar .npz cache instead of the database")
+    args = parser.parse_args(argv)
+
+    if args.zip:
+        def source():
+            chunks = iter_zip_chunks(args.zip, args.member, args.chunk_size)
+            if args.names == "pl_name":
+                chunks = default_rows_only(chunks)
+            return chunks
+
+        chunks = source()
+        if args.impute == "median":
+            print("Computing feature medians (streaming pass 1)…")
+            chunks = impute_chunks(source(), column_medians(chunks))
+        names = args.names
+    else:
+        chunks = iter_csv_chunks(args.csv, args.chunk_size)
+        names = "auto"
+
+    if args.cache:
+        stats = write_columnar_cache(args.cache, chunks, names)
+    else:
+        migrate_path(args.db)
+        conn = connect(args.db)
+        try:
+            stats = load_chunks(conn, chunks, on_conflict=args.on_conflict, names=names)
+        finally:
+            conn.close()
+
+    print_report(stats)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+"""Background scoring jobs for large CSV uploads.
+
+``POST /jobs`` spools the upload to disk and records a queued job in SQLite
+(the same file as the upload result store), so the request returns as soon
+as the file is saved. Workers claim queued jobs, stream-score the spooled
+CSV chunk by chunk into the ``ResultStore`` under the job ID, and report
+progress after every chunk.
+
+At most ``max_concurrent`` jobs run at once across all processes. A job
+whose worker stops heart-beating (the web worker was restarted or killed)
+is requeued and resumes after the last stored chunk; results are paged out
+of the store once it completes. Workers run either as threads inside the
+web process (``JOB_WORKERS``) or as a separate process:
+
+    python jobs.py worker [--workers 2]
+"""
+import argparse
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from result_store import ResultStore, UploadNotFound
+from upload_scoring import MissingColumns, read_upload_chunks
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+STORE_PATH = os.path.join(BASE_DIR, "instance", "upload_results.db")
+SPOOL_DIR = os.path.join(BASE_DIR, "instance", "job_uploads")
+MODEL_PATH = os.path.join(BASE_DIR, "model_fused.npz")
+
+FEATURES = [
+    "pl_rade",
+    "pl_bmasse",
+    "pl_eqt",
+    "pl_orbper",
+    "st_teff",
+    "st_rad"
+]
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = (
+    "queued", "running", "completed", "failed", "cancelled"
+)
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    k INTEGER NOT NULL,
+    spool_path TEXT NOT NULL,
+    bytes_total INTEGER NOT NULL,
+    bytes_read INTEGER NOT NULL DEFAULT 0,
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    rows_per_sec REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, created_at);
+"""
+
+
+class JobNotFound(KeyError):
+    pass
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobLost(Exception):
+    # The job was presumed dead and handed to another worker
+    pass
+
+
+class JobQueue:
+    def __init__(self, path=STORE_PATH, spool_dir=SPOOL_DIR, max_concurrent=2,
+                 stale_after=60, max_attempts=3, ttl=3600):
+        self.path = path
+        self.spool_dir = spool_dir
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.stale_after = float(stale_after)
+        self.max_attempts = int(max_attempts)
+        self.ttl = float(ttl)
+
+        # Created on first use, like the ResultStore tables
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def create_schema(self):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            os.makedirs(self.spool_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            finally:
+                conn.close()
+            self._schema_ready = True
+
+    def _connect(self):
+        self.create_schema()
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _execute(self, sql, params=()):
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(sql, params).rowcount
+        finally:
+            conn.close()
+
+    # -------------------------------------------------
+    # Submitting
+    # -------------------------------------------------
+    def submit(self, upload, k=10):
+        """Spool ``upload`` (a werkzeug FileStorage or a path) and queue it."""
+        self.create_schema()
+        self.purge()
+
+        job_id = uuid.uuid4().hex
+        spool_path = os.path.join(self.spool_dir, f"{job_id}.csv")
+        if isinstance(upload, str):
+            with open(upload, "rb") as src, open(spool_path, "wb") as dst:
+                for block in iter(lambda: src.read(1 << 20), b""):
+                    dst.write(block)
+        else:
+            upload.save(spool_path)
+
+        self._execute(
+            "INSERT INTO jobs (job_id, status, k, spool_path, bytes_total, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, int(k), spool_path, os.path.getsize(spool_path), time.time())
+        )
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancel a queued job now, or ask its worker to stop. Returns the status."""
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT status, spool_path FROM jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                if row is None:
+                    raise JobNotFound(job_id)
+                status, spool_path = row
+
+                if status == QUEUED:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ?",
+                        (CANCELLED, time.time(), job_id)
+                    )
+                    status = CANCELLED
+                elif status == RUNNING:
+                    conn.execute(
+                        "UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?", (job_id,)
+                    )
+        finally:
+            conn.close()
+
+        if status == CANCELLED:
+            _remove(spool_path)
+        return status
+
+    def purge(self):
+        """Forget finished jobs older than ``ttl`` (their results expire too)."""
+        conn = self._connect()
+        try:
+            with conn:
+                rows = conn.execute(
+                    f"SELECT job_id, spool_path FROM jobs WHERE status IN "
+                    f"({', '.join('?' * len(FINISHED))}) AND finished_at < ?",
+                    (*FINISHED, time.time() - self.ttl)
+                ).fetchall()
+                conn.executemany("DELETE FROM jobs WHERE job_id = ?",
+                                 [(job_id,) for job_id, _ in rows])
+        finally:
+            conn.close()
+
+        for _, spool_path in rows:
+            _remove(spool_path)
+        return len(rows)
+
+    # -------------------------------------------------
+    # Worker side
+    # -------------------------------------------------
+    def claim(self, worker):
+        """Atomically start the oldest queued job, if a slot is free."""
+        now = time.time()
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._recover_stale(conn, now)
+
+                running = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ?", (RUNNING,)
+                ).fetchone()[0]
+                row = None
+                if running < self.max_concurrent:
+                    row = conn.execute(
+                        "SELECT job_id, k, spool_path, bytes_total FROM jobs "
+                        "WHERE status = ? ORDER BY created_at LIMIT 1",
+                        (QUEUED,)
+                    ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, heartbeat_at = ?, "
+                        "started_at = COALESCE(started_at, ?), attempts = attempts + 1 "
+                        "WHERE job_id = ?",
+                        (RUNNING, worker, now, now, row[0])
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return {"job_id": row[0], "k": row[1], "spool_path": row[2], "bytes_total": row[3]}
+
+    def _recover_stale(self, conn, now):
+        # A running job whose worker went silent is requeued (and resumes
+        # from its stored rows), or failed after max_attempts tries
+        cutoff = now - self.stale_after
+        conn.execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, "
+            "error = 'worker stopped responding' "
+            "WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+            (FAILED, now, RUNNING, cutoff, self.max_attempts)
+        )
+        conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL "
+            "WHERE status = ? AND heartbeat_at < ?",
+            (QUEUED, RUNNING, cutoff)
+        )
+
+    def progress(self, job_id, worker, rows_processed, bytes_read, rows_per_sec):
+        """Record progress; raises JobCancelled if a cancel was requested."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET rows_processed = ?, bytes_read = ?, "
+                    "rows_per_sec = ?, heartbeat_at = ? "
+                    "WHERE job_id = ? AND worker = ?",
+                    (rows_processed, bytes_read, rows_per_sec, time.time(), job_id, worker)
+                )
+                row = conn.execute(
+                    "SELECT cancel_requested, worker FROM jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None or row[0]:
+            raise JobCancelled(job_id)
+        if row[1] != worker:
+            raise JobLost(job_id)
+
+    def finish(self, job_id, worker, status, error=None):
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT spool_path FROM jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                updated = conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?, "
+                    "bytes_read = CASE WHEN ? = ? THEN bytes_total ELSE bytes_read END "
+                    "WHERE job_id = ? AND worker = ?",
+                    (status, error, time.time(), status, COMPLETED, job_id, worker)
+                ).rowcount
+        finally:
+            conn.close()
+
+        if updated and row is not None:
+            _remove(row[0])
+
+    # -------------------------------------------------
+    # Reading
+    # -------------------------------------------------
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT status, k, bytes_total, bytes_read, rows_processed, rows_per_sec, "
+                "created_at, started_at, finished_at, attempts, cancel_requested, error "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            raise JobNotFound(job_id)
+
+        (status, k, bytes_total, bytes_read, rows, rate,
+         created_at, started_at, finished_at, attempts, cancel_requested, error) = row
+        return {
+            "job_id": job_id,
+            "status": status,
+            "k": k,
+            "rows_processed": rows,
+            "rows_per_sec": round(rate, 1) if rate else 0.0,
+            "progress": round(bytes_read / bytes_total, 4) if bytes_total else 1.0,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "attempts": attempts,
+            "cancel_requested": bool(cancel_requested),
+            "error": error,
+        }
+
+
+class _CountingReader:
+    # File wrapper that tracks how many bytes the CSV parser has consumed
+    def __init__(self, f):
+        self._f = f
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def __iter__(self):
+        return iter(self._f)
+
+
+def run_job(job, queue, store, score_fn, worker, features=FEATURES, chunk_rows=50000):
+    """Score one claimed job into ``store``; returns its final status."""
+    import pandas as pd
+
+    job_id = job["job_id"]
+    started = time.perf_counter()
+    scored = 0
+
+    try:
+        # Resume after the last stored chunk if a previous attempt died
+        try:
+            done = store.meta(job_id)["row_count"]
+        except UploadNotFound:
+            store.create(job["k"], upload_id=job_id)
+            done = 0
+
+        with open(job["spool_path"], "rb") as raw:
+            fh = _CountingReader(raw)
+            for chunk in read_upload_chunks(fh, features, chunk_rows):
+                rows_total = int(chunk.index[-1]) + 1
+                chunk = chunk[chunk.index >= done]
+                if len(chunk):
+                    X = chunk[features].to_numpy(dtype=float)
+                    store.append(job_id, chunk, score_fn(X))
+                    scored += len(chunk)
+
+                elapsed = time.perf_counter() - started
+                queue.progress(job_id, worker, rows_total, fh.bytes_read,
+                               scored / elapsed if elapsed else 0.0)
+
+        store.finish(job_id)
+        queue.finish(job_id, worker, COMPLETED)
+        return COMPLETED
+
+    except JobLost:
+        return RUNNING
+    except JobCancelled:
+        store.discard(job_id)
+        queue.finish(job_id, worker, CANCELLED)
+        return CANCELLED
+    except MissingColumns as e:
+        error = str(e)
+    except pd.errors.EmptyDataError:
+        error = "Uploaded CSV is empty"
+    except UploadNotFound:
+        error = "Results expired while the job was running"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+
+    store.discard(job_id)
+    queue.finish(job_id, worker, FAILED, error)
+    return FAILED
+
+
+class JobRunner:
+    """Pool of worker threads that claim and run jobs from a ``JobQueue``.
+
+    Threads are started lazily, and again after fork, like the
+    ``MicroBatcher`` worker.
+    """
+
+    def __init__(self, queue, store, score_fn, workers=1, poll_interval=0.5,
+                 features=FEATURES, chunk_rows=50000):
+        self.queue = queue
+        self.store = store
+        self.score_fn = score_fn
+        self.workers = int(workers)
+        self.poll_interval = float(poll_interval)
+        self.features = features
+        self.chunk_rows = int(chunk_rows)
+
+        self._lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+
+    def _alive(self):
+        return (self._pid == os.getpid() and
+                len(self._threads) == self.workers and
+                all(t.is_alive() for t in self._threads))
+
+    def ensure_started(self):
+        if self.workers <= 0 or self._alive():
+            return
+        with self._lock:
+            if self._alive():
+                return
+            self._pid = os.getpid()
+            self._threads = []
+            for i in range(self.workers):
+                t = threading.Thread(
+                    target=self._run, args=(f"{socket.gethostname()}:{self._pid}:{i}",),
+                    name=f"job-worker-{i}", daemon=True
+                )
+                t.start()
+                self._threads.append(t)
+
+    def _run(self, worker):
+        while True:
+            try:
+                job = self.queue.claim(worker)
+            except sqlite3.OperationalError:
+                job = None
+            if job is None:
+                time.sleep(self.poll_interval)
+                continue
+            run_job(job, self.queue, self.store, self.score_fn, worker,
+                    self.features, self.chunk_rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run background CSV scoring jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    w = sub.add_parser("worker", help="claim and run queued jobs until interrupted")
+    w.add_argument("--store", default=STORE_PATH)
+    w.add_argument("--spool-dir", default=SPOOL_DIR)
+    w.add_argument("--model", default=MODEL_PATH)
+    w.add_argument("--workers", type=int, default=1)
+    w.add_argument("--max-concurrent", type=int, default=2,
+                   help="running jobs allowed across all workers")
+    w.add_argument("--chunk-rows", type=int, default=50000)
+    w.add_argument("--scoring-workers", type=int, default=1,
+                   help="processes each chunk is sharded across")
+    args = parser.parse_args(argv)
+
+    from parallel_scoring import ParallelScorer
+    scorer = ParallelScorer(
+        args.model, workers=args.scoring_workers,
+        shard_rows=-(-args.chunk_rows // max(1, args.scoring_workers))
+    )
+
+    queue = JobQueue(args.store, args.spool_dir, max_concurrent=args.max_concurrent)
+    store = ResultStore(args.store)
+    runner = JobRunner(queue, store, scorer.predict, workers=args.workers,
+                       chunk_rows=args.chunk_rows)
+    runner.ensure_started()
+
+    print(f"✅ Job worker running ({args.workers} thread(s)); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""In-memory habitability leaderboard kept in sync with the Exoplanet table.
+
+Triggers on ``exoplanet`` (see migrations.py) append the id of every
+inserted, updated or deleted planet to ``exoplanet_changes``, whatever
+process wrote it (the app, rescore.py, ingest.py). Each process builds its leaderboard once with
+a single sorted read, then catches up by re-reading only the planets
+logged since the last change it applied. A change moves one entry in a
+sorted list (binary search plus a memmove), never a re-sort.
+
+Reads are O(k) for the top k and O(log n) for one planet's rank. Ranks are
+dense (ties share a rank), matching the ``rank`` column written by
+rescore.py.
+"""
+import bisect
+import threading
+import time
+
+from migrations import connect
+
+class VersionChanged(Exception):
+    """The leaderboard moved past the version a reader pinned."""
+
+
+def data_version(conn):
+    """Sequence number of the last logged change (0 if none yet)."""
+    row = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'exoplanet_changes'"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def database_id(conn):
+    """The id migrations gave this database file (None before version 5)."""
+    row = conn.execute("SELECT uuid FROM database_identity").fetchone()
+    return row[0] if row else None
+
+
+class Leaderboard:
+    def __init__(self, db_path, sync_interval=1.0, rebuild_fraction=0.125):
+        self.db_path = db_path
+        self.sync_interval = float(sync_interval)
+        # Applying more than this fraction of the board one entry at a time
+        # costs more than one bulk sort
+        self.rebuild_fraction = float(rebuild_fraction)
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._database = None
+        self._modified = None
+        self._synced = 0.0
+
+        self._keys = []        # sorted (-score, id)
+        self._entries = {}     # id -> (score, name)
+        self._by_name = {}     # name -> id
+        self._distinct = []    # sorted distinct -score
+        self._ties = {}        # score -> number of planets with it
+
+        self.rebuilds = 0
+        self.applied = 0
+
+    def _connect(self):
+        return connect(self.db_path, isolation_level=None)
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def database(self):
+        """``database_id`` of the database the board was read from."""
+        return self._database
+
+    @property
+    def last_modified(self):
+        """Unix time of the change at ``version`` (None if not recorded)."""
+        return self._modified
+
+    # -------------------------------------------------
+    # Syncing
+    # -------------------------------------------------
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and self._version is not None and now - self._synced < self.sync_interval:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                # One read transaction: the change list and the rows it
+                # points at come from the same snapshot
+                conn.execute("BEGIN")
+                version = data_version(conn)
+                database = database_id(conn)
+                if version == self._version and database == self._database:
+                    self._synced = now
+                    return
+
+                oldest = conn.execute("SELECT MIN(seq) FROM exoplanet_changes").fetchone()[0]
+                changed = None
+                # A different database's change log says nothing about this board
+                if (self._version is not None and database == self._database and
+                        (oldest is None or oldest <= self._version + 1)):
+                    changed = [r[0] for r in conn.execute(
+                        "SELECT DISTINCT planet_id FROM exoplanet_changes WHERE seq > ?",
+                        (self._version,)
+                    )]
+
+                if changed is None or len(changed) > self.rebuild_fraction * max(len(self._keys), 1):
+                    self._rebuild(conn)
+                else:
+                    self._apply(conn, changed)
+
+                modified = conn.execute(
+                    "SELECT changed_at FROM exoplanet_changes WHERE seq = ?", (version,)
+                ).fetchone()
+
+                conn.execute("COMMIT")
+                self._version = version
+                self._database = database
+                self._modified = modified[0] if modified else None
+                self._synced = now
+            finally:
+                conn.close()
+
+    def _rebuild(self, conn):
+        rows = conn.execute(
+            "SELECT id, name, habitability_score FROM exoplanet "
+            "WHERE habitability_score IS NOT NULL "
+            "ORDER BY habitability_score DESC, id"
+        ).fetchall()
+
+        self._keys = [(-score, pid) for pid, _, score in rows]
+        self._entries = {pid: (score, name) for pid, name, score in rows}
+        self._by_name = {name: pid for pid, name, _ in rows}
+        self._ties = {}
+        for _, _, score in rows:
+            self._ties[score] = self._ties.get(score, 0) + 1
+        self._distinct = sorted(-s for s in self._ties)
+        self.rebuilds += 1
+
+    def _apply(self, conn, changed):
+        current = {}
+        for start in range(0, len(changed), 500):
+            ids = changed[start:start + 500]
+            current.update(
+                (pid, (score, name)) for pid, name, score in conn.execute(
+                    f"SELECT id, name, habitability_score FROM exoplanet "
+                    f"WHERE id IN ({', '.join('?' * len(ids))})",
+                    ids
+                )
+            )
+
+        for pid in changed:
+            self._remove(pid)
+            score, name = current.get(pid, (None, None))
+            if score is not None:
+                self._insert(pid, score, name)
+        self.applied += len(changed)
+
+    def _insert(self, pid, score, name):
+        bisect.insort(self._keys, (-score, pid))
+        self._entries[pid] = (score, name)
+        self._by_name[name] = pid
+        if score not in self._ties:
+            bisect.insort(self._distinct, -score)
+        self._ties[score] = self._ties.get(score, 0) + 1
+
+    def _remove(self, pid):
+        entry = self._entries.pop(pid, None)
+        if entry is None:
+            return
+        score, name = entry
+        i = bisect.bisect_left(self._keys, (-score, pid))
+        del self._keys[i]
+        if self._by_name.get(name) == pid:
+            del self._by_name[name]
+        self._ties[score] -= 1
+        if not self._ties[score]:
+            del self._ties[score]
+            del self._distinct[bisect.bisect_left(self._distinct, -score)]
+
+    # -------------------------------------------------
+    # Reading
+    # -------------------------------------------------
+    def __len__(self):
+        return len(self._keys)
+
+    def _check(self, version):
+        if version is not None and version != self._version:
+            raise VersionChanged(f"at version {self._version}, not {version}")
+
+    def top(self, k=10, offset=0, version=None):
+        """The ``k`` best planets from ``offset`` on, as (rank, id, name, score).
+
+        With ``version``, raises VersionChanged unless the board is at it.
+        """
+        with self._lock:
+            self._check(version)
+            keys = self._keys[offset:offset + k]
+            if not keys:
+                return []
+            rank = bisect.bisect_left(self._distinct, keys[0][0]) + 1
+            results, prev = [], keys[0][0]
+            for neg_score, pid in keys:
+                if neg_score != prev:
+                    rank += 1
+                    prev = neg_score
+                score, name = self._entries[pid]
+                results.append((rank, pid, name, score))
+            return results
+
+    def rank_of(self, name, version=None):
+        """Dense rank, 1-based position and score of one planet, or None."""
+        with self._lock:
+            self._check(version)
+            pid = self._by_name.get(name)
+            if pid is None:
+                return None
+            score, _ = self._entries[pid]
+            return {
+                "id": pid,
+                "planet_name": name,
+                "rank": bisect.bisect_left(self._distinct, -score) + 1,
+                "position": bisect.bisect_left(self._keys, (-score, pid)) + 1,
+                "habitability_score": score,
+                "ranked_planets": len(self._keys),
+            }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "planets": len(self._keys),
+                "distinct_scores": len(self._distinct),
+                "version": self._version,
+                "rebuilds": self.rebuilds,
+                "changes_applied": self.applied,
+            }
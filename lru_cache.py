@@ -0,0 +1,135 @@
+"""Thread-safe LRU cache with a TTL and an optional memory budget.
+
+Used for dashboard query results (app.query_cache), compressed response
+bodies (compression.py) and, wrapped by ``PredictionCache``, model scores.
+
+Entries expire after ``ttl`` seconds and the least recently used go once
+there are more than ``maxsize``. With ``max_bytes`` set, the entries'
+total ``nbytes`` is also kept under that many bytes, and a value larger
+than the whole budget is returned without being stored.
+
+``invalidate`` drops everything; a value computed by ``get_or_compute``
+across an invalidation is not stored, since it may be from before it.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def nbytes(value):
+    """Approximate memory held by a cached value: array and buffer sizes,
+    summed through dicts, lists and tuples."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    def __init__(self, maxsize=256, ttl=3600, max_bytes=0):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self.max_bytes = int(max_bytes)
+
+        self._data = OrderedDict()    # key -> (value, expires, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.oversize = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires, size = entry
+            if expires <= now:
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            size = nbytes(value) if self.max_bytes > 0 else 0
+            if size > self.max_bytes > 0:
+                self.oversize += 1
+                return
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (value, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while len(self._data) > self.maxsize or (
+                    self.max_bytes > 0 and self._bytes > self.max_bytes):
+                self._bytes -= self._data.popitem(last=False)[1][2]
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            generation = self._generation
+            value = compute()
+            self.put(key, value, generation)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+            if self.max_bytes > 0:
+                stats.update(bytes=self._bytes, max_bytes=self.max_bytes,
+                             oversize=self.oversize)
+            return stats
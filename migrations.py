@@ -0,0 +1,236 @@
+"""Schema migrations and connection settings for the exoplanet database.
+
+Every entry point (app.py, rescore.py, ingest.py, the plotting scripts)
+uses ``DB_PATH`` from here, so they all read and write the same file. The
+``EXOPLANET_DB`` environment variable overrides it.
+
+Migrations are numbered and applied in order, each in one transaction;
+the last applied number is kept in SQLite's ``PRAGMA user_version``, so
+running them again is a no-op:
+
+    python migrations.py [--db instance/exoplanets.db]
+
+``PRAGMAS`` are applied to every new connection: WAL so readers never wait
+for a writer (and a writer never waits for readers), ``synchronous=NORMAL``
+(durable at checkpoints, safe with WAL), a memory-mapped read path and a
+larger page cache.
+"""
+import argparse
+import os
+import sqlite3
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+DB_PATH = os.environ.get(
+    "EXOPLANET_DB", os.path.join(BASE_DIR, "instance", "exoplanets.db")
+)
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,        # KiB, i.e. 64 MB
+    "busy_timeout": 30000,       # ms
+    "temp_store": "MEMORY",
+}
+
+
+def apply_pragmas(conn):
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+def connect(path=DB_PATH, **kwargs):
+    """sqlite3 connection to ``path`` with ``PRAGMAS`` applied."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=PRAGMAS["busy_timeout"] / 1000, **kwargs)
+    apply_pragmas(conn)
+    return conn
+
+
+# -------------------------------------------------
+# Migrations
+# -------------------------------------------------
+def _create_exoplanet(conn):
+    # Same table the Exoplanet model in app.py declares
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS exoplanet (
+            id INTEGER NOT NULL,
+            name VARCHAR(100) NOT NULL,
+            pl_rade FLOAT,
+            pl_bmasse FLOAT,
+            pl_eqt FLOAT,
+            pl_orbper FLOAT,
+            st_teff FLOAT,
+            st_rad FLOAT,
+            habitability_score FLOAT,
+            rank INTEGER,
+            PRIMARY KEY (id),
+            UNIQUE (name)
+        )
+    """)
+
+
+def _create_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_exoplanet_habitability_score "
+                 "ON exoplanet (habitability_score)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_exoplanet_rank ON exoplanet (rank)")
+    # Covers /score_distribution and /correlations without touching the table
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_exoplanet_dashboard "
+                 "ON exoplanet (habitability_score, st_teff, pl_eqt)")
+
+
+# exoplanet_changes: one row per inserted, deleted or rescored planet,
+# read by leaderboard.py. The newest CHANGE_LOG_KEEP entries are kept; a
+# reader that falls further behind rebuilds from scratch.
+CHANGE_LOG_KEEP = 100000
+
+CHANGE_LOG_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS exoplanet_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        planet_id INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS exoplanet_changes_insert
+    AFTER INSERT ON exoplanet BEGIN
+        INSERT INTO exoplanet_changes (planet_id) VALUES (NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS exoplanet_changes_update
+    AFTER UPDATE OF habitability_score, name ON exoplanet
+    WHEN NEW.habitability_score IS NOT OLD.habitability_score OR NEW.name IS NOT OLD.name
+    BEGIN
+        INSERT INTO exoplanet_changes (planet_id) VALUES (NEW.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS exoplanet_changes_delete
+    AFTER DELETE ON exoplanet BEGIN
+        INSERT INTO exoplanet_changes (planet_id) VALUES (OLD.id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS exoplanet_changes_prune
+    AFTER INSERT ON exoplanet_changes WHEN NEW.seq % 10000 = 0 BEGIN
+        DELETE FROM exoplanet_changes WHERE seq <= NEW.seq - {CHANGE_LOG_KEEP};
+    END
+    """,
+]
+
+
+def _create_change_log(conn):
+    for statement in CHANGE_LOG_SCHEMA:
+        conn.execute(statement)
+
+
+# Version 4: every write to a planet is logged (not only score and name
+# changes), so the change sequence doubles as the data version behind the
+# HTTP ETags, and each entry records when it happened (Unix seconds) for
+# Last-Modified. Rank-only updates (rescore.py) change nothing served.
+_NOW = "(julianday('now') - 2440587.5) * 86400.0"
+_LOGGED_COLUMNS = ["name", "pl_rade", "pl_bmasse", "pl_eqt", "pl_orbper",
+                   "st_teff", "st_rad", "habitability_score"]
+
+CHANGE_LOG_TRIGGERS = [
+    f"""
+    CREATE TRIGGER exoplanet_changes_insert
+    AFTER INSERT ON exoplanet BEGIN
+        INSERT INTO exoplanet_changes (planet_id, changed_at) VALUES (NEW.id, {_NOW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER exoplanet_changes_update
+    AFTER UPDATE ON exoplanet
+    WHEN {" OR ".join(f"NEW.{c} IS NOT OLD.{c}" for c in _LOGGED_COLUMNS)}
+    BEGIN
+        INSERT INTO exoplanet_changes (planet_id, changed_at) VALUES (NEW.id, {_NOW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER exoplanet_changes_delete
+    AFTER DELETE ON exoplanet BEGIN
+        INSERT INTO exoplanet_changes (planet_id, changed_at) VALUES (OLD.id, {_NOW});
+    END
+    """,
+]
+
+
+def _log_every_write(conn):
+    conn.execute("ALTER TABLE exoplanet_changes ADD COLUMN changed_at REAL")
+    for name in ("insert", "update", "delete"):
+        conn.execute(f"DROP TRIGGER IF EXISTS exoplanet_changes_{name}")
+    for statement in CHANGE_LOG_TRIGGERS:
+        conn.execute(statement)
+
+
+# Version 5: a random id per database, so caches keyed by the data version
+# (reports.ExportCache) can tell a recreated or replaced file, whose change
+# sequence starts over, from the one they were built from.
+def _create_identity(conn):
+    conn.execute("CREATE TABLE database_identity (uuid TEXT NOT NULL)")
+    conn.execute("INSERT INTO database_identity (uuid) VALUES (lower(hex(randomblob(16))))")
+
+
+MIGRATIONS = [
+    (1, "exoplanet table", _create_exoplanet),
+    (2, "score, rank and dashboard indexes", _create_indexes),
+    (3, "exoplanet_changes log for the leaderboard", _create_change_log),
+    (4, "log every planet write with its time", _log_every_write),
+    (5, "database identity", _create_identity),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply pending migrations, each in its own transaction. Returns them."""
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if version <= schema_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version={version}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        applied.append((version, description))
+
+    if applied:
+        conn.execute("ANALYZE")
+    return applied
+
+
+def migrate_path(path=DB_PATH):
+    conn = connect(path, isolation_level=None)
+    try:
+        return migrate(conn)
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply exoplanet database migrations")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    applied = migrate_path(args.db)
+    for version, description in applied:
+        print(f"  applied {version}: {description}")
+
+    conn = connect(args.db)
+    try:
+        print(f"✅ {args.db} at schema version {schema_version(conn)} "
+              f"(journal_mode={conn.execute('PRAGMA journal_mode').fetchone()[0]})")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,7 @@
 # # Save artifacts (IMPORTANT)
 # # -------------------------------------------------
 # joblib.dump(model, "model.pkl")
+# model.get_booster().save_model("model.json")   # served by tree_engine.py
 # joblib.dump(scaler, "scaler.pkl")
 # joblib.dump(FEATURES, "features.pkl")
 
@@ -0,0 +1,87 @@
+"""Running covariance / correlation of a fixed set of columns.
+
+``CorrelationAccumulator`` keeps, for every pair of columns, the count,
+means, sums of squared deviations and co-moment over the rows where both
+values are present (pairwise deletion, like ``DataFrame.corr()``). Rows
+are added and removed in batches with Chan et al.'s parallel form of
+Welford's update, so a write costs O(rows changed) whatever the table
+size, and the running sums never go through the cancellation-prone
+sum-of-squares route.
+
+Everything is a k x k matrix (k columns) where entry [i, j] describes
+column i over the rows in which columns i and j are both present.
+"""
+import numpy as np
+
+
+class CorrelationAccumulator:
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+
+    def copy(self):
+        other = CorrelationAccumulator(self.columns)
+        other.n, other.mean = self.n.copy(), self.mean.copy()
+        other.m2, other.comoment = self.m2.copy(), self.comoment.copy()
+        return other
+
+    def _batch(self, X):
+        # Pairwise moments of an (r, k) batch, NaN = missing. Values are
+        # shifted by the running means first so the one-pass sums below
+        # stay well conditioned.
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.columns))
+        present = ~np.isnan(X)
+        counts = present.sum(axis=0)
+        first = np.where(present, X, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        shift = np.where(self.n.diagonal() > 0, self.mean.diagonal(), first)
+        Z = np.where(present, X - shift, 0.0)
+        W = present.astype(np.float64)
+
+        n = W.T @ W
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, (Z.T @ W) / n, 0.0)
+        m2 = (Z * Z).T @ W - n * mean * mean
+        comoment = Z.T @ Z - n * mean * mean.T
+        return n, mean + shift[:, None], np.maximum(m2, 0.0), comoment
+
+    def add(self, X):
+        """Include the rows of ``X`` (one column per accumulator column)."""
+        nb, mb, m2b, cb = self._batch(X)
+        n = self.n + nb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(n > 0, nb / n, 0.0)
+            w = np.where(n > 0, self.n * nb / n, 0.0)
+        delta = mb - self.mean
+        self.mean = self.mean + delta * frac
+        self.m2 = self.m2 + m2b + delta * delta * w
+        self.comoment = self.comoment + cb + delta * delta.T * w
+        self.n = n
+
+    def remove(self, X):
+        """Exclude rows previously added (the same values)."""
+        nb, mb, m2b, cb = self._batch(X)
+        n = self.n - nb
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, (self.n * self.mean - nb * mb) / n, 0.0)
+            delta = mb - mean
+            w = np.where(self.n > 0, n * nb / self.n, 0.0)
+        self.m2 = np.where(n > 0, np.maximum(self.m2 - m2b - delta * delta * w, 0.0), 0.0)
+        self.comoment = np.where(n > 0, self.comoment - cb - delta * delta.T * w, 0.0)
+        self.mean = mean
+        self.n = n
+
+    def covariance(self):
+        """Sample covariance (ddof=1); NaN where fewer than two rows."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 1, self.comoment / (self.n - 1), np.nan)
+
+    def correlation(self):
+        """Pearson correlation; NaN where undefined (constant or < 2 rows)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            denom = np.sqrt(self.m2 * self.m2.T)
+            corr = np.where((self.n > 1) & (denom > 0), self.comoment / denom, np.nan)
+        return np.clip(corr, -1.0, 1.0)
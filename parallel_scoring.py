@@ -0,0 +1,150 @@
+"""Multi-core scoring of large FEATURES batches.
+
+``ParallelScorer.predict(X)`` splits the rows into shards of ``shard_rows``
+and scores them on a persistent process pool. Every worker loads the model
+artifact once, in the pool initializer, and reuses it for all later tasks.
+Rows travel through shared memory: the batch is copied into one shared
+input block, each worker writes its (float32, like ``TreeEnsemble``)
+scores into its slice of a shared output block, and tasks themselves are
+only ``(start, stop)`` pairs. The output is therefore already in row
+order; nothing is pickled per task.
+
+Small batches (or ``workers=1``) are scored in-process, so this is a drop-in
+replacement for ``model.predict`` on any bulk path.
+"""
+import multiprocessing as mp
+import os
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from tree_engine import load_model
+
+# Per-worker state, set by _init_worker
+_model = None
+
+
+def _init_worker(model_path):
+    global _model
+    _model = load_model(model_path)
+
+
+def _score_shard(args):
+    in_name, out_name, n_rows, n_features, start, stop = args
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        X = np.ndarray((n_rows, n_features), dtype=np.float64, buffer=shm_in.buf)
+        out = np.ndarray((n_rows,), dtype=np.float32, buffer=shm_out.buf)
+        out[start:stop] = _model.predict(X[start:stop])
+        del X, out
+    finally:
+        shm_in.close()
+        shm_out.close()
+    return stop - start
+
+
+def _artifact_stamp(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def default_workers():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ParallelScorer:
+    def __init__(self, model_path, workers=None, shard_rows=50000, start_method=None):
+        self.model_path = model_path
+        self.workers = max(1, int(workers or default_workers()))
+        self.shard_rows = max(1, int(shard_rows))
+        self.start_method = start_method
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._stamp = None
+        self._model = None
+
+    # -------------------------------------------------
+    # Model and pool lifecycle
+    # -------------------------------------------------
+    def _refresh(self):
+        # Reload (and restart the pool) when the artifact changes on disk
+        stamp = _artifact_stamp(self.model_path)
+        if stamp != self._stamp:
+            self._close_pool()
+            self._model = load_model(self.model_path)
+            self._stamp = stamp
+
+    def _ensure_pool(self):
+        # Created lazily, and again after fork: a pool inherited from a
+        # preloading parent belongs to that parent
+        if self._pool is not None and self._pid == os.getpid():
+            return self._pool
+        self._pool = None
+        # Workers must share the parent's resource tracker; one they started
+        # themselves would treat the parent's blocks as leaked on exit
+        resource_tracker.ensure_running()
+        ctx = mp.get_context(self.start_method)
+        self._pool = ctx.Pool(
+            self.workers, initializer=_init_worker, initargs=(self.model_path,)
+        )
+        self._pid = os.getpid()
+        return self._pool
+
+    def _close_pool(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.terminate()
+            self._pool.join()
+        self._pool = None
+
+    def close(self):
+        with self._lock:
+            self._close_pool()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------------------------------
+    # Scoring
+    # -------------------------------------------------
+    def predict(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_rows = X.shape[0]
+
+        with self._lock:
+            self._refresh()
+            model = self._model
+            pool = None
+            if self.workers > 1 and n_rows > self.shard_rows:
+                pool = self._ensure_pool()
+
+        if pool is None:
+            return model.predict(X)
+
+        n_features = X.shape[1]
+        shm_in = shared_memory.SharedMemory(create=True, size=max(1, X.nbytes))
+        shm_out = shared_memory.SharedMemory(create=True, size=max(1, n_rows * 4))
+        try:
+            np.ndarray(X.shape, dtype=np.float64, buffer=shm_in.buf)[:] = X
+            tasks = [
+                (shm_in.name, shm_out.name, n_rows, n_features,
+                 start, min(start + self.shard_rows, n_rows))
+                for start in range(0, n_rows, self.shard_rows)
+            ]
+            pool.map(_score_shard, tasks, chunksize=1)
+            out = np.ndarray((n_rows,), dtype=np.float32, buffer=shm_out.buf).copy()
+        finally:
+            shm_in.close()
+            shm_in.unlink()
+            shm_out.close()
+            shm_out.unlink()
+        return out
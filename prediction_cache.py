@@ -0,0 +1,62 @@
+import math
+
+from lru_cache import LRUCache
+
+
+class PredictionCache:
+    """Bounded LRU cache of model scores keyed on a tuple of feature values.
+
+    With ``sig_digits`` set, every value is rounded to that many significant
+    digits to form the key, and callers score the rounded values. The cached
+    result is then a pure function of the key, so a hit is always identical
+    to what a miss would have computed. Missing values (NaN) key as None,
+    since NaN never compares equal to itself.
+
+    Entries expire after ``ttl`` seconds. ``invalidate`` drops everything,
+    and is called whenever the model artifact is reloaded; a score computed
+    by a model that was replaced mid-flight is not stored.
+    """
+
+    def __init__(self, maxsize=50000, ttl=3600, sig_digits=0):
+        self.sig_digits = int(sig_digits)
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    @property
+    def maxsize(self):
+        return self._cache.maxsize
+
+    @property
+    def ttl(self):
+        return self._cache.ttl
+
+    @property
+    def enabled(self):
+        return self._cache.enabled
+
+    def key(self, values):
+        values = [float(v) for v in values]
+        if self.sig_digits <= 0:
+            return tuple(None if v != v else v for v in values)
+        return tuple(None if v != v else self._round(v) for v in values)
+
+    def _round(self, v):
+        if v == 0 or not math.isfinite(v):
+            return v
+        return round(v, self.sig_digits - 1 - math.floor(math.log10(abs(v))))
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def put(self, key, value, generation=None):
+        self._cache.put(key, value, generation)
+
+    def get_or_compute(self, key, compute):
+        return self._cache.get_or_compute(key, compute)
+
+    def invalidate(self):
+        self._cache.invalidate()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats["sig_digits"] = self.sig_digits
+        return stats
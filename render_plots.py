@@ -0,0 +1,361 @@
+"""Render the PNGs in static/, skipping every plot whose inputs are unchanged.
+
+Each plot has a fingerprint: a SHA-256 over what it is drawn from (the
+model and feature artifacts for feature importance; the database's
+identity, data version and scores for the score distribution, see
+migrations.py) plus the render options. The heatmap is drawn from the running app's /correlation_matrix
+when it answers, so its fingerprint covers the version and matrix that
+endpoint returned, not the local database's. Fingerprints of the last
+render are kept in static/.render_manifest.json; a plot is only redrawn
+when its fingerprint changed or its file is missing.
+
+Stale plots render in parallel worker processes. matplotlib and seaborn
+are imported only inside the workers, so a run with nothing to do never
+pays their startup (nor starts a worker). Every file is written to a temporary name in static/
+and moved into place with os.replace, so Flask serves either the old
+image or the new one, never a partial file.
+
+    python render_plots.py [--force] [--only NAME ...] [--workers N]
+                           [--webp] [--optimize-png]
+
+--webp also writes a lossless .webp next to each PNG; --optimize-png
+re-encodes the PNG with maximum zlib effort (both need Pillow, which
+matplotlib already depends on).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from leaderboard import data_version, database_id
+from migrations import DB_PATH, connect, migrate_path
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+MANIFEST_PATH = os.path.join(STATIC_DIR, ".render_manifest.json")
+
+# Bump to force a re-render after changing how the plots are drawn
+RENDER_VERSION = 1
+
+API = os.environ.get("EXOPLANET_API", "http://127.0.0.1:5000")
+
+
+# -------------------------------------------------
+# Fingerprints
+# -------------------------------------------------
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _model_inputs():
+    return {name: file_sha256(os.path.join(BASE_DIR, name))
+            for name in ("model.pkl", "features.pkl")}
+
+
+def _data_inputs():
+    # The scores travel with the inputs, read in the same transaction as
+    # the version, so the worker draws exactly what was fingerprinted
+    migrate_path(DB_PATH)
+    conn = connect(DB_PATH, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        inputs = {
+            "db": os.path.realpath(DB_PATH),
+            "database": database_id(conn),
+            "data_version": data_version(conn),
+            "scores": [r[0] for r in conn.execute(
+                "SELECT habitability_score FROM exoplanet "
+                "WHERE habitability_score IS NOT NULL ORDER BY id"
+            )],
+        }
+        conn.execute("COMMIT")
+        return inputs
+    finally:
+        conn.close()
+
+
+def _correlation_inputs():
+    # From the running app's /correlation_matrix when it is up, otherwise
+    # from one snapshot of the local database. The matrix travels with the
+    # inputs, so the worker draws exactly what was fingerprinted.
+    try:
+        with urllib.request.urlopen(f"{API}/correlation_matrix", timeout=10) as response:
+            data = json.load(response)
+        source, version = API, int(data["version"])
+        columns, matrix = list(data["columns"]), data["matrix"]
+    except (OSError, ValueError, KeyError, TypeError):
+        from snapshot import TableSnapshot
+        migrate_path(DB_PATH)
+        table = TableSnapshot(DB_PATH).current()
+        source, version = os.path.realpath(DB_PATH), table.version
+        acc = table.correlations
+        columns = acc.columns
+        matrix = [[None if v != v else v for v in row] for row in acc.correlation().tolist()]
+    return {"source": source, "data_version": version,
+            "correlations": {"columns": columns, "matrix": matrix}}
+
+
+def fingerprint(inputs, options):
+    payload = json.dumps({"render_version": RENDER_VERSION, "inputs": inputs,
+                          "options": options}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# -------------------------------------------------
+# Writing
+# -------------------------------------------------
+@contextmanager
+def atomic_path(path):
+    """A temporary path next to ``path``, moved over it on success."""
+    directory, name = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+
+def _save(plt, path, options):
+    with atomic_path(path) as tmp:
+        plt.savefig(tmp, dpi=150, format="png")
+    plt.close()
+
+    outputs = [path]
+    if options.get("optimize_png") or options.get("webp"):
+        from PIL import Image
+
+        with Image.open(path) as image:
+            image.load()
+        if options.get("optimize_png"):
+            with atomic_path(path) as tmp:
+                image.save(tmp, format="PNG", optimize=True)
+        if options.get("webp"):
+            webp = os.path.splitext(path)[0] + ".webp"
+            with atomic_path(webp) as tmp:
+                image.save(tmp, format="WEBP", lossless=True, method=6)
+            outputs.append(webp)
+    return outputs
+
+
+# -------------------------------------------------
+# Plots (run in worker processes)
+# -------------------------------------------------
+def render_feature_importance(path, options, inputs):
+    import joblib
+    import pandas as pd
+    plt, sns = _pyplot()
+
+    model = joblib.load(os.path.join(BASE_DIR, "model.pkl"))
+    features = joblib.load(os.path.join(BASE_DIR, "features.pkl"))
+
+    importance_df = pd.DataFrame({
+        "Feature": features,
+        "Importance": model.feature_importances_
+    }).sort_values(by="Importance", ascending=False)
+
+    plt.figure(figsize=(8, 5))
+    sns.barplot(
+        data=importance_df,
+        x="Importance",
+        y="Feature",
+        hue="Feature",
+        palette="viridis",
+        legend=False
+    )
+    plt.title("Feature Importance – Habitability Model")
+    plt.xlabel("Importance Score")
+    plt.ylabel("Feature")
+    plt.tight_layout()
+    return _save(plt, path, options)
+
+
+def render_habitability_distribution(path, options, inputs):
+    import pandas as pd
+    plt, sns = _pyplot()
+
+    scores = pd.Series(inputs["scores"], name="habitability_score", dtype=float)
+
+    plt.figure(figsize=(8, 5))
+    sns.histplot(scores, bins=30, kde=True, color="#00c6ff")
+    plt.axvline(0.5, color="red", linestyle="--", label="Habitability Threshold")
+    plt.title("Habitability Score Distribution")
+    plt.xlabel("Habitability Score")
+    plt.ylabel("Number of Planets")
+    plt.legend()
+    plt.tight_layout()
+    return _save(plt, path, options)
+
+
+def correlation_frame(inputs):
+    import pandas as pd
+
+    columns, matrix = inputs["correlations"]["columns"], inputs["correlations"]["matrix"]
+    return pd.DataFrame(matrix, index=columns, columns=columns, dtype=float)
+
+
+def render_correlation_heatmap(path, options, inputs):
+    plt, sns = _pyplot()
+    corr = correlation_frame(inputs)
+
+    plt.figure(figsize=(9, 7))
+    sns.heatmap(
+        corr,
+        annot=True,
+        fmt=".2f",
+        cmap="coolwarm",
+        center=0,
+        linewidths=0.5,
+        cbar_kws={"label": "Correlation Strength"}
+    )
+    plt.title("Star–Planet Feature Correlation Heatmap")
+    plt.tight_layout()
+    return _save(plt, path, options)
+
+
+# name -> (output file in static/, inputs, renderer)
+PLOTS = {
+    "feature_importance": ("feature_importance.png", _model_inputs, render_feature_importance),
+    "habitability_distribution": ("habitability_distribution.png", _data_inputs,
+                                  render_habitability_distribution),
+    "correlation_heatmap": ("feature_correlation_heatmap.png", _correlation_inputs,
+                            render_correlation_heatmap),
+}
+
+
+def _render(name, options, inputs):
+    filename, _, render = PLOTS[name]
+    start = time.perf_counter()
+    outputs = render(os.path.join(STATIC_DIR, filename), options, inputs)
+    return name, outputs, time.perf_counter() - start
+
+
+# -------------------------------------------------
+# Pipeline
+# -------------------------------------------------
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    with atomic_path(MANIFEST_PATH) as tmp:
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+class RenderFailed(Exception):
+    def __init__(self, names):
+        super().__init__(f"Failed to render: {', '.join(names)}")
+        self.names = names
+
+
+def run(names=None, force=False, workers=None, options=None):
+    """Render the stale plots among ``names``. Returns {name: outputs} rendered."""
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    names = list(names or PLOTS)
+    options = options or {}
+    manifest = load_manifest()
+
+    # Plots that share inputs (the two data plots) read them once
+    inputs_cache = {}
+    fingerprints, stale, plot_inputs = {}, [], {}
+    for name in names:
+        filename, inputs, _ = PLOTS[name]
+        if inputs not in inputs_cache:
+            inputs_cache[inputs] = inputs()
+        plot_inputs[name] = inputs_cache[inputs]
+        fingerprints[name] = fingerprint(plot_inputs[name], options)
+
+        entry = manifest.get(name, {})
+        outputs = entry.get("outputs", [filename])
+        if (force or entry.get("fingerprint") != fingerprints[name] or
+                not all(os.path.exists(os.path.join(STATIC_DIR, o)) for o in outputs)):
+            stale.append(name)
+        else:
+            print(f"  {name}: up to date")
+
+    if not stale:
+        return {}
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(stale)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(_render, name, options, plot_inputs[name]) for name in stale}
+
+    # A failed plot keeps its old file and manifest entry, so it is retried
+    # next run; the others are still recorded
+    rendered, failed = {}, []
+    for name, future in futures.items():
+        try:
+            _, outputs, seconds = future.result()
+        except Exception as e:
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+            failed.append(name)
+            continue
+
+        manifest[name] = {
+            "fingerprint": fingerprints[name],
+            "outputs": [os.path.relpath(o, STATIC_DIR) for o in outputs],
+            "sha256": {os.path.relpath(o, STATIC_DIR): file_sha256(o) for o in outputs},
+            "rendered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        rendered[name] = outputs
+        print(f"  {name}: rendered in {seconds:.2f}s")
+
+    save_manifest(manifest)
+    if failed:
+        raise RenderFailed(failed)
+    return rendered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the static/ plots that are out of date")
+    parser.add_argument("--only", nargs="+", choices=sorted(PLOTS), metavar="NAME")
+    parser.add_argument("--force", action="store_true", help="render even if up to date")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--webp", action="store_true", help="also write lossless .webp files")
+    parser.add_argument("--optimize-png", action="store_true")
+    args = parser.parse_args(argv)
+
+    options = {"webp": args.webp, "optimize_png": args.optimize_png}
+    try:
+        rendered = run(args.only, force=args.force, workers=args.workers, options=options)
+    except RenderFailed as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for outputs in rendered.values():
+        for path in outputs:
+            print(f"✅ {os.path.relpath(path, BASE_DIR)}")
+    if not rendered:
+        print("✅ All plots up to date")
+
+
+if __name__ == "__main__":
+    main()
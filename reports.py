@@ -0,0 +1,236 @@
+"""Top-planet reports (/export/excel, /export/pdf), built once per version.
+
+``write_xlsx`` and ``write_pdf`` take an iterator of planet dicts (see
+snapshot.Columns.rows) and write the report straight to a file: the
+workbook through openpyxl's write-only mode, one row at a time, and the
+PDF with reportlab, starting a new page whenever one fills. Neither
+builds a DataFrame or holds the whole report in a BytesIO first.
+
+``ExportCache`` keeps finished reports as files, keyed by (database id,
+data version, format, k). Every write to a planet bumps the data version,
+and a recreated or replaced database file, whose version counter starts
+over, has a new id (see migrations.py), so a cached report is never stale
+and needs no expiry. Concurrent requests for the
+same report, in this process or another worker sharing the directory,
+wait for the one build in progress instead of starting their own, and
+then all stream the same file.
+"""
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SHEET_NAME = "Top Habitable Planets"
+
+# (header, planet key) per spreadsheet column, after "Rank"
+EXCEL_COLUMNS = [
+    ("Planet Name", "name"),
+    ("Planet Radius", "pl_rade"),
+    ("Planet Mass", "pl_bmasse"),
+    ("Equilibrium Temp", "pl_eqt"),
+    ("Orbital Period", "pl_orbper"),
+    ("Star Temp", "st_teff"),
+    ("Star Radius", "st_rad"),
+    ("Habitability Score", "habitability_score"),
+]
+
+
+def write_xlsx(planets, out):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_NAME)
+
+    bold = Font(bold=True)
+    header = []
+    for title in ["Rank"] + [h for h, _ in EXCEL_COLUMNS]:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = bold
+        header.append(cell)
+    ws.append(header)
+
+    for i, p in enumerate(planets, start=1):
+        row = [i] + [p[key] for _, key in EXCEL_COLUMNS]
+        row[-1] = round(row[-1], 4)
+        ws.append(row)
+
+    wb.save(out)
+
+
+def write_pdf(planets, out, k, title=None):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(out, pagesize=A4)
+
+    width, height = A4
+    y = height - 40
+
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(50, y, title or f"Top {k} Habitable Exoplanets Report")
+    y -= 30
+
+    c.setFont("Helvetica", 10)
+
+    for i, p in enumerate(planets, start=1):
+        text = (
+            f"{i}. {p['name']} | "
+            f"Score: {round(p['habitability_score'],4)} | "
+            f"Radius: {p['pl_rade']} | "
+            f"Mass: {p['pl_bmasse']}"
+        )
+        c.drawString(50, y, text)
+        y -= 18
+
+        if y < 60:
+            c.showPage()
+            y = height - 40
+            c.setFont("Helvetica", 10)
+
+    c.save()
+
+
+class ExportCache:
+    def __init__(self, directory, max_files=32):
+        self.directory = directory
+        self.max_files = int(max_files)
+
+        self._lock = threading.Lock()
+        self._building = {}    # path -> lock held by the thread building it
+
+        self.hits = 0
+        self.builds = 0
+        self.joined = 0
+        self.evictions = 0
+
+    def _path(self, database, version, fmt, k):
+        return os.path.join(self.directory, f"top{k}-{database}-v{version}.{fmt}")
+
+    def _open(self, path):
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        # mtime is the LRU clock for _prune
+        os.utime(path)
+        return f
+
+    def get_or_build(self, database, version, fmt, k, build):
+        """An open binary file holding the report; ``build(out)`` writes it.
+
+        The caller closes the file (send_file does).
+        """
+        if self.max_files <= 0:
+            out = tempfile.TemporaryFile()
+            build(out)
+            out.seek(0)
+            with self._lock:
+                self.builds += 1
+            return out
+
+        path = self._path(database, version, fmt, k)
+        f = self._open(path)
+        if f is not None:
+            with self._lock:
+                self.hits += 1
+            return f
+
+        with self._lock:
+            flight = self._building.setdefault(path, threading.Lock())
+        # Created with the first report, not with the cache
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with flight, self._file_lock(path):
+                # Built while we waited, by a thread here or another worker
+                f = self._open(path)
+                if f is not None:
+                    with self._lock:
+                        self.joined += 1
+                    return f
+
+                fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".build-", suffix=f".{fmt}")
+                try:
+                    with os.fdopen(fd, "wb") as out:
+                        build(out)
+                    os.replace(tmp, path)
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                f = open(path, "rb")
+                with self._lock:
+                    self.builds += 1
+        finally:
+            with self._lock:
+                if self._building.get(path) is flight:
+                    del self._building[path]
+
+        self._prune()
+        return f
+
+    def _file_lock(self, path):
+        return _FileLock(path + ".lock")
+
+    def _prune(self):
+        # Least recently served reports beyond max_files (open files being
+        # streamed stay readable after the unlink)
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith(".") or name.endswith(".lock"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort()
+
+        for _, path in entries[:max(0, len(entries) - self.max_files)]:
+            for victim in (path, path + ".lock"):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        files = []
+        if self.max_files > 0 and os.path.isdir(self.directory):
+            files = [os.path.join(self.directory, n) for n in os.listdir(self.directory)
+                     if not n.startswith(".") and not n.endswith(".lock")]
+        with self._lock:
+            return {
+                "files": len(files),
+                "max_files": self.max_files,
+                "bytes": sum(os.path.getsize(p) for p in files if os.path.exists(p)),
+                "hits": self.hits,
+                "builds": self.builds,
+                "joined": self.joined,
+                "evictions": self.evictions,
+            }
+
+
+class _FileLock:
+    # Exclusive flock on a side file, so workers sharing the cache
+    # directory build each report once; a no-op without fcntl
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
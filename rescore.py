@@ -0,0 +1,246 @@
+"""Bulk rescoring of the Exoplanet table.
+
+Reads the feature columns straight from SQLite in id order, scores each
+chunk with one model call, and writes scores back with ``executemany``, one
+bounded transaction per chunk. Afterwards dense ranks (1 = most habitable,
+ties share a rank) are written to ``Exoplanet.rank``.
+
+Progress is checkpointed, so an interrupted run resumes where it stopped.
+By default only rows that are new, whose features changed, or that were
+scored by a different model artifact are rescored; ``--full`` rescores all.
+
+    python rescore.py [--full] [--chunk-size 5000] [--workers N]
+
+Each chunk is split across ``--workers`` processes (default: all cores).
+"""
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from migrations import DB_PATH, connect, migrate_path
+from parallel_scoring import ParallelScorer, default_workers
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "model_fused.npz")
+
+FEATURES = [
+    "pl_rade",
+    "pl_bmasse",
+    "pl_eqt",
+    "pl_orbper",
+    "st_teff",
+    "st_rad"
+]
+
+# Odd 64-bit multipliers used to fold a row of feature bits into one hash
+_HASH_MULT = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9,
+    0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53,
+], dtype=np.uint64)
+
+
+def model_stamp(path=MODEL_PATH):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def feature_hashes(X):
+    """Vectorized 64-bit fingerprint of each row (returned as signed int64)."""
+    bits = np.ascontiguousarray(X, dtype=np.float64).view(np.uint64)
+    with np.errstate(over="ignore"):
+        mixed = bits * _HASH_MULT[:bits.shape[1]]
+        h = np.bitwise_xor.reduce(mixed ^ (mixed >> np.uint64(29)), axis=1)
+    return h.view(np.int64)
+
+
+def ensure_state_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS rescore_state (
+            planet_id INTEGER PRIMARY KEY,
+            features_hash INTEGER NOT NULL,
+            model_stamp TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rescore_checkpoint (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            model_stamp TEXT NOT NULL,
+            full_run INTEGER NOT NULL,
+            last_id INTEGER NOT NULL
+        );
+    """)
+
+
+def iter_chunks(conn, start_id, chunk_size):
+    cols = ", ".join(f"e.{f}" for f in FEATURES)
+    sql = f"""
+        SELECT e.id, {cols}, s.features_hash, s.model_stamp
+        FROM exoplanet e
+        LEFT JOIN rescore_state s ON s.planet_id = e.id
+        WHERE e.id > ?
+        ORDER BY e.id
+        LIMIT ?
+    """
+    last_id = start_id
+    while True:
+        rows = conn.execute(sql, (last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+
+
+def write_dense_ranks(conn, batch_size):
+    ids, scores, ranks = [], [], []
+    for pid, score, rank in conn.execute(
+        "SELECT id, habitability_score, rank FROM exoplanet "
+        "WHERE habitability_score IS NOT NULL"
+    ):
+        ids.append(pid)
+        scores.append(score)
+        ranks.append(-1 if rank is None else rank)
+
+    if not ids:
+        return 0
+
+    scores = np.asarray(scores, dtype=np.float64)
+    uniq = np.unique(scores)
+    # dense rank, descending: 1 + number of distinct scores above this one
+    dense = len(uniq) - np.searchsorted(uniq, scores)
+
+    changed = np.flatnonzero(dense != np.asarray(ranks))
+    ids = np.asarray(ids)
+
+    for start in range(0, len(changed), batch_size):
+        sel = changed[start:start + batch_size]
+        with conn:
+            conn.executemany(
+                "UPDATE exoplanet SET rank = ? WHERE id = ?",
+                zip(dense[sel].tolist(), ids[sel].tolist())
+            )
+
+    with conn:
+        conn.execute(
+            "UPDATE exoplanet SET rank = NULL "
+            "WHERE habitability_score IS NULL AND rank IS NOT NULL"
+        )
+
+    return len(changed)
+
+
+def rescore(db_path=DB_PATH, model_path=MODEL_PATH, full=False, chunk_size=5000,
+            workers=1):
+    started = time.perf_counter()
+
+    workers = max(1, int(workers))
+    scorer = ParallelScorer(model_path, workers=workers,
+                            shard_rows=-(-chunk_size // workers))
+    stamp = model_stamp(model_path)
+
+    migrate_path(db_path)
+    conn = connect(db_path)
+    ensure_state_tables(conn)
+
+    # Resume an interrupted run of the same kind with the same model
+    start_id = 0
+    checkpoint = conn.execute(
+        "SELECT model_stamp, full_run, last_id FROM rescore_checkpoint"
+    ).fetchone()
+    if checkpoint and checkpoint[0] == stamp and bool(checkpoint[1]) == full:
+        start_id = checkpoint[2]
+        print(f"↻ Resuming after id {start_id}")
+
+    scanned = scored = unchanged = skipped = 0
+
+    for rows in iter_chunks(conn, start_id, chunk_size):
+        ids = np.array([r[0] for r in rows], dtype=np.int64)
+        X = np.array([r[1:1 + len(FEATURES)] for r in rows], dtype=np.float64)
+        old_hash = [r[-2] for r in rows]
+        old_stamp = [r[-1] for r in rows]
+
+        valid = ~np.isnan(X).any(axis=1)
+        hashes = feature_hashes(np.nan_to_num(X))
+
+        todo = valid.copy()
+        if not full:
+            fresh = np.array([
+                h == oh and s == stamp
+                for h, oh, s in zip(hashes.tolist(), old_hash, old_stamp)
+            ], dtype=bool)
+            todo &= ~fresh
+            unchanged += int((valid & fresh).sum())
+
+        scanned += len(rows)
+        skipped += int((~valid).sum())
+
+        with conn:
+            if todo.any():
+                scores = scorer.predict(X[todo]).astype(float)
+                conn.executemany(
+                    "UPDATE exoplanet SET habitability_score = ? WHERE id = ?",
+                    zip(scores.tolist(), ids[todo].tolist())
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rescore_state "
+                    "(planet_id, features_hash, model_stamp) VALUES (?, ?, ?)",
+                    zip(ids[todo].tolist(), hashes[todo].tolist(),
+                        [stamp] * int(todo.sum()))
+                )
+                scored += int(todo.sum())
+
+            conn.execute(
+                "INSERT OR REPLACE INTO rescore_checkpoint "
+                "(id, model_stamp, full_run, last_id) VALUES (1, ?, ?, ?)",
+                (stamp, int(full), int(ids[-1]))
+            )
+
+    ranks_changed = write_dense_ranks(conn, chunk_size)
+
+    with conn:
+        conn.execute("DELETE FROM rescore_checkpoint")
+    conn.close()
+    scorer.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "scanned": scanned,
+        "scored": scored,
+        "unchanged": unchanged,
+        "skipped": skipped,
+        "ranks_changed": ranks_changed,
+        "seconds": elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rescore and rank the Exoplanet table")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--full", action="store_true",
+                        help="rescore every row, not only new or changed ones")
+    parser.add_argument("--chunk-size", type=int, default=5000,
+                        help="rows per read chunk and per write transaction")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="scoring processes (1 = score in-process)")
+    args = parser.parse_args(argv)
+
+    stats = rescore(args.db, args.model, full=args.full, chunk_size=args.chunk_size,
+                    workers=args.workers)
+
+    rate = stats["scanned"] / stats["seconds"] if stats["seconds"] else 0.0
+    print("✅ Rescoring completed")
+    print(f"Scanned       : {stats['scanned']}")
+    print(f"Scored        : {stats['scored']}")
+    print(f"Unchanged     : {stats['unchanged']}")
+    print(f"Skipped       : {stats['skipped']} (missing features)")
+    print(f"Ranks updated : {stats['ranks_changed']}")
+    print(f"Elapsed       : {stats['seconds']:.2f}s ({rate:,.0f} rows/sec)")
+    return stats
+
+
+if __name__ == "__main__":
+    main()
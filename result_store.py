@@ -0,0 +1,243 @@
+"""Upload result store shared by every gunicorn worker.
+
+Scored CSV uploads are kept in a separate SQLite file (WAL mode, so one
+worker can write while others read) under an upload ID. Every scored row is
+stored, not just the top 10, so exports and re-queries with a different k
+never run the model again. Uploads expire after ``ttl`` seconds, and the
+oldest are evicted once the store holds more than ``max_uploads`` uploads
+or ``max_rows`` rows in total.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+ROW_COLUMNS = [
+    "pl_rade",
+    "pl_bmasse",
+    "pl_eqt",
+    "pl_orbper",
+    "st_teff",
+    "st_rad"
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS uploads (
+    upload_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    k INTEGER NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS upload_rows (
+    upload_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    planet_name TEXT,
+    habitability_score REAL NOT NULL,
+    {", ".join(f"{c} REAL" for c in ROW_COLUMNS)},
+    PRIMARY KEY (upload_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_upload_rows_score
+    ON upload_rows (upload_id, habitability_score DESC, position);
+"""
+
+
+class UploadNotFound(KeyError):
+    pass
+
+
+class ResultStore:
+    def __init__(self, path, ttl=3600, max_uploads=50, max_rows=5_000_000):
+        self.path = path
+        self.ttl = float(ttl)
+        self.max_uploads = int(max_uploads)
+        self.max_rows = int(max_rows)
+
+        # The file and tables are created on first use, not here, so
+        # constructing a store (e.g. importing app.py) touches no disk
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def create_schema(self):
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+            finally:
+                conn.close()
+            self._schema_ready = True
+
+    def _connect(self):
+        self.create_schema()
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # -------------------------------------------------
+    # Writing
+    # -------------------------------------------------
+    def create(self, k=10, upload_id=None):
+        upload_id = upload_id or uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO uploads (upload_id, created_at, k) VALUES (?, ?, ?)",
+                    (upload_id, time.time(), int(k))
+                )
+        finally:
+            conn.close()
+        return upload_id
+
+    def append(self, upload_id, chunk, scores, name_column="pl_name"):
+        """Store one scored DataFrame chunk; row positions follow its index."""
+        names = chunk[name_column] if name_column in chunk.columns else [None] * len(chunk)
+        names = [None if n is None or n != n else str(n) for n in names]  # NaN -> NULL
+
+        rows = zip(
+            [upload_id] * len(chunk),
+            chunk.index.tolist(),
+            names,
+            [float(s) for s in scores],
+            *(chunk[c].tolist() for c in ROW_COLUMNS)
+        )
+
+        placeholders = ", ".join("?" * (4 + len(ROW_COLUMNS)))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO upload_rows (upload_id, position, planet_name, "
+                    f"habitability_score, {', '.join(ROW_COLUMNS)}) "
+                    f"VALUES ({placeholders})",
+                    rows
+                )
+                cur = conn.execute(
+                    "UPDATE uploads SET row_count = row_count + ? WHERE upload_id = ?",
+                    (len(chunk), upload_id)
+                )
+                if cur.rowcount == 0:
+                    # evicted while being written; roll the rows back
+                    raise UploadNotFound(upload_id)
+        finally:
+            conn.close()
+
+    def finish(self, upload_id):
+        conn = self._connect()
+        try:
+            with conn:
+                # the TTL runs from completion, not from the first row
+                conn.execute(
+                    "UPDATE uploads SET complete = 1, created_at = ? WHERE upload_id = ?",
+                    (time.time(), upload_id)
+                )
+            self._evict(conn, keep=upload_id)
+        finally:
+            conn.close()
+
+    def discard(self, upload_id):
+        conn = self._connect()
+        try:
+            with conn:
+                self._delete(conn, [upload_id])
+        finally:
+            conn.close()
+
+    # -------------------------------------------------
+    # Eviction
+    # -------------------------------------------------
+    def _delete(self, conn, upload_ids):
+        conn.executemany("DELETE FROM upload_rows WHERE upload_id = ?",
+                         [(u,) for u in upload_ids])
+        conn.executemany("DELETE FROM uploads WHERE upload_id = ?",
+                         [(u,) for u in upload_ids])
+
+    def _evict(self, conn, keep=None):
+        uploads = conn.execute(
+            "SELECT upload_id, created_at, row_count, complete FROM uploads "
+            "ORDER BY created_at DESC"
+        ).fetchall()
+
+        cutoff = time.time() - self.ttl
+        doomed, kept, total_rows = [], 0, 0
+
+        # Uploads still being written only go once they expire
+        for upload_id, created_at, row_count, complete in uploads:
+            over_limit = complete and (kept >= self.max_uploads or
+                                       total_rows + row_count > self.max_rows)
+            if upload_id != keep and (created_at < cutoff or over_limit):
+                doomed.append(upload_id)
+            else:
+                kept += 1
+                total_rows += row_count
+
+        if doomed:
+            with conn:
+                self._delete(conn, doomed)
+        return len(doomed)
+
+    def evict(self):
+        conn = self._connect()
+        try:
+            return self._evict(conn)
+        finally:
+            conn.close()
+
+    # -------------------------------------------------
+    # Reading
+    # -------------------------------------------------
+    def meta(self, upload_id):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT created_at, k, row_count, complete FROM uploads "
+                "WHERE upload_id = ? AND created_at >= ?",
+                (upload_id, time.time() - self.ttl)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            raise UploadNotFound(upload_id)
+        return {
+            "upload_id": upload_id,
+            "created_at": row[0],
+            "k": row[1],
+            "row_count": row[2],
+            "complete": bool(row[3]),
+        }
+
+    def top(self, upload_id, k=None, offset=0):
+        """Rows ranked by descending score, as dicts with a 1-based rank."""
+        meta = self.meta(upload_id)
+        k = meta["k"] if k is None else int(k)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT position, planet_name, habitability_score, {', '.join(ROW_COLUMNS)} "
+                "FROM upload_rows WHERE upload_id = ? "
+                "ORDER BY habitability_score DESC, position LIMIT ? OFFSET ?",
+                (upload_id, k, int(offset))
+            ).fetchall()
+        finally:
+            conn.close()
+
+        results = []
+        for i, row in enumerate(rows, start=int(offset) + 1):
+            record = {
+                "rank": i,
+                "position": row[0],
+                "planet_name": row[1],
+                "habitability_score": row[2],
+            }
+            record.update(zip(ROW_COLUMNS, row[3:]))
+            results.append(record)
+        return results
@@ -0,0 +1,148 @@
+"""Model weights that stay shared between forked gunicorn workers.
+
+With ``preload_app`` (see gunicorn.conf.py) the master loads the model and
+every worker inherits it copy-on-write. That only saves memory while the
+pages holding the weights are never written. NumPy keeps small arrays in
+the ordinary malloc heap, next to Python objects whose reference counts
+and GC headers change all the time, so those pages get copied into each
+worker anyway.
+
+``pack_readonly`` moves every array of a ``TreeEnsemble`` (the node
+tables and the bitmask tables) into one anonymous shared mapping holding
+nothing else, and swaps in read-only views of it. No Python object lives
+on those pages, so after fork they stay shared however the workers use
+the model. gunicorn.conf.py also calls ``gc.freeze()`` before forking so
+the collector doesn't write to the rest of the preloaded objects.
+
+``process_memory`` and ``mapping_memory`` read /proc to report how much
+of a worker is its own (USS) and its share of the rest (PSS).
+"""
+import mmap
+
+import numpy as np
+
+from tree_engine import load_model
+
+# Start of every packed array, in bytes (one cache line)
+ALIGN = 64
+
+
+def _array_slots(model):
+    # (container, key) of every ndarray the ensemble holds, including the
+    # per-feature lists of bitmask tables
+    containers = [vars(model)]
+    if model._bitmask is not None:
+        containers.append(model._bitmask)
+        containers += [v for v in model._bitmask.values() if isinstance(v, list)]
+    for container in containers:
+        keys = range(len(container)) if isinstance(container, list) else list(container)
+        for key in keys:
+            if isinstance(container[key], np.ndarray):
+                yield container, key
+
+
+def pack_readonly(model):
+    """Move ``model``'s arrays into one shared mapping as read-only views.
+
+    Returns the number of bytes packed. The mapping is kept alive by the
+    model (``model._shared``).
+    """
+    slots = list(_array_slots(model))
+    offsets, size = [], 0
+    for container, key in slots:
+        size = -(-size // ALIGN) * ALIGN
+        offsets.append(size)
+        size += container[key].nbytes
+
+    # Anonymous and MAP_SHARED: not part of the malloc heap
+    buf = mmap.mmap(-1, max(size, 1))
+    for (container, key), offset in zip(slots, offsets):
+        array = container[key]
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=buf, offset=offset)
+        view[...] = array
+        view.flags.writeable = False
+        container[key] = view
+
+    model._shared = buf
+    model._shared_bytes = size
+    return size
+
+
+def load_shared(path):
+    """``load_model(path)`` with its arrays packed by ``pack_readonly``."""
+    model = load_model(path)
+    pack_readonly(model)
+    return model
+
+
+def shared_address(model):
+    """Start address of the model's packed mapping, or None if unpacked."""
+    if getattr(model, "_shared", None) is None:
+        return None
+    return np.frombuffer(model._shared, dtype=np.uint8, count=1).ctypes.data
+
+
+# -------------------------------------------------
+# Memory reports (Linux /proc)
+# -------------------------------------------------
+def _parse_kb(lines):
+    fields = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        parts = rest.split()
+        if len(parts) == 2 and parts[1] == "kB":
+            fields[key] = int(parts[0]) * 1024
+    return fields
+
+
+def _summary(fields):
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def process_memory(pid="self"):
+    """RSS, PSS, USS and shared bytes of a process; {} where unsupported."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            return _summary(_parse_kb(f))
+    except OSError:
+        return {}
+
+
+def _mapping_range(line):
+    # "start-end perms ..." header lines of /proc/<pid>/smaps, else None
+    head = line.split(" ", 1)[0]
+    start, sep, end = head.partition("-")
+    if not sep or ":" in head:
+        return None
+    try:
+        return int(start, 16), int(end, 16)
+    except ValueError:
+        return None
+
+
+def mapping_memory(address, pid="self"):
+    """The same figures for the one mapping that contains ``address``."""
+    try:
+        with open(f"/proc/{pid}/smaps") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return {}
+
+    for i, line in enumerate(lines):
+        span = _mapping_range(line)
+        if span is None or not span[0] <= address < span[1]:
+            continue
+        body = []
+        for field in lines[i + 1:]:
+            if _mapping_range(field) is not None:
+                break
+            body.append(field)
+        report = _summary(_parse_kb(body))
+        report["size"] = span[1] - span[0]
+        return report
+    return {}
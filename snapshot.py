@@ -0,0 +1,274 @@
+"""Columnar in-memory snapshot of the Exoplanet table for analytics reads.
+
+One NumPy array per column (ids, the six features, score, rank) plus an
+array of interned names, built with a single SELECT and no ORM objects.
+Like the leaderboard, it follows the ``exoplanet_changes`` log (see
+migrations.py): after a write it re-reads only the planets logged since
+the version it holds.
+
+Readers take ``current()`` and get an immutable ``Columns``. A sync builds
+a new one and swaps the reference, so a reader in the middle of an
+aggregate never sees a half-applied change. The new version's arrays are
+copies of the old ones with only the changed rows patched, located by
+binary search on the sorted ids; deleted and new planets are cut out or
+spliced in at their positions. Nothing is re-sorted.
+
+Ranks are derived from the scores (dense, best first, like the
+leaderboard) the first time a version's ``rank`` is read, so they never
+go stale the way the ``rank`` column can between rescore.py runs, and
+syncs that nobody reads ranks from don't pay for them.
+
+Each version also carries a ``CorrelationAccumulator`` over the features
+and score of the scored planets (see online_stats.py). A sync removes the
+old values of the changed planets and adds their new ones, so keeping the
+correlation matrix current costs O(changes), not a rescan.
+"""
+import sys
+import threading
+import time
+
+import numpy as np
+
+from leaderboard import data_version, database_id
+from migrations import connect
+from online_stats import CorrelationAccumulator
+
+FEATURE_COLUMNS = ["pl_rade", "pl_bmasse", "pl_eqt", "pl_orbper", "st_teff", "st_rad"]
+
+CORRELATION_COLUMNS = FEATURE_COLUMNS + ["habitability_score"]
+
+_SELECT = f"SELECT id, name, {', '.join(FEATURE_COLUMNS)}, habitability_score FROM exoplanet"
+
+
+class Columns:
+    """One version of the table. Treat the arrays as read-only."""
+
+    def __init__(self, version, ids, names, features, score, scored, correlations,
+                 modified=None, database=None):
+        self.version = version
+        self.database = database    # database_id of the file it was read from
+        self.modified = modified    # Unix time of the change at version, if logged
+        self.ids = ids              # int64, ascending
+        self.names = names          # object array of interned str
+        self.features = features    # column -> float64, NaN for NULL
+        self.score = score          # float32, NaN for unscored
+        self.scored = scored        # bool, score is not NULL
+        self.correlations = correlations
+        self._rank = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def rank(self):
+        """int32 dense rank, 0 for unscored; computed on first read."""
+        if self._rank is None:
+            self._rank = _dense_rank(self.score, self.scored)
+        return self._rank
+
+    def column(self, name):
+        if name == "habitability_score":
+            return self.score
+        if name == "rank":
+            return self.rank
+        return self.features[name]
+
+    def matrix(self, mask):
+        """Rows in ``mask`` (boolean or positions) as an (n, len(CORRELATION_COLUMNS)) float64 array."""
+        return np.column_stack([self.column(c)[mask].astype(np.float64)
+                                for c in CORRELATION_COLUMNS])
+
+    def rows(self, ids):
+        """Planets with these ids, in that order, as dicts (missing ids skipped)."""
+        pos = np.searchsorted(self.ids, ids)
+        out = []
+        for pid, i in zip(ids, pos.tolist()):
+            if i < len(self.ids) and self.ids[i] == pid:
+                row = {"id": int(pid), "name": self.names[i]}
+                row.update((c, _nullable(a[i])) for c, a in self.features.items())
+                row["habitability_score"] = _nullable(self.score[i])
+                row["rank"] = int(self.rank[i]) if self.scored[i] else None
+                out.append(row)
+        return out
+
+
+def _nullable(value):
+    value = float(value)
+    return None if value != value else value
+
+
+def _positions(sorted_ids, ids):
+    # Index of each of ``ids`` in ``sorted_ids``, -1 where absent
+    pos = np.searchsorted(sorted_ids, ids)
+    found = pos < len(sorted_ids)
+    found[found] = sorted_ids[pos[found]] == ids[found]
+    return np.where(found, pos, -1)
+
+
+def _dense_rank(score, scored):
+    rank = np.zeros(len(score), dtype=np.int32)
+    if scored.any():
+        _, inverse = np.unique(-score[scored], return_inverse=True)
+        rank[scored] = inverse + 1
+    return rank
+
+
+def _columns(version, rows):
+    # rows: (id, name, *features, score) tuples, sorted by id
+    n = len(rows)
+    data = np.array([r[2:] for r in rows], dtype=np.float64).reshape(n, len(FEATURE_COLUMNS) + 1)
+    score = data[:, -1].astype(np.float32)
+    scored = ~np.isnan(score)
+    columns = Columns(
+        version=version,
+        ids=np.fromiter((r[0] for r in rows), dtype=np.int64, count=n),
+        names=np.array([sys.intern(r[1]) for r in rows], dtype=object),
+        features={c: np.ascontiguousarray(data[:, k]) for k, c in enumerate(FEATURE_COLUMNS)},
+        score=score,
+        scored=scored,
+        correlations=CorrelationAccumulator(CORRELATION_COLUMNS),
+    )
+    columns.correlations.add(columns.matrix(scored))
+    return columns
+
+
+class TableSnapshot:
+    def __init__(self, db_path, sync_interval=1.0, rebuild_fraction=0.125):
+        self.db_path = db_path
+        self.sync_interval = float(sync_interval)
+        self.rebuild_fraction = float(rebuild_fraction)
+
+        self._lock = threading.Lock()
+        self._columns = None
+        self._synced = 0.0
+
+        self.rebuilds = 0
+        self.applied = 0
+        self.last_sync_ms = 0.0
+
+    def current(self, force=False):
+        """The latest ``Columns``, syncing first if the interval has passed."""
+        self.sync(force)
+        return self._columns
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and self._columns is not None and now - self._synced < self.sync_interval:
+            return
+
+        with self._lock:
+            start = time.perf_counter()
+            conn = connect(self.db_path, isolation_level=None)
+            try:
+                conn.execute("BEGIN")
+                version = data_version(conn)
+                database = database_id(conn)
+                old = self._columns
+                if old is not None and version == old.version and database == old.database:
+                    self._synced = now
+                    return
+
+                oldest = conn.execute("SELECT MIN(seq) FROM exoplanet_changes").fetchone()[0]
+                changed = None
+                if (old is not None and database == old.database and
+                        (oldest is None or oldest <= old.version + 1)):
+                    changed = [r[0] for r in conn.execute(
+                        "SELECT DISTINCT planet_id FROM exoplanet_changes WHERE seq > ?",
+                        (old.version,)
+                    )]
+
+                if changed is None or len(changed) > self.rebuild_fraction * max(len(old), 1):
+                    columns = _columns(version, conn.execute(f"{_SELECT} ORDER BY id").fetchall())
+                    self.rebuilds += 1
+                else:
+                    columns = self._apply(conn, old, version, changed)
+                    self.applied += len(changed)
+
+                modified = conn.execute(
+                    "SELECT changed_at FROM exoplanet_changes WHERE seq = ?", (version,)
+                ).fetchone()
+                columns.modified = modified[0] if modified else None
+                columns.database = database
+
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+            self._columns = columns
+            self._synced = now
+            self.last_sync_ms = 1000 * (time.perf_counter() - start)
+
+    def _apply(self, conn, old, version, changed):
+        rows = []
+        for start in range(0, len(changed), 500):
+            ids = changed[start:start + 500]
+            rows += conn.execute(
+                f"{_SELECT} WHERE id IN ({', '.join('?' * len(ids))})", ids
+            ).fetchall()
+        fresh = _columns(version, sorted(rows))
+
+        # Positions in ``old`` of the changed planets it holds; of those,
+        # the ones still present are updated in place, the rest deleted.
+        # Changed planets ``old`` lacks are new.
+        changed = np.unique(np.array(changed, dtype=np.int64))
+        at = _positions(old.ids, changed)
+        in_old = at >= 0
+        old_pos = at[in_old]
+
+        fresh_at = _positions(fresh.ids, changed[in_old])
+        updated = fresh_at >= 0
+        upd_old, upd_fresh = old_pos[updated], fresh_at[updated]
+        deleted = old_pos[~updated]
+        inserted = np.flatnonzero(_positions(old.ids, fresh.ids) < 0)
+
+        correlations = old.correlations.copy()
+        correlations.remove(old.matrix(old_pos[old.scored[old_pos]]))
+        correlations.add(fresh.matrix(fresh.scored))
+
+        ids = np.delete(old.ids, deleted)
+        insert_at = np.searchsorted(ids, fresh.ids[inserted])
+
+        def patch(old_array, fresh_array):
+            array = old_array.copy()
+            array[upd_old] = fresh_array[upd_fresh]
+            if len(deleted):
+                array = np.delete(array, deleted)
+            if len(inserted):
+                array = np.insert(array, insert_at, fresh_array[inserted])
+            return array
+
+        return Columns(
+            version=version,
+            ids=patch(old.ids, fresh.ids),
+            names=patch(old.names, fresh.names),
+            features={c: patch(old.features[c], fresh.features[c]) for c in FEATURE_COLUMNS},
+            score=patch(old.score, fresh.score),
+            scored=patch(old.scored, fresh.scored),
+            correlations=correlations,
+        )
+
+    def memory(self):
+        """Bytes held per column, names counted as the strings themselves."""
+        columns = self._columns
+        if columns is None:
+            return {}
+        report = {"ids": columns.ids.nbytes}
+        report.update((c, a.nbytes) for c, a in columns.features.items())
+        report["habitability_score"] = columns.score.nbytes
+        report["rank"] = columns.rank.nbytes
+        report["scored"] = columns.scored.nbytes
+        report["names"] = columns.names.nbytes + sum(sys.getsizeof(n) for n in columns.names)
+        report["total"] = sum(report.values())
+        return report
+
+    def stats(self):
+        columns = self._columns
+        return {
+            "rows": len(columns) if columns is not None else 0,
+            "scored": int(columns.scored.sum()) if columns is not None else 0,
+            "version": columns.version if columns is not None else None,
+            "rebuilds": self.rebuilds,
+            "changes_applied": self.applied,
+            "last_sync_ms": round(self.last_sync_ms, 3),
+            "memory_bytes": self.memory(),
+        }
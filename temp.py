@@ -184,92 +184,12 @@
 #     print("Inserted:", inserted)
 #     print("Skipped :", skipped)
 
-import pandas as pd
-import os
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-
-# -------------------------------------------------
-# Setup
-# -------------------------------------------------
-BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-
-app = Flask(__name__)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(
-    BASE_DIR, "instance", "exoplanets.db"
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-db = SQLAlchemy(app)
-
-# -------------------------------------------------
-# DB Model (MUST MATCH app.py)
-# -------------------------------------------------
-class Exoplanet(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), unique=True, nullable=False)
-
-    pl_rade = db.Column(db.Float)
-    pl_bmasse = db.Column(db.Float)
-    pl_eqt = db.Column(db.Float)
-    pl_orbper = db.Column(db.Float)
-    st_teff = db.Column(db.Float)
-    st_rad = db.Column(db.Float)
-
-    habitability_score = db.Column(db.Float)
-    rank = db.Column(db.Integer)
-
 # -------------------------------------------------
 # LOAD CSV
 # -------------------------------------------------
-if __name__ == "__main__":
-
-    df = pd.read_csv("exoplanets_clean_full.csv")  # your CSV
+# Bulk loader: chunked read, vectorized NaN/duplicate filtering and
+# INSERT ... ON CONFLICT(name) per chunk. See ingest.py for options.
+from ingest import main
 
-    print("CSV Columns:")
-    print(df.columns.tolist())
-
-    with app.app_context():
-
-        db.create_all()
-
-        inserted = 0
-        skipped = 0
-
-        for idx, row in df.iterrows():
-
-            # 🔑 AUTO-GENERATED NAME
-            planet_name = f"Planet_{idx+1}"
-
-            # Skip if any required value missing
-            values = [
-                row["pl_rade"],
-                row["pl_bmasse"],
-                row["pl_eqt"],
-                row["pl_orbper"],
-                row["st_teff"],
-                row["st_rad"],
-            ]
-
-            if any(pd.isna(v) for v in values):
-                skipped += 1
-                continue
-
-            planet = Exoplanet(
-                name=planet_name,
-                pl_rade=row["pl_rade"],
-                pl_bmasse=row["pl_bmasse"],
-                pl_eqt=row["pl_eqt"],
-                pl_orbper=row["pl_orbper"],
-                st_teff=row["st_teff"],
-                st_rad=row["st_rad"],
-            )
-
-            db.session.add(planet)
-            inserted += 1
-
-        db.session.commit()
-
-        print("✅ CSV LOADING COMPLETED")
-        print(f"Inserted planets : {inserted}")
-        print(f"Skipped rows     : {skipped}")
+if __name__ == "__main__":
+    main()
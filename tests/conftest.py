@@ -0,0 +1,33 @@
+"""Shared fixtures. The app is imported once, against a scratch copy of
+instance/exoplanets.db, so tests never write to the tracked database."""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py reads its artifacts (features.pkl, model_fused.npz) by relative path
+os.chdir(ROOT)
+
+SCRATCH = tempfile.mkdtemp(prefix="exoplanet-tests-")
+os.environ["EXOPLANET_DB"] = os.path.join(SCRATCH, "exoplanets.db")
+os.environ["UPLOAD_STORE_PATH"] = os.path.join(SCRATCH, "upload_results.db")
+os.environ["JOB_SPOOL_DIR"] = os.path.join(SCRATCH, "job_uploads")
+os.environ["EXPORT_CACHE_DIR"] = os.path.join(SCRATCH, "export_cache")
+os.environ["JOB_WORKERS"] = "0"
+shutil.copy(os.path.join(ROOT, "instance", "exoplanets.db"), os.environ["EXOPLANET_DB"])
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    from app import app
+    return app
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
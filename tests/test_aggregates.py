@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+import aggregates
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 9, 10, 11, 37])
+@pytest.mark.parametrize("stratified", [False, True])
+def test_sample_never_exceeds_n(n, stratified):
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, 5001)
+    # Skewed values, so some bands are nearly empty
+    values = rng.exponential(size=len(ids)) if stratified else None
+
+    picked = aggregates.sample_indices(ids, n, strata_values=values)
+
+    assert len(picked) == n
+    assert len(np.unique(picked)) == len(picked)
+    assert np.all(np.diff(picked) > 0)
+
+
+def test_stratified_sample_fills_n_when_rows_allow():
+    ids = np.arange(1, 20001)
+    values = np.random.default_rng(1).exponential(size=len(ids))
+    assert len(aggregates.sample_indices(ids, 3000, strata_values=values)) == 3000
+
+
+@pytest.mark.parametrize("strategy", ["random", "stratified"])
+@pytest.mark.parametrize("n", [1, 5, 9])
+def test_correlations_sample_returns_at_most_n(client, strategy, n):
+    response = client.get(f"/correlations?mode=sample&n={n}&strategy={strategy}")
+    assert response.status_code == 200
+    data = response.get_json()
+    assert 0 < len(data["score"]) <= n
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import columnar
+
+
+def test_round_trip_keeps_values_dtypes_and_structure():
+    data = {
+        "mode": "sample",
+        "count": np.int64(3),
+        "score": np.array([0.25, np.nan, 0.75], dtype=np.float32),
+        "st_teff": np.array([5778.0, 3000.5, 9000.0]),
+        "nested": {"ranks": np.array([1, 2, 2], dtype=np.int64), "edges": [0.0, 0.5]},
+        "flags": np.array([True, False, True]),
+        "empty": np.zeros(0),
+        "columns": [np.arange(5, dtype=np.int32), np.arange(3, dtype=np.float64)],
+    }
+    payload = columnar.encode(data)
+    decoded = columnar.decode(payload)
+
+    assert payload[:8] == columnar.MAGIC
+    assert decoded["mode"] == "sample" and decoded["count"] == 3
+    assert decoded["nested"]["edges"] == [0.0, 0.5]
+    assert decoded["score"].dtype == np.float32
+    np.testing.assert_array_equal(decoded["score"], data["score"])
+    np.testing.assert_array_equal(decoded["st_teff"], data["st_teff"])
+    assert decoded["nested"]["ranks"].dtype == np.int32
+    np.testing.assert_array_equal(decoded["nested"]["ranks"], [1, 2, 2])
+    np.testing.assert_array_equal(decoded["flags"], [1, 0, 1])
+    assert len(decoded["empty"]) == 0
+    np.testing.assert_array_equal(decoded["columns"][0], np.arange(5))
+
+
+def test_buffers_are_8_byte_aligned():
+    payload = columnar.encode({"a": np.arange(3, dtype=np.float32),
+                               "b": np.arange(3, dtype=np.float64)})
+    base = np.frombuffer(payload, np.uint8).ctypes.data
+    for array in columnar.decode(payload).values():
+        assert (array.ctypes.data - base) % 8 == 0
+    assert len(payload) % 8 == 0
+
+
+def test_large_integers_fall_back_to_float64():
+    decoded = columnar.decode(columnar.encode({"ids": np.array([1, 2**40])}))
+    assert decoded["ids"].dtype == np.float64
+    np.testing.assert_array_equal(decoded["ids"], [1, 2**40])
+
+
+def test_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        columnar.decode(b"{\"json\": true}")
+
+
+@pytest.mark.parametrize("url", ["/score_distribution", "/correlations?mode=sample&n=50",
+                                 "/correlation_matrix"])
+def test_endpoints_negotiate_columns(client, url):
+    as_json = client.get(url).get_json()
+    response = client.get(url, headers={"Accept": columnar.MIMETYPE})
+    assert response.mimetype == columnar.MIMETYPE
+    assert "Accept" in response.headers["Vary"]
+    assert columnar.to_builtin(columnar.decode(response.data)) == as_json
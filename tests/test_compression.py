@@ -0,0 +1,110 @@
+import gzip
+import json
+
+import pytest
+from flask import Flask, Response, request
+
+from compression import ResponseCompressor
+
+URL = "/correlations?mode=full"
+
+
+def test_gzip_when_asked_with_vary_and_a_variant_etag(client):
+    plain = client.get(URL, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert {"Accept", "Accept-Encoding"} <= set(plain.headers["Vary"].replace(" ", "").split(","))
+
+    zipped = client.get(URL, headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    assert gzip.decompress(zipped.data) == plain.data
+    assert len(zipped.data) < len(plain.data)
+    assert zipped.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+
+    # The client may revalidate with the compressed variant's ETag
+    again = client.get(URL, headers={"Accept-Encoding": "gzip",
+                                     "If-None-Match": zipped.headers["ETag"]})
+    assert again.status_code == 304
+    assert "Accept-Encoding" in again.headers["Vary"]
+
+
+def test_refused_coding_and_small_bodies_go_out_plain(client):
+    response = client.get(URL, headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in response.headers
+
+    small = client.get("/rank?k=1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["Vary"]
+
+
+def _app(compressor):
+    app = Flask(__name__)
+    body = json.dumps({"values": list(range(2000))})
+
+    @app.route("/big")
+    def big():
+        return Response(body, mimetype="application/json")
+
+    @app.route("/stream")
+    def stream():
+        return Response((body[i:i + 100] for i in range(0, len(body), 100)),
+                        mimetype="application/json")
+
+    @app.route("/pdf")
+    def pdf():
+        return Response(body, mimetype="application/pdf")
+
+    app.after_request(lambda response: compressor.process(request, response))
+    return app.test_client(), body.encode()
+
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    client, body = _app(ResponseCompressor())
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.data) == body
+
+
+def test_already_compressed_types_are_left_alone():
+    client, body = _app(ResponseCompressor())
+    response = client.get("/pdf", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data == body
+
+
+class _Reversed:
+    # Stand-in coding, so negotiation is tested without brotli installed
+    level = 0
+
+    def compress(self, data):
+        return data[::-1]
+
+
+def test_negotiation_follows_quality_then_server_order():
+    compressor = ResponseCompressor()
+    compressor.codings = {"br": _Reversed(), "gzip": compressor.codings["gzip"]}
+    client, body = _app(compressor)
+
+    def coding(accept):
+        return client.get("/big", headers={"Accept-Encoding": accept}).headers.get(
+            "Content-Encoding")
+
+    assert coding("gzip, br") == "br"
+    assert coding("gzip;q=1, br;q=0.5") == "gzip"
+    assert coding("br;q=0, gzip") == "gzip"
+    assert coding("deflate") is None
+    assert client.get("/big", headers={"Accept-Encoding": "br"}).data == body[::-1]
+
+
+def test_brotli_preferred_over_gzip_at_equal_quality():
+    brotli = pytest.importorskip("brotli")
+    compressor = ResponseCompressor()
+    client, body = _app(compressor)
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.data) == body
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip;q=1, br;q=0.5"})
+    assert response.headers["Content-Encoding"] == "gzip"
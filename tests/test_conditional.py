@@ -0,0 +1,75 @@
+import itertools
+
+import pytest
+
+from leaderboard import VersionChanged
+
+_names = itertools.count()
+
+
+def _add_planet(client):
+    response = client.post("/add_exoplanet", json={
+        "name": f"Conditional-{next(_names)}",
+        "pl_rade": 1.0, "pl_bmasse": 1.0, "pl_eqt": 288,
+        "pl_orbper": 365, "st_teff": 5778, "st_rad": 1.0,
+    })
+    assert response.status_code == 200
+
+
+def _data_version(etag):
+    # d<version>.<database id prefix>-m<model stamp>-json|columns
+    return int(etag.strip('"').split("-")[0][1:].split(".")[0])
+
+
+@pytest.mark.parametrize("url", ["/rank?k=5", "/correlation_matrix", "/score_distribution",
+                                 "/export/excel"])
+def test_matching_if_none_match_gets_304(client, url):
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get(url, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.data == b""
+
+    since = client.get(url, headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+
+@pytest.mark.parametrize("url", ["/rank?k=5", "/correlation_matrix"])
+def test_etag_changes_after_a_write(client, url):
+    etag = client.get(url).headers["ETag"]
+
+    _add_planet(client)
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert _data_version(response.headers["ETag"]) > _data_version(etag)
+
+
+def test_etag_names_the_version_the_body_was_built_from(client):
+    _add_planet(client)
+    response = client.get("/correlation_matrix")
+    assert _data_version(response.headers["ETag"]) == response.get_json()["version"]
+
+
+def test_board_moving_mid_render_rebuilds_at_the_new_version(client, monkeypatch):
+    import app
+
+    top = app.leaderboard.top
+    calls = []
+
+    def moving_top(k=10, offset=0, version=None):
+        # First read finds the board ahead of the pinned snapshot
+        calls.append(version)
+        if len(calls) == 1:
+            raise VersionChanged("moved")
+        return top(k, offset, version)
+
+    monkeypatch.setattr(app.leaderboard, "top", moving_top)
+    response = client.get("/rank?k=3")
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert _data_version(response.headers["ETag"]) == calls[-1]
@@ -0,0 +1,37 @@
+import ingest
+from migrations import connect
+
+HEADER = "pl_name,pl_rade,pl_bmasse,pl_eqt,pl_orbper,st_teff,st_rad\n"
+
+
+def _write_csv(path, rows):
+    path.write_text(HEADER + "".join(",".join(map(str, r)) + "\n" for r in rows))
+
+
+def test_counts_on_empty_then_repeated_load(tmp_path, capsys):
+    csv = tmp_path / "catalog.csv"
+    db = str(tmp_path / "fresh.db")
+    rows = [(f"P{i}", 1.0 + i, 2.0, 300, 365, 5700, 1.0) for i in range(25)]
+    rows.append(("Gap", "", 2.0, 300, 365, 5700, 1.0))
+    _write_csv(csv, rows)
+
+    stats = ingest.main([str(csv), "--db", db, "--chunk-size", "10"])
+    assert stats["read"] == 26
+    assert stats["written"] == 25
+    assert stats["missing"] == 1
+    assert "Unchanged          : 0\n" in capsys.readouterr().out
+
+    conn = connect(db)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM exoplanet").fetchone()[0] == 25
+    finally:
+        conn.close()
+
+    # Same file again: nothing changes; then one planet edited
+    stats = ingest.main([str(csv), "--db", db])
+    assert stats["written"] == 0
+
+    rows[3] = ("P3", 99.0, 2.0, 300, 365, 5700, 1.0)
+    _write_csv(csv, rows)
+    stats = ingest.main([str(csv), "--db", db])
+    assert stats["written"] == 1
@@ -0,0 +1,68 @@
+import io
+
+import pytest
+
+from jobs import CANCELLED, COMPLETED, FAILED, run_job
+
+HEADER = "pl_name,pl_rade,pl_bmasse,pl_eqt,pl_orbper,st_teff,st_rad\n"
+
+
+@pytest.fixture
+def app_module(flask_app):
+    import app
+    return app
+
+
+def _submit(client, text, k=10):
+    response = client.post("/jobs", data={
+        "file": (io.BytesIO(text.encode()), "planets.csv"), "k": str(k),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 202
+    assert response.headers["Location"] == f"/jobs/{response.get_json()['job_id']}"
+    return response.get_json()["job_id"]
+
+
+def _run_next(app_module):
+    # What a JobRunner thread does; the tests run with JOB_WORKERS=0
+    job = app_module.job_queue.claim("test-worker")
+    assert job is not None
+    return job["job_id"], run_job(job, app_module.job_queue, app_module.upload_store,
+                                  app_module.predict_bulk, "test-worker",
+                                  app_module.FEATURES, chunk_rows=2)
+
+
+def test_job_runs_to_completion_and_serves_results(client, app_module):
+    rows = "".join(f"P{i},1.0,1.0,{250 + 10 * i},365,5778,1.0\n" for i in range(5))
+    job_id = _submit(client, HEADER + rows, k=3)
+
+    assert client.get(f"/jobs/{job_id}").get_json()["status"] == "queued"
+    assert client.get(f"/jobs/{job_id}/results").status_code == 409
+
+    assert _run_next(app_module) == (job_id, COMPLETED)
+    status = client.get(f"/jobs/{job_id}").get_json()
+    assert status["status"] == COMPLETED
+    assert status["rows_processed"] == 5 and status["progress"] == 1.0
+
+    results = client.get(f"/jobs/{job_id}/results").get_json()
+    assert results["row_count"] == 5
+    assert len(results["results"]) == 3
+    scores = [r["habitability_score"] for r in results["results"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_failed_job_reports_its_error_and_keeps_no_rows(client, app_module):
+    job_id = _submit(client, "pl_name,pl_rade\nA,1.0\n")
+
+    assert _run_next(app_module) == (job_id, FAILED)
+    status = client.get(f"/jobs/{job_id}").get_json()
+    assert "Missing required columns" in status["error"]
+    assert client.get(f"/upload_results/{job_id}").status_code == 404
+
+
+def test_queued_job_can_be_cancelled(client, app_module):
+    job_id = _submit(client, HEADER + "A,1.0,1.0,288,365,5778,1.0\n")
+
+    response = client.post(f"/jobs/{job_id}/cancel")
+    assert response.get_json()["status"] == CANCELLED
+    assert app_module.job_queue.claim("test-worker") is None
+    assert client.get("/jobs/not-a-job").status_code == 404
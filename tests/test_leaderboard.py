@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from leaderboard import Leaderboard, VersionChanged
+from migrations import migrate_path
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "exoplanets.db")
+    migrate_path(path)
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.executemany("INSERT INTO exoplanet (name, habitability_score) VALUES (?, ?)",
+                     [("a", 0.9), ("b", 0.5), ("c", 0.5), ("d", 0.1), ("e", None)])
+    yield path, conn
+    conn.close()
+
+
+def _board(path):
+    # A fraction above 1 keeps every sync incremental after the first
+    return Leaderboard(path, sync_interval=0, rebuild_fraction=10.0)
+
+
+def _ranking(board):
+    return [(rank, name, score) for rank, _, name, score in board.top(100)]
+
+
+def test_ties_share_a_dense_rank(db):
+    path, _ = db
+    board = _board(path)
+    board.sync()
+    assert _ranking(board) == [(1, "a", 0.9), (2, "b", 0.5), (2, "c", 0.5), (3, "d", 0.1)]
+    assert board.rank_of("c")["position"] == 3
+    assert board.rank_of("e") is None
+
+
+def test_writes_are_applied_incrementally(db):
+    path, conn = db
+    board = _board(path)
+    board.sync()
+
+    conn.execute("INSERT INTO exoplanet (name, habitability_score) VALUES ('f', 0.7)")
+    conn.execute("UPDATE exoplanet SET habitability_score = 0.95 WHERE name = 'd'")
+    conn.execute("UPDATE exoplanet SET habitability_score = 0.3 WHERE name = 'e'")
+    conn.execute("UPDATE exoplanet SET name = 'b2' WHERE name = 'b'")
+    conn.execute("DELETE FROM exoplanet WHERE name = 'a'")
+    board.sync()
+
+    expected = [(1, "d", 0.95), (2, "f", 0.7), (3, "b2", 0.5), (3, "c", 0.5), (4, "e", 0.3)]
+    assert _ranking(board) == expected
+    assert board.rebuilds == 1 and board.applied > 0
+    assert board.rank_of("a") is None and board.rank_of("b") is None
+    assert board.rank_of("b2")["rank"] == 3
+
+    fresh = _board(path)
+    fresh.sync()
+    assert _ranking(fresh) == expected
+    assert fresh.version == board.version
+
+
+def test_reads_pinned_to_an_old_version_raise(db):
+    path, conn = db
+    board = _board(path)
+    board.sync()
+    version = board.version
+
+    conn.execute("DELETE FROM exoplanet WHERE name = 'd'")
+    board.sync()
+    assert board.version > version
+    with pytest.raises(VersionChanged):
+        board.top(3, version=version)
+    assert len(board.top(3, version=board.version)) == 3
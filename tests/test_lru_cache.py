@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from lru_cache import LRUCache
+
+
+def test_byte_bound_evicts_least_recently_used():
+    cache = LRUCache(maxsize=100, max_bytes=2500)
+    cache.put("a", np.zeros(100))    # 800 bytes each
+    cache.put("b", np.zeros(100))
+    cache.get("a")
+    cache.put("c", np.zeros(100))
+    cache.put("d", {"x": np.zeros(100)})
+
+    assert cache.get("b") is None
+    assert all(cache.get(k) is not None for k in "acd")
+    assert cache.stats()["bytes"] == 2400
+
+
+def test_value_over_the_byte_bound_is_not_stored():
+    cache = LRUCache(maxsize=100, max_bytes=1000)
+    cache.put("small", np.zeros(10))
+    assert cache.get_or_compute("big", lambda: np.zeros(1000)).shape == (1000,)
+
+    assert cache.get("big") is None
+    assert cache.get("small") is not None
+    assert cache.stats()["oversize"] == 1
+
+
+@pytest.mark.parametrize("url", [
+    "/score_distribution?bins=100000",
+    "/score_distribution?grid=100000&kde=1",
+    "/score_distribution?quantiles=" + ",".join(["0.5"] * 1000),
+    "/correlations?mode=sample&n=10000000",
+    "/correlations?mode=grid&gridsize=100000",
+])
+def test_oversized_parameters_are_rejected(client, url):
+    assert client.get(url).status_code == 400
+
+
+def test_full_table_reads_are_not_cached_as_results(client):
+    import app
+
+    app.query_cache.invalidate()
+    for url in ("/correlations?mode=full", "/score_distribution?raw=1"):
+        assert client.get(url).status_code == 200
+    keys = [key[0] for key in app.query_cache.keys()]
+    assert "correlations" not in keys
+
+    assert client.get("/correlations?mode=grid").status_code == 200
+    assert "correlations" in [key[0] for key in app.query_cache.keys()]
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from migrations import connect
+from online_stats import CorrelationAccumulator
+
+COLUMNS = ["a", "b", "c", "d"]
+
+# Running sums against pandas' two-pass computation over the final rows
+ATOL = 1e-9
+
+
+def _rows(rng, n):
+    base = rng.normal(size=(n, 1))
+    X = np.hstack([
+        1e4 + 300 * base + rng.normal(size=(n, 1)),   # large offset, small spread
+        base * -2 + rng.normal(size=(n, 1)),
+        rng.normal(size=(n, 1)),
+        np.exp(rng.normal(size=(n, 1))),
+    ])
+    X[rng.random(X.shape) < 0.1] = np.nan
+    return X
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_matches_dataframe_corr_after_adds_and_removes(seed):
+    rng = np.random.default_rng(seed)
+    rows = _rows(rng, 2000)
+    acc = CorrelationAccumulator(COLUMNS)
+    acc.add(rows)
+
+    live = np.ones(len(rows), dtype=bool)
+    for _ in range(200):
+        # Mixed batches: drop a few live rows, change a few, add new ones
+        drop = rng.choice(np.flatnonzero(live), size=int(rng.integers(1, 20)), replace=False)
+        acc.remove(rows[drop])
+        live[drop] = False
+
+        changed = rng.choice(np.flatnonzero(live), size=5, replace=False)
+        acc.remove(rows[changed])
+        rows[changed] = _rows(rng, 5)
+        acc.add(rows[changed])
+
+        new = _rows(rng, int(rng.integers(0, 15)))
+        acc.add(new)
+        rows = np.vstack([rows, new])
+        live = np.concatenate([live, np.ones(len(new), dtype=bool)])
+
+    expected = pd.DataFrame(rows[live], columns=COLUMNS).corr().to_numpy()
+    np.testing.assert_allclose(acc.correlation(), expected, rtol=0, atol=ATOL)
+
+    counts = (~np.isnan(rows[live]))[:, :, None] & (~np.isnan(rows[live]))[:, None, :]
+    np.testing.assert_array_equal(acc.n, counts.sum(axis=0))
+
+
+def test_removing_everything_leaves_no_correlation():
+    rng = np.random.default_rng(0)
+    rows = _rows(rng, 50)
+    acc = CorrelationAccumulator(COLUMNS)
+    acc.add(rows)
+    acc.remove(rows)
+
+    assert not acc.n.any()
+    assert np.isnan(acc.correlation()).all()
+
+
+def test_correlation_matrix_endpoint_matches_the_table(client):
+    import app
+
+    response = client.post("/add_exoplanet", json={
+        "name": "Online-Stats-1", "pl_rade": 1.3, "pl_bmasse": 2.0, "pl_eqt": 260,
+        "pl_orbper": 200, "st_teff": 5200, "st_rad": 0.9,
+    })
+    assert response.status_code == 200
+    data = client.get("/correlation_matrix").get_json()
+
+    conn = connect(app.DB_PATH)
+    try:
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(data['columns'])} FROM exoplanet "
+            "WHERE habitability_score IS NOT NULL", conn)
+    finally:
+        conn.close()
+
+    expected = df.corr().to_numpy()
+    actual = np.array([[np.nan if v is None else v for v in row] for row in data["matrix"]])
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=ATOL, equal_nan=True)
+    assert data["count"] == len(df)
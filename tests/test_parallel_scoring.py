@@ -0,0 +1,46 @@
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from parallel_scoring import ParallelScorer
+from tree_engine import load_model
+
+MODEL_PATH = "model_fused.npz"
+
+
+def _rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.uniform(0.3, 20, n),      # pl_rade
+        rng.uniform(0.1, 500, n),     # pl_bmasse
+        rng.uniform(100, 2500, n),    # pl_eqt
+        rng.uniform(0.5, 1000, n),    # pl_orbper
+        rng.uniform(2500, 9000, n),   # st_teff
+        rng.uniform(0.1, 5, n),       # st_rad
+    ])
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_sharded_scores_equal_serial_scores(start_method):
+    if start_method not in mp.get_all_start_methods():
+        pytest.skip(f"no {start_method} start method here")
+    X = _rows(10007)
+    expected = load_model(MODEL_PATH).predict(X)
+
+    with ParallelScorer(MODEL_PATH, workers=3, shard_rows=1000,
+                        start_method=start_method) as scorer:
+        actual = scorer.predict(X)
+        assert scorer._pool is not None
+
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_small_batches_score_in_process():
+    X = _rows(10)
+    with ParallelScorer(MODEL_PATH, workers=2, shard_rows=1000) as scorer:
+        np.testing.assert_array_equal(scorer.predict(X), load_model(MODEL_PATH).predict(X))
+        assert scorer._pool is None
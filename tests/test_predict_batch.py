@@ -0,0 +1,40 @@
+import pytest
+
+COLUMNS = {
+    "pl_rade": [1.0, 2.0],
+    "pl_bmasse": [1.0, 5.0],
+    "pl_eqt": [288, 400],
+    "pl_orbper": [365, 20],
+    "st_teff": [5778, 4000],
+    "st_rad": [1.0, 0.5],
+}
+
+
+def test_columns_batch_scores(client):
+    response = client.post("/predict_batch", json={"columns": COLUMNS})
+    assert response.status_code == 200
+    assert response.get_json()["scored"] == 2
+
+
+def test_columns_batch_null_is_a_row_error(client):
+    columns = dict(COLUMNS, pl_eqt=[288, None])
+    data = client.post("/predict_batch", json={"columns": columns}).get_json()
+    assert data["scored"] == 1
+    assert list(data["errors"]) == ["1"]
+
+
+@pytest.mark.parametrize("value", [3.0, None, {"a": 1}, "288", [288, "x"], [288, True], [288, [1]]])
+def test_columns_batch_rejects_non_numeric_column(client, value):
+    columns = dict(COLUMNS, pl_eqt=value)
+    response = client.post("/predict_batch", json={"columns": columns})
+    assert response.status_code == 400
+    assert response.get_json()["field"] == "pl_eqt"
+
+
+@pytest.mark.parametrize("value", [True, False, None, "x", [1]])
+def test_records_batch_rejects_non_numeric_values(client, value):
+    good = {f: v[0] for f, v in COLUMNS.items()}
+    records = [good, dict(good, pl_eqt=value)]
+    data = client.post("/predict_batch", json={"records": records}).get_json()
+    assert data["scored"] == 1
+    assert data["results"][1] == {"index": 1, "error": "Non-numeric feature value"}
@@ -0,0 +1,25 @@
+import math
+
+import numpy as np
+
+from prediction_cache import PredictionCache
+
+
+def test_missing_values_hit_the_cache():
+    cache = PredictionCache(maxsize=10)
+    row = [1.0, math.nan, 288.0]
+    calls = []
+
+    for _ in range(3):
+        key = cache.key(np.array(row))
+        assert cache.get_or_compute(key, lambda: calls.append(1) or 0.5) == 0.5
+
+    assert calls == [1]
+    assert cache.stats()["size"] == 1
+    assert cache.key(row) == (1.0, None, 288.0)
+
+
+def test_quantized_key_keeps_missing_values():
+    cache = PredictionCache(maxsize=10, sig_digits=3)
+    assert cache.key([1.23456, float("nan")]) == (1.23, None)
+    assert np.isnan(np.array([cache.key([1.0, float("nan")])], dtype=np.float64)[0, 1])
@@ -0,0 +1,44 @@
+import os
+import sqlite3
+
+import pytest
+
+import render_plots
+from migrations import migrate_path
+
+
+def _make_db(path, scores):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    migrate_path(path)
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO exoplanet (name, habitability_score) VALUES (?, ?)",
+                     [(f"P{i}", s) for i, s in enumerate(scores)])
+    conn.commit()
+    conn.close()
+
+
+def test_distribution_fingerprint_covers_database_identity(tmp_path, monkeypatch):
+    db = str(tmp_path / "exoplanets.db")
+    monkeypatch.setattr(render_plots, "DB_PATH", db)
+
+    _make_db(db, [0.2, 0.4])
+    first = render_plots._data_inputs()
+    assert first["scores"] == pytest.approx([0.2, 0.4])
+
+    # Recreated: same path, same change sequence, same scores
+    _make_db(db, [0.2, 0.4])
+    second = render_plots._data_inputs()
+    assert second["data_version"] == first["data_version"]
+    assert render_plots.fingerprint(second, {}) != render_plots.fingerprint(first, {})
+
+
+def test_distribution_draws_the_fingerprinted_scores(tmp_path, monkeypatch):
+    pytest.importorskip("seaborn")
+    monkeypatch.setattr(render_plots, "DB_PATH", str(tmp_path / "missing" / "none.db"))
+
+    out = str(tmp_path / "distribution.png")
+    outputs = render_plots.render_habitability_distribution(out, {}, {"scores": [0.1, 0.5, 0.9]})
+    assert outputs == [out] and os.path.getsize(out) > 0
+    assert not os.path.exists(tmp_path / "missing")
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+
+from migrations import migrate_path
+from reports import ExportCache
+from snapshot import TableSnapshot
+
+
+def _build(payload, calls):
+    def build(out):
+        calls.append(payload)
+        out.write(payload)
+    return build
+
+
+def test_same_version_of_another_database_is_rebuilt(tmp_path):
+    cache = ExportCache(str(tmp_path / "cache"))
+    calls = []
+
+    with cache.get_or_build("aaaa", 7, "pdf", 10, _build(b"old", calls)) as f:
+        assert f.read() == b"old"
+    with cache.get_or_build("aaaa", 7, "pdf", 10, _build(b"unused", calls)) as f:
+        assert f.read() == b"old"
+    with cache.get_or_build("bbbb", 7, "pdf", 10, _build(b"new", calls)) as f:
+        assert f.read() == b"new"
+    assert calls == [b"old", b"new"]
+
+
+def test_recreated_database_gets_a_new_identity(tmp_path):
+    db = str(tmp_path / "exoplanets.db")
+    snapshot = TableSnapshot(db)
+    ids = []
+    for name in ("a", "b"):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db + suffix):
+                os.remove(db + suffix)
+        migrate_path(db)
+        conn = sqlite3.connect(db)
+        conn.execute("INSERT INTO exoplanet (name, habitability_score) VALUES (?, 0.5)", (name,))
+        conn.commit()
+        conn.close()
+
+        # Same version as the file it replaced, but not the same data
+        table = snapshot.current(force=True)
+        assert table.version == 1
+        assert list(table.names) == [name]
+        ids.append(table.database)
+    assert None not in ids and ids[0] != ids[1]
+
+
+def test_export_is_keyed_by_the_pinned_snapshot(client, flask_app):
+    import app
+
+    response = client.get("/export/pdf?k=3")
+    assert response.status_code == 200
+    response.close()
+
+    table = app.table_snapshot.current()
+    name = f"top3-{table.database}-v{table.version}.pdf"
+    assert name in os.listdir(flask_app.config["EXPORT_CACHE_DIR"])
+    assert response.headers["ETag"].strip('"').startswith(
+        f"d{table.version}.{table.database[:8]}-")
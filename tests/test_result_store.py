@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from result_store import ResultStore, UploadNotFound
+
+
+def _chunk(names, start=0):
+    index = range(start, start + len(names))
+    return pd.DataFrame({
+        "pl_name": names,
+        **{c: [1.0] * len(names) for c in
+           ("pl_rade", "pl_bmasse", "pl_eqt", "pl_orbper", "st_teff", "st_rad")},
+    }, index=index)
+
+
+def test_top_ranks_every_chunk_of_one_upload(tmp_path):
+    store = ResultStore(str(tmp_path / "uploads.db"))
+    upload_id = store.create(k=2)
+    store.append(upload_id, _chunk(["a", "b"]), [0.1, 0.9])
+    store.append(upload_id, _chunk(["c", None], start=2), [0.5, 0.7])
+    store.finish(upload_id)
+
+    assert [r["planet_name"] for r in store.top(upload_id)] == ["b", None]
+    assert [(r["rank"], r["planet_name"]) for r in store.top(upload_id, k=2, offset=2)] == \
+        [(3, "c"), (4, "a")]
+    assert store.meta(upload_id)["row_count"] == 4
+
+
+def test_uploads_never_see_each_other(tmp_path):
+    store = ResultStore(str(tmp_path / "uploads.db"))
+    mine, theirs = store.create(), store.create()
+    store.append(mine, _chunk(["mine"]), [0.2])
+    store.append(theirs, _chunk(["theirs"]), [0.8])
+
+    assert [r["planet_name"] for r in store.top(mine)] == ["mine"]
+    store.discard(theirs)
+    with pytest.raises(UploadNotFound):
+        store.top(theirs)
+    assert [r["planet_name"] for r in store.top(mine)] == ["mine"]
+
+
+def test_oldest_complete_uploads_are_evicted(tmp_path):
+    store = ResultStore(str(tmp_path / "uploads.db"), max_uploads=2)
+    ids = []
+    for name in ("a", "b", "c"):
+        ids.append(store.create())
+        store.append(ids[-1], _chunk([name]), [0.5])
+        store.finish(ids[-1])
+
+    with pytest.raises(UploadNotFound):
+        store.meta(ids[0])
+    assert all(store.meta(u)["complete"] for u in ids[1:])
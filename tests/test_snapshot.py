@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from migrations import connect, migrate_path
+from snapshot import FEATURE_COLUMNS, TableSnapshot
+
+_INSERT = (f"INSERT INTO exoplanet (name, {', '.join(FEATURE_COLUMNS)}, habitability_score) "
+           f"VALUES (?, {', '.join('?' * len(FEATURE_COLUMNS))}, ?)")
+
+
+def _planet(rng, name):
+    values = rng.normal(size=len(FEATURE_COLUMNS)).round(3).tolist()
+    if rng.random() < 0.1:
+        values[rng.integers(len(values))] = None
+    # Repeated scores, so dense ranks have ties
+    score = None if rng.random() < 0.2 else float(rng.integers(0, 50)) / 50
+    return (name, *values, score)
+
+
+def _assert_same(a, b):
+    assert a.version == b.version
+    np.testing.assert_array_equal(a.ids, b.ids)
+    assert a.names.tolist() == b.names.tolist()
+    for c in FEATURE_COLUMNS:
+        np.testing.assert_array_equal(a.features[c], b.features[c])
+    np.testing.assert_array_equal(a.score, b.score)
+    np.testing.assert_array_equal(a.scored, b.scored)
+    np.testing.assert_array_equal(a.rank, b.rank)
+    np.testing.assert_allclose(a.correlations.correlation(), b.correlations.correlation(),
+                               rtol=0, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_sync_matches_rebuild(tmp_path, seed):
+    rng = np.random.default_rng(seed)
+    db = str(tmp_path / "snap.db")
+    migrate_path(db)
+    conn = connect(db)
+    with conn:
+        conn.executemany(_INSERT, [_planet(rng, f"P{i}") for i in range(300)])
+
+    snapshot = TableSnapshot(db, sync_interval=0, rebuild_fraction=1.0)
+    snapshot.sync()
+    serial = 300
+
+    for _ in range(6):
+        with conn:
+            ids = [r[0] for r in conn.execute("SELECT id FROM exoplanet")]
+            for pid in rng.choice(ids, size=8, replace=False).tolist():
+                action = rng.integers(3)
+                if action == 0:
+                    conn.execute("DELETE FROM exoplanet WHERE id = ?", (pid,))
+                else:
+                    conn.execute("UPDATE exoplanet SET habitability_score = ?, pl_eqt = ? "
+                                 "WHERE id = ?", (float(rng.integers(0, 50)) / 50,
+                                                  float(rng.normal()), pid))
+            for _ in range(rng.integers(0, 5)):
+                conn.execute(_INSERT, _planet(rng, f"P{serial}"))
+                serial += 1
+
+        applied = snapshot.applied
+        incremental = snapshot.current()
+        assert snapshot.applied > applied
+        _assert_same(incremental, TableSnapshot(db).current())
+    conn.close()
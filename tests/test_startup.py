@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def test_lazy_import_creates_no_files(tmp_path):
+    # A fresh interpreter, since the test session has already imported app
+    paths = {
+        "EXOPLANET_DB": tmp_path / "db" / "exoplanets.db",
+        "UPLOAD_STORE_PATH": tmp_path / "uploads" / "upload_results.db",
+        "JOB_SPOOL_DIR": tmp_path / "spool",
+        "EXPORT_CACHE_DIR": tmp_path / "exports",
+    }
+    env = dict(os.environ, LAZY_STARTUP="1", JOB_WORKERS="0", **{k: str(v) for k, v in paths.items()})
+    subprocess.run(
+        [sys.executable, "-c",
+         "import sys, app; assert 'pandas' not in sys.modules and app.model is None"],
+        cwd=ROOT, env=env, check=True,
+    )
+    assert [p for p in paths.values() if p.exists()] == []
@@ -0,0 +1,48 @@
+"""The NumPy tree engine against the xgboost model it was compiled from."""
+import pickle
+
+import numpy as np
+import pytest
+
+from tree_engine import load_model
+
+pytest.importorskip("xgboost")
+pytest.importorskip("sklearn")
+joblib = pytest.importorskip("joblib")
+pd = pytest.importorskip("pandas")
+
+# float32 leaf sums in a different order than xgboost's
+RTOL, ATOL = 1e-5, 1e-6
+
+
+@pytest.fixture(scope="module")
+def rows():
+    with open("features.pkl", "rb") as f:
+        features = pickle.load(f)
+    X = pd.read_csv("exoplanets_clean_full.csv", nrows=2000)[features].to_numpy(dtype=np.float64)
+
+    # Missing values in every feature, so default_left routing is covered
+    X_nan = X[:600].copy()
+    for j in range(X.shape[1]):
+        X_nan[j::X.shape[1], j] = np.nan
+    X_nan[::50] = np.nan
+    return pd.DataFrame(np.vstack([X, X_nan]), columns=features)
+
+
+def test_fused_engine_matches_xgboost(rows):
+    model = joblib.load("model.pkl")
+    scaler = joblib.load("scaler.pkl")
+    engine = load_model("model_fused.npz")
+
+    expected = model.predict(scaler.transform(rows))
+    actual = engine.predict(rows.to_numpy())
+
+    assert rows.isna().any(axis=1).sum() == 600
+    np.testing.assert_allclose(actual, expected, rtol=RTOL, atol=ATOL)
+
+
+def test_feature_importances_match_xgboost():
+    model = joblib.load("model.pkl")
+    engine = load_model("model_fused.npz")
+    np.testing.assert_allclose(engine.feature_importances_, model.feature_importances_,
+                               rtol=RTOL, atol=ATOL)
@@ -0,0 +1,74 @@
+import io
+import re
+
+import pytest
+
+HEADER = "pl_name,pl_rade,pl_bmasse,pl_eqt,pl_orbper,st_teff,st_rad\n"
+
+
+def _csv(rows):
+    return HEADER + "".join(f"{name},1.0,1.0,{eqt},365,5778,1.0\n" for name, eqt in rows)
+
+
+def _upload(client, text, k=10):
+    return client.post("/upload_csv_rank", data={
+        "file": (io.BytesIO(text.encode()), "planets.csv"), "k": str(k),
+    }, content_type="multipart/form-data")
+
+
+@pytest.mark.parametrize("export", ["/export/csv_excel", "/export/csv_pdf"])
+def test_csv_exports_need_the_upload_id(client, export):
+    response = _upload(client, _csv([("Mine", 288)]))
+    assert response.status_code == 200
+    upload_id = response.headers["X-Upload-Id"]
+
+    assert client.get(f"{export}?upload_id={upload_id}").status_code == 200
+    assert client.get(export).status_code == 400
+    assert client.get(f"{export}?upload_id=not-an-upload").status_code == 400
+
+
+def test_csv_pdf_puts_every_row_on_a_page(client):
+    rows = [(f"P{i}", 200 + i) for i in range(500)]
+    upload_id = _upload(client, _csv(rows), k=500).headers["X-Upload-Id"]
+
+    response = client.get(f"/export/csv_pdf?upload_id={upload_id}")
+    assert response.status_code == 200
+    pages = len(re.findall(rb"/Type\s*/Page\b(?!s)", response.data))
+    # 18 pt per row on A4: about 45 rows a page
+    assert pages >= 500 // 46
+
+
+def _upload_count():
+    import app
+
+    conn = app.upload_store._connect()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("text", [
+    _csv([("A", 288)]) + "B,1.0,1.0,hot,365,5778,1.0\n",
+    HEADER + 'A,1.0,1.0,288,365,5778,"1.0\n',
+    "pl_name,pl_rade\nA,1.0\n",
+    "",
+])
+def test_bad_upload_is_a_400_and_leaves_nothing_behind(client, text):
+    before = _upload_count()
+    response = _upload(client, text)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+    assert _upload_count() == before
+
+
+def test_uploads_are_isolated_by_id(client):
+    first = _upload(client, _csv([("Alpha", 288), ("Beta", 300)]), k=2)
+    second = _upload(client, _csv([("Gamma", 288)]), k=1)
+    ids = first.headers["X-Upload-Id"], second.headers["X-Upload-Id"]
+    assert ids[0] != ids[1]
+
+    names = [{r["planet_name"] for r in client.get(f"/upload_results/{u}").get_json()["results"]}
+             for u in ids]
+    assert names == [{"Alpha", "Beta"}, {"Gamma"}]
+    assert client.get("/upload_results/not-an-upload").status_code == 404
@@ -0,0 +1,491 @@
+"""Pure NumPy evaluator for XGBoost tree ensembles.
+
+Compiles the JSON produced by ``Booster.save_model("model.json")`` into flat
+node tables and scores rows without DMatrix or the xgboost runtime.
+
+Ensembles up to depth 6 are scored with leaf bitmasks (QuickScorer): each
+tree's leaves fit in one uint64, and for every feature a table maps "how many
+of this feature's thresholds does x reach" to the AND of the masks of all
+splits sent right. A row's exit leaf in each tree is then the lowest set bit
+of six ANDed table rows. Deeper ensembles and rows with missing values walk
+the node tables level by level instead.
+
+    python tree_engine.py export model.pkl model.json   # needs xgboost
+    python tree_engine.py verify model.pkl model.json   # parity check
+    python tree_engine.py fuse model.json scaler.pkl model_fused.npz
+
+``fuse`` folds the StandardScaler into the split thresholds, producing an
+artifact that scores raw ``FEATURES`` values with no transform step.
+"""
+import json
+import sys
+
+import numpy as np
+
+# Rows scored per vectorized pass; bounds the (rows x trees) work arrays
+CHUNK_ROWS = 256
+
+# Deepest ensemble whose leaves fit in a uint64 bitmask
+BITMASK_MAX_DEPTH = 6
+
+_ALL_LEAVES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# De Bruijn lookup for the index of the lowest set bit of a uint64
+_DEBRUIJN = 0x03F79D71B4CB0A89
+_DEBRUIJN_SHIFT = np.uint64(58)
+_DEBRUIJN_TABLE = np.zeros(64, dtype=np.int64)
+for _i in range(64):
+    _DEBRUIJN_TABLE[(((1 << _i) * _DEBRUIJN) & 0xFFFFFFFFFFFFFFFF) >> 58] = _i
+
+
+class TreeEnsemble:
+    """Flat, array-backed regression tree ensemble.
+
+    Node ``i`` of the ensemble splits on ``feature[i]`` at ``threshold[i]``
+    (``x < threshold`` goes left, NaN follows ``default_left``). Leaves point
+    to themselves so extra traversal steps are no-ops, and carry their
+    output in ``value``.
+    """
+
+    def __init__(self, feature, threshold, left, right, default_left, value,
+                 roots, base_score, n_features, max_depth, gain=None,
+                 feature_names=None, threshold_dtype=np.float32):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        # float32 like XGBoost itself; float64 once a scaler has been folded in
+        self.threshold = np.asarray(threshold, dtype=threshold_dtype)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.base_score = float(base_score)
+        self.n_features = int(n_features)
+        self.max_depth = int(max_depth)
+        self.gain = None if gain is None else np.asarray(gain, dtype=np.float64)
+        self.feature_names = None if feature_names is None else [str(f) for f in feature_names]
+
+        self._bitmask = None
+        if self.max_depth <= BITMASK_MAX_DEPTH:
+            self._bitmask = self._build_bitmask_tables()
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    # -------------------------------------------------
+    # Compilation
+    # -------------------------------------------------
+    @classmethod
+    def from_xgboost_json(cls, source):
+        """Build from a ``save_model`` JSON file path or an already parsed dict."""
+        if isinstance(source, dict):
+            doc = source
+        else:
+            with open(source) as f:
+                doc = json.load(f)
+
+        learner = doc["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in ("reg:squarederror", "reg:linear"):
+            raise ValueError(f"Unsupported objective: {objective}")
+
+        params = learner["learner_model_param"]
+        base_score = float(params["base_score"].strip("[]"))
+        n_features = int(params["num_feature"])
+
+        trees = learner["gradient_booster"]["model"]["trees"]
+
+        feature, threshold, left, right = [], [], [], []
+        default_left, value, gain, roots = [], [], [], []
+        max_depth = 0
+        offset = 0
+
+        for tree in trees:
+            lc = np.asarray(tree["left_children"], dtype=np.int64)
+            rc = np.asarray(tree["right_children"], dtype=np.int64)
+            n = len(lc)
+            is_leaf = lc == -1
+            own = np.arange(n)
+
+            if any(tree.get("split_type", [])):
+                raise ValueError("Categorical splits are not supported")
+
+            feature.append(np.where(is_leaf, 0, tree["split_indices"]))
+            threshold.append(np.where(is_leaf, np.inf, tree["split_conditions"]))
+            left.append(np.where(is_leaf, own, lc) + offset)
+            right.append(np.where(is_leaf, own, rc) + offset)
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            value.append(np.where(is_leaf, tree["split_conditions"], 0.0))
+            gain.append(np.where(is_leaf, np.nan, tree["loss_changes"]))
+            roots.append(offset)
+
+            depth = np.zeros(n, dtype=np.int64)
+            for i in range(n):
+                if not is_leaf[i]:
+                    depth[lc[i]] = depth[rc[i]] = depth[i] + 1
+            max_depth = max(max_depth, int(depth.max()))
+
+            offset += n
+
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value),
+            roots=roots,
+            base_score=base_score,
+            n_features=n_features,
+            max_depth=max_depth,
+            gain=np.concatenate(gain),
+        )
+
+    def _build_bitmask_tables(self):
+        depth = BITMASK_MAX_DEPTH
+        n_internal = 2 ** depth - 1
+
+        # Lay every tree out as a perfect binary heap of depth 6. Leaves
+        # point to themselves, so shallow leaves simply repeat downwards.
+        heap = np.empty((self.n_trees, n_internal), dtype=np.int64)
+        level = self.roots.astype(np.int64)[:, None]
+        for d in range(depth):
+            heap[:, 2 ** d - 1:2 ** (d + 1) - 1] = level
+            level = np.stack([self.left[level], self.right[level]], axis=-1)
+            level = level.reshape(self.n_trees, -1)
+        leaf_value = self.value[level]
+
+        # Going right at heap node h rules out the leaves of its left subtree
+        heap_mask = np.empty(n_internal, dtype=np.uint64)
+        for h in range(n_internal):
+            d = (h + 1).bit_length() - 1
+            span = 2 ** (depth - d)
+            first = (h - (2 ** d - 1)) * span
+            left_bits = ((1 << (span // 2)) - 1) << first
+            heap_mask[h] = np.uint64(0xFFFFFFFFFFFFFFFF ^ left_bits)
+
+        is_split = self.left[heap] != heap
+        tree_idx, heap_idx = np.nonzero(is_split)
+        nodes = heap[tree_idx, heap_idx]
+
+        thresholds, tables = [], []
+        for f in range(self.n_features):
+            sel = self.feature[nodes] == f
+            t, h = tree_idx[sel], heap_idx[sel]
+            thr = self.threshold[nodes[sel]]
+
+            order = np.argsort(thr, kind="stable")
+            t, h, thr = t[order], h[order], thr[order]
+            uniq, starts = np.unique(thr, return_index=True)
+            ends = np.append(starts[1:], len(thr))
+
+            # table[k] = per-tree AND of masks of splits with threshold <= uniq[k-1]
+            table = np.empty((len(uniq) + 1, self.n_trees), dtype=np.uint64)
+            cur = np.full(self.n_trees, _ALL_LEAVES)
+            table[0] = cur
+            for k in range(len(uniq)):
+                for i in range(starts[k], ends[k]):
+                    cur[t[i]] &= heap_mask[h[i]]
+                table[k + 1] = cur
+
+            thresholds.append(uniq)
+            tables.append(table)
+
+        return {
+            "thresholds": thresholds,
+            "tables": tables,
+            "leaf_value": np.ascontiguousarray(leaf_value, dtype=np.float32).ravel(),
+            "leaf_offset": np.arange(self.n_trees, dtype=np.int64) * 2 ** depth,
+        }
+
+    # -------------------------------------------------
+    # Inference
+    # -------------------------------------------------
+    def predict(self, X):
+        """Score an (n, n_features) array; returns float32 like XGBRegressor."""
+        X = np.asarray(X, dtype=self.threshold.dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected {self.n_features} features, got {X.shape[1]}"
+            )
+
+        if self._bitmask is None:
+            scorer, clean = self._traverse, None
+        else:
+            scorer = self._bitmask_scores
+            clean = ~np.isnan(X).any(axis=1)
+            if clean.all():
+                clean = None
+
+        out = np.empty(len(X), dtype=np.float32)
+
+        if clean is None:
+            for start in range(0, len(X), CHUNK_ROWS):
+                chunk = X[start:start + CHUNK_ROWS]
+                out[start:start + len(chunk)] = scorer(chunk)
+        else:
+            # Bitmask tables cannot express default_left routing for NaN
+            if clean.any():
+                out[clean] = self.predict(X[clean])
+            out[~clean] = self._traverse(X[~clean])
+
+        return out
+
+    def _bitmask_scores(self, X):
+        bm = self._bitmask
+        thresholds, tables = bm["thresholds"], bm["tables"]
+
+        mask = tables[0][np.searchsorted(thresholds[0], X[:, 0], side="right")]
+        for f in range(1, self.n_features):
+            mask &= tables[f][np.searchsorted(thresholds[f], X[:, f], side="right")]
+
+        # The exit leaf is the leftmost leaf still reachable
+        lowest = mask & (~mask + np.uint64(1))
+        leaf = _DEBRUIJN_TABLE[(lowest * np.uint64(_DEBRUIJN)) >> _DEBRUIJN_SHIFT]
+
+        margin = bm["leaf_value"][leaf + bm["leaf_offset"]].sum(axis=1, dtype=np.float64)
+        return (margin + self.base_score).astype(np.float32)
+
+    def _traverse(self, X):
+        out = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            out[start:start + len(chunk)] = self._traverse_chunk(chunk)
+        return out
+
+    def _traverse_chunk(self, X):
+        n = len(X)
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        has_nan = np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = x < self.threshold[node]
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.default_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        margin = self.value[node].sum(axis=1, dtype=np.float64)
+        return (margin + self.base_score).astype(np.float32)
+
+    @property
+    def feature_importances_(self):
+        """Normalized average split gain, matching XGBRegressor's default."""
+        if self.gain is None:
+            raise AttributeError("Model was compiled without split gains")
+
+        is_split = ~np.isnan(self.gain)
+        feats = self.feature[is_split]
+        total = np.bincount(feats, weights=self.gain[is_split], minlength=self.n_features)
+        count = np.bincount(feats, minlength=self.n_features)
+
+        avg = np.divide(total, count, out=np.zeros(self.n_features), where=count > 0)
+        s = avg.sum()
+        return (avg / s if s > 0 else avg).astype(np.float32)
+
+
+    # -------------------------------------------------
+    # Scaler folding and persistence
+    # -------------------------------------------------
+    def fold_scaler(self, mean, scale):
+        """Return an equivalent ensemble that takes unscaled feature values.
+
+        The original pipeline goes left when ``float32((x - mean) / scale) <
+        threshold``. That predicate is monotone in ``x``, so each split has a
+        raw-space boundary: the smallest float64 ``x`` for which it turns
+        false. Boundaries are located by bisection with the same arithmetic,
+        so routing matches the scaler + model pipeline bit for bit.
+        """
+        mean = np.asarray(mean, dtype=np.float64)
+        scale = np.asarray(scale, dtype=np.float64)
+
+        is_split = self.left != np.arange(self.n_nodes)
+        f = self.feature[is_split]
+        t = self.threshold[is_split].astype(np.float32)
+        m, sc = mean[f], scale[f]
+
+        def goes_right(x):
+            return ((x - m) / sc).astype(np.float32) >= t
+
+        guess = t.astype(np.float64) * sc + m
+        step = np.abs(guess) * 1e-6 + sc * 1e-6
+        lo, hi = guess - step, guess + step
+        while True:
+            bad_lo, bad_hi = goes_right(lo), ~goes_right(hi)
+            if not (bad_lo.any() or bad_hi.any()):
+                break
+            step *= 2
+            lo = np.where(bad_lo, guess - step, lo)
+            hi = np.where(bad_hi, guess + step, hi)
+
+        # Invariant: lo goes left, hi goes right. Stop when they are adjacent.
+        for _ in range(2000):
+            open_ = np.nextafter(lo, np.inf) < hi
+            if not open_.any():
+                break
+            mid = lo + (hi - lo) / 2
+            right = goes_right(mid)
+            hi = np.where(open_ & right, mid, hi)
+            lo = np.where(open_ & ~right, mid, lo)
+
+        threshold = self.threshold.astype(np.float64)
+        threshold[is_split] = hi
+
+        return TreeEnsemble(
+            feature=self.feature, threshold=threshold, left=self.left,
+            right=self.right, default_left=self.default_left, value=self.value,
+            roots=self.roots, base_score=self.base_score,
+            n_features=self.n_features, max_depth=self.max_depth,
+            gain=self.gain, feature_names=self.feature_names,
+            threshold_dtype=np.float64,
+        )
+
+    def save(self, path):
+        """Write the node tables to an uncompressed ``.npz`` archive."""
+        arrays = {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "default_left": self.default_left,
+            "value": self.value,
+            "roots": self.roots,
+            "base_score": np.float64(self.base_score),
+            "n_features": np.int64(self.n_features),
+            "max_depth": np.int64(self.max_depth),
+        }
+        if self.gain is not None:
+            arrays["gain"] = self.gain
+        if self.feature_names is not None:
+            arrays["feature_names"] = np.array(self.feature_names)
+
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            return cls(
+                feature=z["feature"],
+                threshold=z["threshold"],
+                left=z["left"],
+                right=z["right"],
+                default_left=z["default_left"],
+                value=z["value"],
+                roots=z["roots"],
+                base_score=float(z["base_score"]),
+                n_features=int(z["n_features"]),
+                max_depth=int(z["max_depth"]),
+                gain=z["gain"] if "gain" in z else None,
+                feature_names=z["feature_names"].tolist() if "feature_names" in z else None,
+                threshold_dtype=z["threshold"].dtype,
+            )
+
+
+def load_model(path="model.json"):
+    """Load an XGBoost ``.json`` dump or a saved ``.npz`` node table."""
+    if str(path).endswith(".npz"):
+        return TreeEnsemble.load(path)
+    return TreeEnsemble.from_xgboost_json(path)
+
+
+# -------------------------------------------------
+# Maintenance commands (these need xgboost)
+# -------------------------------------------------
+def export_json(pkl_path="model.pkl", json_path="model.json"):
+    import joblib
+
+    model = joblib.load(pkl_path)
+    model.get_booster().save_model(json_path)
+    print(f"✅ Exported {pkl_path} -> {json_path}")
+
+
+def verify(pkl_path="model.pkl", json_path="model.json", csv_path="exoplanets_clean_full.csv"):
+    import joblib
+    import pandas as pd
+
+    model = joblib.load(pkl_path)
+    scaler = joblib.load("scaler.pkl")
+    features = joblib.load("features.pkl")
+    engine = load_model(json_path)
+
+    df = pd.read_csv(csv_path)
+    X = scaler.transform(df[features])
+
+    # Include rows with missing values so default_left routing is covered
+    X_nan = X[:1000].copy()
+    X_nan[::3, 0] = np.nan
+    X_nan[1::3, 2] = np.nan
+    X = np.vstack([X, X_nan])
+
+    expected = model.predict(X)
+    actual = engine.predict(X)
+    diff = np.abs(expected - actual)
+
+    imp_diff = np.abs(model.feature_importances_ - engine.feature_importances_).max()
+
+    print(f"Rows checked          : {len(X)}")
+    print(f"Max abs difference    : {diff.max():.3e}")
+    print(f"Mean abs difference   : {diff.mean():.3e}")
+    print(f"Importance max diff   : {imp_diff:.3e}")
+
+    ok = np.allclose(expected, actual, rtol=1e-5, atol=1e-6) and imp_diff < 1e-5
+    print("✅ Parity OK" if ok else "❌ Parity FAILED")
+    return ok
+
+
+def fuse(json_path="model.json", scaler_path="scaler.pkl",
+         out_path="model_fused.npz", csv_path="exoplanets_clean_full.csv"):
+    import joblib
+    import pandas as pd
+
+    scaler = joblib.load(scaler_path)
+    features = joblib.load("features.pkl")
+    engine = load_model(json_path)
+    engine.feature_names = list(features)
+
+    fused = engine.fold_scaler(scaler.mean_, scaler.scale_)
+    fused.save(out_path)
+    fused = load_model(out_path)
+
+    # Verification report: the fused artifact on raw values against the
+    # current scaler.transform + model.predict pipeline
+    df = pd.read_csv(csv_path)[features]
+    X = df.to_numpy(dtype=np.float64)
+    expected = engine.predict(scaler.transform(df))
+    actual = fused.predict(X)
+
+    identical = expected == actual
+    print(f"Fused model written   : {out_path}")
+    print(f"Rows checked          : {len(X)}")
+    print(f"Identical predictions : {int(identical.sum())} / {len(X)}")
+    print(f"Max abs difference    : {np.abs(expected - actual).max():.3e}")
+
+    try:
+        xgb_model = joblib.load("model.pkl")
+    except ImportError:
+        pass
+    else:
+        xgb_diff = np.abs(xgb_model.predict(scaler.transform(df)) - actual).max()
+        print(f"Max abs diff vs xgb   : {xgb_diff:.3e}")
+
+    ok = bool(identical.all())
+    print("✅ Fused model verified" if ok else "❌ Fused model differs")
+    return ok
+
+
+if __name__ == "__main__":
+    commands = {"export": export_json, "verify": verify, "fuse": fuse}
+    if len(sys.argv) < 2 or sys.argv[1] not in commands:
+        print(__doc__)
+        sys.exit(2)
+
+    result = commands[sys.argv[1]](*sys.argv[2:])
+    sys.exit(0 if result in (None, True) else 1)
@@ -0,0 +1,99 @@
+"""Chunked scoring of uploaded CSV files in constant memory.
+
+The upload is parsed ``chunk_rows`` rows at a time, keeping only the
+feature columns and ``pl_name``. Each chunk is scored with one model call
+and folded into a ``TopK`` accumulator, which never holds more than ``k``
+candidate rows. Memory use no longer depends on the size of the upload.
+
+pandas is imported on first use, so importing this module (as app.py and
+jobs.py do) stays cheap for processes that never score an upload.
+"""
+import numpy as np
+
+NAME_COLUMN = "pl_name"
+
+
+class MissingColumns(ValueError):
+    def __init__(self, missing):
+        super().__init__(f"Missing required columns: {', '.join(missing)}")
+        self.missing = missing
+
+
+def read_upload_chunks(stream, features, chunk_rows=50000):
+    """Yield DataFrame chunks of ``features`` (+ pl_name) from a CSV stream.
+
+    Raises MissingColumns before any row is scored if a feature column is
+    absent, and pandas' EmptyDataError for an empty file.
+    """
+    import pandas as pd
+
+    wanted = set(features) | {NAME_COLUMN}
+    reader = pd.read_csv(
+        stream,
+        chunksize=chunk_rows,
+        usecols=lambda c: c in wanted,
+    )
+
+    for chunk in reader:
+        missing = [f for f in features if f not in chunk.columns]
+        if missing:
+            raise MissingColumns(missing)
+        yield chunk
+
+
+class TopK:
+    """Keeps the ``k`` highest-scoring rows seen so far.
+
+    Each update selects the chunk's best ``k`` with ``argpartition`` (O(n))
+    and merges them with the current candidates, so only ``2k`` rows are
+    ever sorted, and only in ``result``.
+    """
+
+    def __init__(self, k, score_column="habitability_score"):
+        self.k = int(k)
+        self.score_column = score_column
+        self.rows_seen = 0
+        self._best = None
+
+    def _select(self, df):
+        if len(df) <= self.k:
+            return df
+        scores = df[self.score_column].to_numpy()
+        idx = np.argpartition(-scores, self.k - 1)[:self.k]
+        return df.iloc[np.sort(idx)]
+
+    def update(self, chunk, scores):
+        chunk = chunk.assign(**{self.score_column: scores})
+        self.rows_seen += len(chunk)
+
+        top = self._select(chunk)
+        if self._best is not None:
+            import pandas as pd
+            top = self._select(pd.concat([self._best, top]))
+        self._best = top
+
+    def result(self):
+        """Top rows sorted by descending score, with a fresh 0..k-1 index."""
+        if self._best is None:
+            import pandas as pd
+            return pd.DataFrame(columns=[self.score_column])
+        return (
+            self._best.sort_values(self.score_column, ascending=False, kind="stable")
+                      .reset_index(drop=True)
+        )
+
+
+def score_upload(stream, features, score_fn, k=10, chunk_rows=50000, on_chunk=None):
+    """Stream-score a CSV upload and return its ``TopK`` accumulator.
+
+    ``on_chunk(chunk, scores)`` is called for every scored chunk, e.g. to
+    persist the full result.
+    """
+    top = TopK(k)
+    for chunk in read_upload_chunks(stream, features, chunk_rows):
+        X = chunk[features].to_numpy(dtype=float)
+        scores = score_fn(X)
+        if on_chunk is not None:
+            on_chunk(chunk, scores)
+        top.update(chunk, scores)
+    return top